@@ -0,0 +1,148 @@
+"""
+End-to-end latency of the browser path against the local Zoho stand-in server.
+
+Runs N check-in/check-out cycles through BrowserControl and the browser pool and reports
+p50/p95 of every step (launch, open, session check, login, click, logout) and the peak RSS
+of the app process together with its Chromium processes. No real Zoho sign-ins are spent.
+
+Usage: python benchmarks/bench_browser.py [cycles] [--latency SECONDS] [--post-login mfa|limit_warning]
+    [--reuse] [--warm]
+
+By default every cycle does a full sign-in and sign-out in a freshly launched browser.
+--reuse keeps the session between cycles, --warm keeps one browser for all cycles.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+from fake_zoho import FakeZohoServer, FakeZohoState
+
+PORT = 9899
+os.environ.setdefault("ZOHO_USERNAME", "bench@example.com")
+os.environ.setdefault("ZOHO_PASSWORD", "bench")
+os.environ.setdefault("ZOHO_COMPANY_ID", "bench")
+os.environ["ZOHO_ONE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ["BROWSER_ALLOWED_HOSTS"] = "127.0.0.1"
+
+from attctrl.accounts import Account  # noqa: E402
+from attctrl.browser import BrowserControl  # noqa: E402
+from attctrl.config import Config  # noqa: E402
+from attctrl.pool import BrowserPool  # noqa: E402
+from attctrl.session import get_session_store  # noqa: E402
+
+BENCH_ACCOUNT_ID = "benchmark"
+
+
+def tree_rss() -> int:
+    """
+    Resident memory of this process and all its descendants in bytes (Linux only).
+    """
+    children: Dict[int, List[int]] = defaultdict(list)
+    rss: Dict[int, int] = {}
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for proc in Path("/proc").iterdir():
+        if not proc.name.isdigit():
+            continue
+        try:
+            stat = (proc / "stat").read_text()
+            statm = (proc / "statm").read_text()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children[ppid].append(int(proc.name))
+        rss[int(proc.name)] = int(statm.split()[1]) * page_size
+    total, pending = 0, [os.getpid()]
+    while pending:
+        pid = pending.pop()
+        total += rss.get(pid, 0)
+        pending.extend(children.get(pid, []))
+    return total
+
+
+async def sample_rss(peak: List[int]):
+    while True:
+        peak[0] = max(peak[0], tree_rss())
+        await asyncio.sleep(0.1)
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+async def run_cycles(cycles: int, warm: bool) -> Dict[str, List[float]]:
+    account = Account(
+        id=BENCH_ACCOUNT_ID,
+        name="Benchmark",
+        username=Config.ZOHO_USERNAME,
+        password=Config.ZOHO_PASSWORD,
+        company_id=Config.ZOHO_COMPANY_ID,
+    )
+    session = get_session_store(BENCH_ACCOUNT_ID)
+    pool = BrowserPool(max_uses=cycles * 2 if warm else 1)
+    steps: Dict[str, List[float]] = defaultdict(list)
+
+    async def run(action: str):
+        start = time.perf_counter()
+
+        async def task(context) -> bool:
+            steps["launch"].append(time.perf_counter() - start)
+            async with BrowserControl(context, account) as control:
+                result = await getattr(control, action)()
+            for name, duration in control.timer.steps.items():
+                steps[name].append(duration)
+            return result
+
+        storage_state = session.load() if Config.SESSION_REUSE else None
+        if not await pool.run(task, storage_state):
+            raise RuntimeError(f"{action} failed against the stand-in server")
+        steps["total"].append(time.perf_counter() - start)
+
+    try:
+        for _ in range(cycles):
+            await run("do_check_in")
+            await run("do_check_out")
+    finally:
+        await pool.shutdown()
+        session.remove()
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("cycles", type=int, nargs="?", default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--post-login", choices=("", "mfa", "limit_warning"), default="")
+    parser.add_argument("--reuse", action="store_true", help="Reuse the session between runs")
+    parser.add_argument("--warm", action="store_true", help="Keep one browser for all runs")
+    args = parser.parse_args()
+    Config.SESSION_REUSE = args.reuse
+
+    state = FakeZohoState(latency=args.latency, post_login=args.post_login)
+    with FakeZohoServer(state, PORT):
+
+        async def bench():
+            peak = [tree_rss()]
+            sampler = asyncio.create_task(sample_rss(peak))
+            try:
+                return await run_cycles(args.cycles, args.warm), peak[0]
+            finally:
+                sampler.cancel()
+
+        steps, peak_rss = asyncio.run(bench())
+
+    print(f"{args.cycles} cycles, latency {args.latency * 1000:.0f} ms, sign-ins {state.logins}")
+    print(f"{'step':>16} {'runs':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, durations in steps.items():
+        p50, p95 = percentile(durations, 0.5) * 1000, percentile(durations, 0.95) * 1000
+        print(f"{name:>16} {len(durations):>5} {p50:>8.0f} {p95:>8.0f}")
+    print(f"peak RSS (app + Chromium): {peak_rss / 2**20:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
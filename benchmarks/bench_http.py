@@ -0,0 +1,120 @@
+"""
+Latency of the HTTP attendance backend against the local Zoho stand-in server.
+
+Signs in to the stand-in once, stores the session the way the browser backend does, then
+runs N check-in/check-out cycles through attctrl.attendance.HttpBackend and reports p50/p95
+of the state query and the attendance request. The last check verifies that an expired
+session is reported as such, which is what makes a task fall back to the browser.
+
+Usage: python benchmarks/bench_http.py [cycles] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+from fake_zoho import CSRF_COOKIE, SESSION_COOKIE, FakeZohoServer, FakeZohoState
+
+PORT = 9899
+os.environ.setdefault("ZOHO_USERNAME", "bench@example.com")
+os.environ.setdefault("ZOHO_PASSWORD", "bench")
+os.environ.setdefault("ZOHO_COMPANY_ID", "bench")
+os.environ["ZOHO_ONE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ["ZOHO_ATTENDANCE_URL"] = f"http://127.0.0.1:{PORT}/{{company_id}}/AttendanceAction.zp"
+
+from attctrl.accounts import Account  # noqa: E402
+from attctrl.attendance import HttpBackend, SessionUnavailableError, http_client  # noqa: E402
+from attctrl.config import Config  # noqa: E402
+from attctrl.runs import RunRecord, current_run  # noqa: E402
+from attctrl.session import get_session_store  # noqa: E402
+
+BENCH_ACCOUNT_ID = "benchmark"
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+def sign_in(account: Account):
+    """
+    Sign in to the stand-in and cache the cookies as Playwright storage state.
+    """
+    response = httpx.post(
+        f"{Config.ZOHO_ONE_URL}/signin",
+        data={"login": account.username, "password": account.password},
+    )
+    cookies = [
+        {"name": name, "value": response.cookies[name], "domain": "127.0.0.1", "path": "/"}
+        for name in (SESSION_COOKIE, CSRF_COOKIE)
+    ]
+    get_session_store(account.id).save({"cookies": cookies, "origins": []})
+
+
+async def run_cycles(account: Account, cycles: int) -> Dict[str, List[float]]:
+    backend = HttpBackend()
+    steps: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(cycles):
+        for check_in in (True, False):
+            run = RunRecord(task_type="bench", account=account.id, started_at=time.time())
+            current_run.set(run)
+            start = time.perf_counter()
+            await backend.switch(account, check_in)
+            steps["total"].append(time.perf_counter() - start)
+            for name, duration in run.steps.items():
+                steps[name].append(duration)
+    return steps
+
+
+async def check_expired_session(account: Account, state: FakeZohoState) -> bool:
+    state.sessions.clear()
+    try:
+        await HttpBackend().switch(account, True)
+    except SessionUnavailableError:
+        return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("cycles", type=int, nargs="?", default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    account = Account(
+        id=BENCH_ACCOUNT_ID,
+        name="Benchmark",
+        username=Config.ZOHO_USERNAME,
+        password=Config.ZOHO_PASSWORD,
+        company_id=Config.ZOHO_COMPANY_ID,
+    )
+    state = FakeZohoState(latency=args.latency)
+    with FakeZohoServer(state, PORT):
+        sign_in(account)
+
+        async def bench():
+            try:
+                steps = await run_cycles(account, args.cycles)
+                return steps, await check_expired_session(account, state)
+            finally:
+                await http_client.aclose()
+
+        try:
+            steps, expired_detected = asyncio.run(bench())
+        finally:
+            get_session_store(account.id).remove()
+
+    print(f"{args.cycles} cycles, latency {args.latency * 1000:.0f} ms, sign-ins {state.logins}")
+    print(f"{'step':>16} {'runs':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, durations in steps.items():
+        p50, p95 = percentile(durations, 0.5) * 1000, percentile(durations, 0.95) * 1000
+        print(f"{name:>16} {len(durations):>5} {p50:>8.0f} {p95:>8.0f}")
+    print(f"expired session detected for browser fallback: {expired_detected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Import time of the web app, as paid on every container start before /health answers.
+
+Runs `python -X importtime -c "import attctrl.api"` in fresh interpreters, reports the best
+total and the slowest modules, and fails if the total is over the budget or if a module
+that is meant to be loaded lazily (Playwright, SQLAlchemy, Sentry) was imported.
+
+Usage: python benchmarks/bench_import.py [runs] [--budget MS] [--top N]
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+LAZY_MODULES = ("playwright", "sqlalchemy", "sentry_sdk")
+
+
+def parse_option(name: str, default: int) -> int:
+    if name in sys.argv:
+        return int(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+
+def import_profile() -> Tuple[float, Dict[str, float]]:
+    """
+    Import the app in a new interpreter.
+
+    :return: Total import time in ms and cumulative time in ms by top-level module
+    """
+    env = {
+        "ZOHO_USERNAME": "benchmark",
+        "ZOHO_PASSWORD": "benchmark",
+        "ZOHO_COMPANY_ID": "benchmark",
+        **os.environ,
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import attctrl.api"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    modules: Dict[str, float] = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        package = name.strip().split(".")[0]
+        value = int(cumulative) / 1000
+        modules[package] = max(modules.get(package, 0.0), value)
+        if name.strip() == "attctrl.api":
+            total = value
+    return total, modules
+
+
+def main():
+    args = sys.argv[1:]
+    runs = int(args[0]) if args and args[0].isdigit() else 5
+    budget = parse_option("--budget", 800)
+    top = parse_option("--top", 10)
+
+    profiles = [import_profile() for _ in range(runs)]
+    total, modules = min(profiles, key=lambda profile: profile[0])
+    print(f"import attctrl.api: best of {runs} runs {total:.0f} ms (budget {budget} ms)")
+    for name, value in sorted(modules.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<24} {value:8.1f} ms")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if total > budget:
+        print(f"FAIL: import time over budget by {total - budget:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
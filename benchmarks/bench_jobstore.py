@@ -0,0 +1,95 @@
+"""
+Latency of the scheduler job stores over thousands of jobs.
+
+Compares the plain SQLAlchemy SQLite store (rollback journal, default pool), the WAL SQLite
+store and the in-memory store with write-behind snapshots from attctrl.jobstore. Every store
+gets N cron jobs added one by one, is listed, looked up by id and emptied one by one through
+the APScheduler API, like the task endpoints do. Reports p50/p95 per call and totals.
+
+Usage: python benchmarks/bench_jobstore.py [jobs] [--flush-interval SECONDS]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from apscheduler.jobstores.base import BaseJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+os.environ.setdefault("ZOHO_USERNAME", "bench@example.com")
+os.environ.setdefault("ZOHO_PASSWORD", "bench")
+os.environ.setdefault("ZOHO_COMPANY_ID", "bench")
+
+from attctrl.jobstore import SnapshotJobStore, TaskJobStore, create_sqlite_engine
+
+
+def noop(account_id: str):
+    return account_id
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+def measure(store: BaseJobStore, jobs: int) -> Dict[str, List[float]]:
+    scheduler = BackgroundScheduler(jobstores={"default": store})
+    scheduler.start(paused=True)
+    timings: Dict[str, List[float]] = {"add": [], "list": [], "get": [], "remove": []}
+    ids = []
+    try:
+        for i in range(jobs):
+            trigger = CronTrigger(day_of_week="mon-fri", hour=i % 24, minute=i % 60)
+            start = time.perf_counter()
+            job = scheduler.add_job(noop, trigger=trigger, kwargs={"account_id": str(i)})
+            timings["add"].append(time.perf_counter() - start)
+            ids.append(job.id)
+        for _ in range(5):
+            start = time.perf_counter()
+            scheduler.get_jobs()
+            timings["list"].append(time.perf_counter() - start)
+        for job_id in random.sample(ids, min(len(ids), 200)):
+            start = time.perf_counter()
+            scheduler.get_job(job_id)
+            timings["get"].append(time.perf_counter() - start)
+        for job_id in ids:
+            start = time.perf_counter()
+            scheduler.remove_job(job_id)
+            timings["remove"].append(time.perf_counter() - start)
+    finally:
+        scheduler.shutdown()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("jobs", type=int, nargs="?", default=2000)
+    parser.add_argument("--flush-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        stores = {
+            "sqlite": lambda: SQLAlchemyJobStore(url=f"sqlite:///{data_dir}/plain.sqlite"),
+            "sqlite-wal": lambda: TaskJobStore(
+                engine=create_sqlite_engine(Path(data_dir, "wal.sqlite"))
+            ),
+            "memory": lambda: SnapshotJobStore(
+                Path(data_dir, "jobs.pickle"), flush_interval=args.flush_interval
+            ),
+        }
+        print(f"{args.jobs} jobs, snapshot flush interval {args.flush_interval}s")
+        print(f"{'store':>12} {'call':>7} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}")
+        for name, factory in stores.items():
+            for call, durations in measure(factory(), args.jobs).items():
+                p50, p95 = percentile(durations, 0.5) * 1000, percentile(durations, 0.95) * 1000
+                print(f"{name:>12} {call:>7} {p50:>9.3f} {p95:>9.3f} {sum(durations):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
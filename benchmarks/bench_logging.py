@@ -0,0 +1,72 @@
+"""
+Per-record cost of logging on the calling thread.
+
+Compares the previous synchronous setup (new formatter per record, console and notification
+handlers run inline) with the queue-based pipeline from attctrl.logger.
+
+Usage: python benchmarks/bench_logging.py [records]
+"""
+
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from attctrl.logger import (
+    CustomFormatter,
+    NotificationFormatter,
+    NotificationHandler,
+    log_pipeline,
+    new_logger,
+)
+
+
+class LegacyFormatter(logging.Formatter):
+    def format(self, record):
+        log_fmt = CustomFormatter.FORMATS.get(record.levelno)
+        formatter = logging.Formatter(log_fmt)
+        return formatter.format(record)
+
+
+def legacy_logger(stream) -> logging.Logger:
+    logger = logging.getLogger("bench.legacy")
+    logger.setLevel(logging.DEBUG)
+    console_handler = logging.StreamHandler(stream)
+    console_handler.setFormatter(LegacyFormatter())
+    logger.addHandler(console_handler)
+    notification_handler = NotificationHandler()
+    notification_handler.setFormatter(NotificationFormatter())
+    logger.addHandler(notification_handler)
+    return logger
+
+
+def measure(logger: logging.Logger, records: int) -> float:
+    start = time.perf_counter()
+    for i in range(records):
+        logger.info("Benchmark record %d", i)
+    return (time.perf_counter() - start) / records * 1e6
+
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with Path(os.devnull).open("w") as devnull:
+        log_pipeline.console_handler.setStream(devnull)
+        legacy = measure(legacy_logger(devnull), records)
+        pipeline_logger = new_logger("bench.pipeline")
+        # NOTE: Listener is paused while measuring, so it does not compete for the GIL.
+        log_pipeline.stop()
+        pipeline = measure(pipeline_logger, records)
+        drain_start = time.perf_counter()
+        log_pipeline.start()
+        log_pipeline.stop()
+        drain = (time.perf_counter() - drain_start) / records * 1e6
+
+    print(f"records: {records}")
+    print(f"legacy synchronous:  {legacy:8.2f} us/record on caller thread")
+    print(f"queue pipeline:      {pipeline:8.2f} us/record on caller thread")
+    print(f"queue listener:      {drain:8.2f} us/record handled in background")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Bytes transferred and time-to-button of the Zoho dashboard with and without request blocking.
+
+Record a HAR of a signed-in dashboard load once (needs the Zoho creds from .env, one sign-in
+is spent if there is no cached session), then replay it offline as often as needed:
+
+Usage:
+    python benchmarks/bench_page_load.py record <file.har>
+    python benchmarks/bench_page_load.py replay <file.har> [rounds]
+
+Replay loads the dashboard from the HAR with the default profile and with the lean profile
+(Chromium flags plus the resource filter), checks that the attendance button is still there
+and prints the transferred bytes and the time until the button is visible.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from typing import Tuple
+
+from playwright.async_api import Page, async_playwright
+
+from attctrl.accounts import DEFAULT_ACCOUNT_ID, account_store
+from attctrl.browser import BrowserControl, DashboardPage
+from attctrl.resources import LEAN_CHROMIUM_ARGS, ResourceFilter
+
+
+async def record(har_file: str):
+    account = account_store.get_account(DEFAULT_ACCOUNT_ID)
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+        context = await browser.new_context(viewport={"width": 1280, "height": 720})
+        async with BrowserControl(context, account) as control:
+            await control.ensure_login()
+        state = await context.storage_state()
+        await context.close()
+
+        context = await browser.new_context(
+            viewport={"width": 1280, "height": 720},
+            storage_state=state,
+            record_har_path=har_file,
+        )
+        page = await context.new_page()
+        await page.goto(account.login_link)
+        await DashboardPage(page).att_button.wait_for(state="visible")
+        await context.close()
+        await browser.close()
+    print(f"HAR recorded to {har_file}")
+
+
+async def load_dashboard(page: Page, url: str) -> Tuple[float, int]:
+    sizes = []
+
+    async def on_finished(request):
+        sizes.append((await request.sizes())["responseBodySize"])
+
+    page.on("requestfinished", on_finished)
+    start = time.perf_counter()
+    await page.goto(url)
+    button = DashboardPage(page).att_button
+    await button.wait_for(state="visible")
+    elapsed = time.perf_counter() - start
+    text = await button.inner_text()
+    assert "Check-in" in text or "Check-out" in text, f"Unexpected button: {text}"
+    await asyncio.sleep(0.5)
+    return elapsed, sum(size for size in sizes if size > 0)
+
+
+async def replay(har_file: str, rounds: int):
+    account = account_store.get_account(DEFAULT_ACCOUNT_ID)
+    async with async_playwright() as playwright:
+        for name, lean in (("default", False), ("lean", True)):
+            browser = await playwright.chromium.launch(args=LEAN_CHROMIUM_ARGS if lean else [])
+            times, transferred = [], []
+            for _ in range(rounds):
+                context = await browser.new_context(viewport={"width": 1280, "height": 720})
+                await context.route_from_har(har_file, not_found="abort")
+                if lean:
+                    # NOTE: Registered last, so it runs before the HAR route.
+                    await ResourceFilter().apply(context)
+                elapsed, size = await load_dashboard(await context.new_page(), account.login_link)
+                times.append(elapsed)
+                transferred.append(size)
+                await context.close()
+            await browser.close()
+            print(
+                f"{name:>8}: time-to-button median {statistics.median(times) * 1000:.0f} ms,"
+                f" transferred {statistics.median(transferred) / 1024:.0f} KiB"
+            )
+
+
+def main():
+    mode, har_file, *rest = sys.argv[1:] + [""] * 2
+    if mode not in ("record", "replay") or not har_file:
+        print(__doc__)
+        sys.exit(1)
+    if mode == "record":
+        asyncio.run(record(har_file))
+    else:
+        asyncio.run(replay(har_file, int(rest[0]) if rest and rest[0] else 5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Bytes on wire of a cold and a warm load of the index page.
+
+Loads the index page with its static files through the app, the way a browser would: a cold
+load fetches everything, a warm load skips files cached as immutable and revalidates the rest.
+The same loads with the plain, uncompressed file names show what pages cost before static
+files were content-hashed and precompressed. Exits with 1 when the hashed cold load is not
+below the given share of the plain one, or the warm load requests more than the page itself.
+
+Usage: python benchmarks/bench_static.py [--max-share 0.4] [--encoding "br, gzip"]
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+from typing import Dict, List, Tuple
+
+os.environ.setdefault("ZOHO_USERNAME", "bench@example.com")
+os.environ.setdefault("ZOHO_PASSWORD", "bench")
+os.environ.setdefault("ZOHO_COMPANY_ID", "bench")
+os.environ["APP_AUTH"] = "false"
+os.environ["BROWSER_WARMUP"] = "false"
+
+from fastapi.testclient import TestClient
+
+from attctrl.api import app
+from attctrl.assets import asset_manifest
+
+STATIC_URL = re.compile(r'(?:src|href)="(/static/[^"]+)"')
+
+
+def load_page(
+    client: TestClient, encoding: str, plain: bool, cache: Dict[str, Tuple[str, str]]
+) -> Tuple[int, int]:
+    """
+    Load the index page and its static files.
+
+    :param client: App client
+    :param encoding: Accept-Encoding header
+    :param plain: Request static files by their plain names
+    :param cache: Browser cache, url -> (Cache-Control, ETag), filled on the way
+    :return: Number of requests and bytes received
+    """
+    headers = {"Accept-Encoding": encoding}
+    page = client.get("/", headers=headers)
+    requests, received = 1, page.num_bytes_downloaded
+    urls: List[str] = STATIC_URL.findall(page.text)
+    if plain:
+        urls = [f"/static/{asset_manifest.get(url.rsplit('/', 1)[-1]).name}" for url in urls]
+    for url in urls:
+        cache_control, etag = cache.get(url, ("", ""))
+        if "immutable" in cache_control:
+            continue
+        response = client.get(url, headers={**headers, "If-None-Match": etag} if etag else headers)
+        requests += 1
+        received += response.num_bytes_downloaded
+        if response.is_success:
+            cache[url] = (response.headers.get("cache-control", ""), response.headers["etag"])
+    return requests, received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--max-share", type=float, default=0.4)
+    parser.add_argument("--encoding", default="br, gzip")
+    args = parser.parse_args()
+
+    shutil.rmtree(asset_manifest.build_dir, ignore_errors=True)
+    results = {}
+    with TestClient(app) as client:
+        for name, encoding, plain in (
+            ("plain", "identity", True),
+            ("hashed", args.encoding, False),
+        ):
+            cache: Dict[str, Tuple[str, str]] = {}
+            results[name] = (
+                load_page(client, encoding, plain, cache),
+                load_page(client, encoding, plain, cache),
+            )
+
+    print(f"{'assets':>8} {'load':>5} {'requests':>9} {'KiB':>8}")
+    for name, loads in results.items():
+        for load, (requests, received) in zip(("cold", "warm"), loads, strict=True):
+            print(f"{name:>8} {load:>5} {requests:>9} {received / 1024:>8.1f}")
+
+    (_, plain_cold), _ = results["plain"]
+    (_, hashed_cold), (hashed_warm_requests, _) = results["hashed"]
+    share = hashed_cold / plain_cold
+    print(f"hashed cold load is {share:.0%} of the plain one (budget {args.max_share:.0%})")
+    if share > args.max_share or hashed_warm_requests != 1:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Local stand-in for the parts of Zoho One / Zoho People the browser automation touches.
+
+Pages use the same selectors as attctrl.browser: the sign-in form, the optional post-login
+screens (MFA reminder, daily limit warning), the daily sign-in limit, the dashboard with
+the peopleLoadFrame iframe holding the Check-in/Check-out button, and the sign-out menu.
+The attendance action used by the HTTP backend of attctrl.attendance is served as well.
+Every response can be delayed to mimic a slow Zoho.
+
+Usage: python benchmarks/fake_zoho.py [port]
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Set
+from uuid import uuid4
+
+import uvicorn
+from fastapi import FastAPI, Form, Request
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+
+SESSION_COOKIE = "fake_zoho_session"
+CSRF_COOKIE = "CSRF_TOKEN"
+
+SIGNIN_PAGE = """<!doctype html>
+<html><body>
+<form id="signin" method="post" action="/signin">
+  <input name="login" placeholder="Email address or mobile number">
+  <div id="password-step" hidden><input name="password" type="password" placeholder="Enter password"></div>
+  <div id="limit" hidden>You've reached your daily sign-in limit.</div>
+  <div id="error" hidden>Incorrect password. Please try again.</div>
+  <button id="nextbtn" type="button">Next</button>
+</form>
+<script>
+  const form = document.getElementById("signin");
+  document.getElementById("nextbtn").addEventListener("click", async () => {
+    const step = document.getElementById("password-step");
+    if (!step.hidden) { form.submit(); return; }
+    const response = await fetch("/signin/lookup", {method: "POST"});
+    const data = await response.json();
+    document.getElementById(data.limit ? "limit" : "password-step").hidden = false;
+  });
+</script>
+</body></html>"""
+
+MFA_PAGE = """<!doctype html>
+<html><body><p>Secure your account with MFA</p><a href="/dashboard">Remind me later</a></body></html>"""
+
+LIMIT_WARNING_PAGE = """<!doctype html>
+<html><body><p>You are close to the daily sign-in limit.</p>
+<button id="continue_button" onclick="location.href='/dashboard'">I understand</button>
+</body></html>"""
+
+DASHBOARD_PAGE = """<!doctype html>
+<html><body>
+<div class="_unifiedui-profile-dp" onclick="document.getElementById('menu').hidden = false">Me</div>
+<div id="menu" hidden><span onclick="location.href='/signout'">Sign Out</span></div>
+<iframe id="peopleLoadFrame" src="/people/attendance" width="800" height="400"></iframe>
+</body></html>"""
+
+ATTENDANCE_PAGE = """<!doctype html>
+<html><body>
+<button id="att">{state} 00:00:00</button>
+<script>
+  document.getElementById("att").addEventListener("click", async (event) => {{
+    const response = await fetch("/people/attendance/switch", {{method: "POST"}});
+    const data = await response.json();
+    event.target.textContent = data.state + " 00:00:00";
+  }});
+</script>
+</body></html>"""
+
+LOGOUT_PAGE = """<!doctype html><html><body>Signed out</body></html>"""
+
+
+@dataclass
+class FakeZohoState:
+    """
+    Server behaviour, can be changed while the server is running.
+
+    :param latency: Delay in seconds added to every response
+    :param post_login: Screen shown after the password step: '', 'mfa' or 'limit_warning'
+    :param daily_limit: Show the daily sign-in limit instead of the password step
+    :param company_id: Accepted company id, any if empty
+    :param password: Accepted password, any if empty
+    """
+
+    latency: float = 0.0
+    post_login: str = ""
+    daily_limit: bool = False
+    company_id: str = ""
+    password: str = ""
+    checked_in: bool = False
+    sessions: Set[str] = field(default_factory=set)
+    logins: int = 0
+    http_actions: int = 0
+
+
+def create_app(state: FakeZohoState) -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def add_latency(request: Request, call_next):
+        if state.latency:
+            await asyncio.sleep(state.latency)
+        return await call_next(request)
+
+    def is_signed_in(request: Request) -> bool:
+        return request.cookies.get(SESSION_COOKIE) in state.sessions
+
+    @app.get("/zohoone/{company_id}/home/cxapp/people/")
+    async def home(request: Request, company_id: str):
+        if state.company_id and company_id != state.company_id:
+            return HTMLResponse("Unknown company", status_code=404)
+        return RedirectResponse("/dashboard" if is_signed_in(request) else "/signin")
+
+    @app.get("/signin", response_class=HTMLResponse)
+    async def signin_page():
+        return SIGNIN_PAGE
+
+    @app.post("/signin/lookup")
+    async def signin_lookup():
+        return JSONResponse({"limit": state.daily_limit})
+
+    @app.post("/signin")
+    async def signin(login: str = Form(...), password: str = Form(...)):
+        if not login or (state.password and password != state.password):
+            return HTMLResponse(SIGNIN_PAGE.replace('id="error" hidden', 'id="error"'))
+        state.logins += 1
+        session = uuid4().hex
+        state.sessions.add(session)
+        target = {"mfa": "/announcement/mfa", "limit_warning": "/announcement/limit"}
+        response = RedirectResponse(target.get(state.post_login, "/dashboard"), status_code=303)
+        response.set_cookie(SESSION_COOKIE, session)
+        response.set_cookie(CSRF_COOKIE, session[:16])
+        return response
+
+    @app.get("/announcement/mfa", response_class=HTMLResponse)
+    async def mfa_reminder():
+        return MFA_PAGE
+
+    @app.get("/announcement/limit", response_class=HTMLResponse)
+    async def limit_warning():
+        return LIMIT_WARNING_PAGE
+
+    @app.get("/dashboard", response_class=HTMLResponse)
+    async def dashboard(request: Request):
+        if not is_signed_in(request):
+            return RedirectResponse("/signin")
+        return DASHBOARD_PAGE
+
+    @app.get("/people/attendance", response_class=HTMLResponse)
+    async def attendance():
+        return ATTENDANCE_PAGE.format(state="Check-out" if state.checked_in else "Check-in")
+
+    @app.post("/people/attendance/switch")
+    async def switch_attendance(request: Request):
+        if not is_signed_in(request):
+            return JSONResponse({"error": "not signed in"}, status_code=401)
+        state.checked_in = not state.checked_in
+        return JSONResponse({"state": "Check-out" if state.checked_in else "Check-in"})
+
+    @app.post("/{company_id}/AttendanceAction.zp")
+    async def attendance_action(
+        request: Request, company_id: str, mode: str = Form(...), conreqcsr: str = Form("")
+    ):
+        if state.company_id and company_id != state.company_id:
+            return JSONResponse({"error": "unknown company"}, status_code=404)
+        if not is_signed_in(request):
+            return RedirectResponse("/signin")
+        if conreqcsr != request.cookies.get(CSRF_COOKIE):
+            return JSONResponse({"error": "invalid csrf token"}, status_code=403)
+        state.http_actions += 1
+        if mode in ("punchIn", "punchOut"):
+            if state.checked_in == (mode == "punchIn"):
+                return JSONResponse({"error": f"already {mode}"})
+            state.checked_in = mode == "punchIn"
+        elif mode != "getStatus":
+            return JSONResponse({"error": f"unknown mode {mode}"}, status_code=400)
+        return JSONResponse({"checkedIn": state.checked_in})
+
+    @app.get("/signout")
+    async def signout(request: Request):
+        state.sessions.discard(request.cookies.get(SESSION_COOKIE))
+        response = RedirectResponse("/logout.html")
+        response.delete_cookie(SESSION_COOKIE)
+        return response
+
+    @app.get("/logout.html", response_class=HTMLResponse)
+    async def logout_page():
+        return LOGOUT_PAGE
+
+    return app
+
+
+class FakeZohoServer:
+    """
+    Runs the stand-in server on a background thread.
+    """
+
+    def __init__(self, state: FakeZohoState, port: int = 9899) -> None:
+        self.state = state
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(
+            uvicorn.Config(create_app(state), host="127.0.0.1", port=port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.05)
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 9899
+    uvicorn.run(create_app(FakeZohoState()), host="127.0.0.1", port=port)
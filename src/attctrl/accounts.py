@@ -0,0 +1,159 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from pydantic import BaseModel, Field
+
+from attctrl.config import Config
+from attctrl.crypto import Cipher, InvalidToken, cipher
+from attctrl.logger import new_logger
+from attctrl.session import get_session_store
+
+logger = new_logger(__name__)
+
+DEFAULT_ACCOUNT_ID = "default"
+
+
+class Account(BaseModel):
+    id: str
+    name: str
+    username: str
+    password: str = Field(repr=False)
+    company_id: str
+    geoloc_lat: float = Config.GEOLOC_LAT
+    geoloc_long: float = Config.GEOLOC_LONG
+
+    @property
+    def login_link(self) -> str:
+        return f"{Config.ZOHO_ONE_URL}/zohoone/{self.company_id}/home/cxapp/people/"
+
+    @property
+    def geolocation(self) -> Dict[str, float]:
+        return {"latitude": self.geoloc_lat, "longitude": self.geoloc_long}
+
+
+class AccountStore:
+    """
+    Zoho accounts the app can act for.
+
+    The default account always comes from the env config. Extra accounts are kept encrypted
+    in the data dir, so one app instance can run check-ins for the whole team. The file is
+    read again when another worker changed it.
+    """
+
+    def __init__(self, data_dir: Path = Config.DATA_DIR, store_cipher: Cipher = cipher) -> None:
+        self.accounts_file = Path(data_dir, "accounts.bin")
+        self._cipher = store_cipher
+        self._accounts: Optional[Dict[str, Account]] = None
+        self._mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _default_account() -> Account:
+        return Account(
+            id=DEFAULT_ACCOUNT_ID,
+            name=Config.ZOHO_USERNAME,
+            username=Config.ZOHO_USERNAME,
+            password=Config.ZOHO_PASSWORD,
+            company_id=Config.ZOHO_COMPANY_ID,
+        )
+
+    def _load(self) -> Dict[str, Account]:
+        try:
+            mtime = self.accounts_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self._accounts is None or mtime != self._mtime:
+            self._accounts = {}
+            if mtime is not None:
+                try:
+                    data = json.loads(self._cipher.decrypt(self.accounts_file.read_bytes()))
+                    self._accounts = {item["id"]: Account(**item) for item in data}
+                except (InvalidToken, ValueError) as e:
+                    logger.error(f"Failed to read stored accounts: {e}")
+            self._mtime = mtime
+        return self._accounts
+
+    def _save(self):
+        data = json.dumps([account.model_dump() for account in self._load().values()])
+        tmp_file = self.accounts_file.with_suffix(".tmp")
+        tmp_file.write_bytes(self._cipher.encrypt(data.encode()))
+        tmp_file.replace(self.accounts_file)
+        self._mtime = self.accounts_file.stat().st_mtime_ns
+
+    def get_accounts(self) -> List[Account]:
+        """
+        Get all accounts, the default one first.
+        """
+        with self._lock:
+            return [self._default_account(), *self._load().values()]
+
+    def get_account(self, account_id: str) -> Optional[Account]:
+        """
+        Get an account by its identifier.
+
+        :param account_id: Account identifier
+        :return: Account or None if it is not found
+        """
+        if account_id == DEFAULT_ACCOUNT_ID:
+            return self._default_account()
+        with self._lock:
+            return self._load().get(account_id)
+
+    def add_account(
+        self,
+        name: str,
+        username: str,
+        password: str,
+        company_id: str,
+        geoloc_lat: Optional[float] = None,
+        geoloc_long: Optional[float] = None,
+    ) -> Account:
+        """
+        Store a new account.
+
+        :param name: Display name of the account
+        :param username: Zoho login
+        :param password: Zoho password
+        :param company_id: Zoho One company identifier
+        :param geoloc_lat: Check-in latitude (def: GEOLOC_LAT)
+        :param geoloc_long: Check-in longitude (def: GEOLOC_LONG)
+        :return: Created account
+        """
+        account = Account(
+            id=uuid4().hex[:8],
+            name=name,
+            username=username,
+            password=password,
+            company_id=company_id,
+            geoloc_lat=Config.GEOLOC_LAT if geoloc_lat is None else geoloc_lat,
+            geoloc_long=Config.GEOLOC_LONG if geoloc_long is None else geoloc_long,
+        )
+        with self._lock:
+            self._load()[account.id] = account
+            self._save()
+        logger.info(f"Account '{name}' added successfully")
+        return account
+
+    def remove_account(self, account_id: str):
+        """
+        Remove an account and its cached session.
+
+        :param account_id: Account identifier
+        """
+        if account_id == DEFAULT_ACCOUNT_ID:
+            logger.error("Default account comes from the app config and can't be removed")
+            return
+        with self._lock:
+            account = self._load().pop(account_id, None)
+            if account is None:
+                logger.error(f"Account '{account_id}' not found")
+                return
+            self._save()
+        get_session_store(account_id).remove()
+        logger.info(f"Account '{account.name}' removed successfully")
+
+
+account_store = AccountStore()
@@ -0,0 +1,155 @@
+import asyncio
+import copy
+import heapq
+import itertools
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from apscheduler.triggers.cron import CronTrigger
+
+from attctrl.config import Config
+from attctrl.logger import new_logger
+from attctrl.metrics import task_admission_wait_seconds, tasks_queued, tasks_running
+
+logger = new_logger(__name__)
+
+# Lower value is admitted first, so a check-out never takes the slot of a waiting check-in.
+TASK_PRIORITIES = {"zoho_check_in": 0, "zoho_test": 1, "zoho_check_out": 2}
+DEFAULT_PRIORITY = 1
+
+
+def get_priority(func_name: str) -> int:
+    return TASK_PRIORITIES.get(func_name, DEFAULT_PRIORITY)
+
+
+class SpreadCronTrigger(CronTrigger):
+    """
+    Cron trigger firing at the nominal time, its jitter is only kept as the allowed window.
+
+    The offset inside the window is picked when the job fires: random like the jitter of
+    CronTrigger for a single job, spread evenly for jobs colliding in the same minute instead
+    of stacked by random jitter. With TASK_SPREAD disabled the trigger is a plain CronTrigger.
+    """
+
+    def _apply_jitter(self, next_fire_time, jitter, now):
+        if Config.TASK_SPREAD:
+            return next_fire_time
+        return super()._apply_jitter(next_fire_time, jitter, now)
+
+    @classmethod
+    def from_trigger(cls, trigger: CronTrigger) -> "SpreadCronTrigger":
+        """
+        Convert a stored cron trigger keeping its fields, timezone and jitter.
+        """
+        spread = cls.__new__(cls)
+        spread.__setstate__(trigger.__getstate__())
+        return spread
+
+
+def nominal_fire_time(trigger: CronTrigger, now: datetime) -> Optional[datetime]:
+    """
+    Get the first fire time of the trigger at or after the given time, jitter not applied.
+    """
+    if trigger.jitter:
+        trigger = copy.copy(trigger)
+        trigger.jitter = None
+    return trigger.get_next_fire_time(None, now)
+
+
+def spread_offsets(jobs: Sequence[Tuple[str, int, int]], phase: float = 0.0) -> Dict[str, float]:
+    """
+    Spread jobs firing at the same time over their jitter windows.
+
+    Jobs are ordered by priority and id, so check-ins start first, and the n-th of N jobs
+    starts (n + phase)/N into its own window. Jobs without jitter always start on time.
+
+    :param jobs: Colliding jobs as (job id, priority, jitter in seconds)
+    :param phase: Shift of the whole group within the first slot, from 0 up to 1
+    :return: Start offset in seconds by job id
+    """
+    ordered = sorted(jobs, key=lambda job: (job[1], job[0]))
+    return {
+        job_id: (jitter or 0) * (slot + phase) / len(ordered)
+        for slot, (job_id, _, jitter) in enumerate(ordered)
+    }
+
+
+def group_phase(fire_time: datetime) -> float:
+    """
+    Random phase of the jobs colliding at a fire time, see spread_offsets. It's the same for
+    all jobs of the group and on every worker, and changes from day to day.
+
+    :param fire_time: Nominal fire time of the group
+    """
+    return random.Random(fire_time.isoformat()).random()
+
+
+class AdmissionController:
+    """
+    Caps the number of browser tasks running at the same time.
+
+    Tasks over the limit wait in a priority queue, ties are admitted in arrival order.
+    A slot freed by a finished task is handed straight to the next waiting task.
+
+    :param max_running: Max number of tasks running at the same time
+    """
+
+    def __init__(self, max_running: int = Config.TASK_MAX_RUNNING) -> None:
+        self.max_running = max(1, max_running)
+        self._running = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, waiter in self._waiters if not waiter.done())
+
+    def _release(self):
+        while self._waiters:
+            *_, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._running -= 1
+        tasks_running.set(self._running)
+
+    @asynccontextmanager
+    async def admit(self, priority: int, name: str) -> AsyncIterator[None]:
+        """
+        Wait for a free slot and hold it for the duration of the block.
+
+        :param priority: Task priority, lower value is admitted first
+        :param name: Task name for the logs
+        """
+        start = time.perf_counter()
+        if self._running < self.max_running and not self.queued:
+            self._running += 1
+            tasks_running.set(self._running)
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._counter), waiter))
+            tasks_queued.set(self.queued)
+            logger.info(f"{name}: {self._running} tasks running, waiting for a free slot")
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                raise
+            finally:
+                tasks_queued.set(self.queued)
+        task_admission_wait_seconds.observe(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self._release()
+
+
+admission_controller = AdmissionController()
@@ -1,56 +1,199 @@
+import asyncio
+import hashlib
+import importlib
+import json
 import os
-from datetime import datetime
-from typing import Optional
+import sys
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import Annotated, Awaitable, Callable, Dict, List, Optional, Tuple, get_args
+from urllib.parse import urlencode
 
 import pytz
-import sentry_sdk
-from fastapi import Depends, FastAPI, Form, HTTPException, Request, Security, status
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from fastapi.security import APIKeyHeader
-from fastapi.staticfiles import StaticFiles
+from fastapi import (
+    Depends,
+    FastAPI,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Security,
+    UploadFile,
+    status,
+)
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
+from fastapi.security import APIKeyCookie, APIKeyHeader
 from fastapi.templating import Jinja2Templates
 
-from attctrl.browser import zoho_check_in, zoho_check_out, zoho_test
+from attctrl.accounts import DEFAULT_ACCOUNT_ID, account_store
+from attctrl.artifacts import artifact_store
+from attctrl.assets import AssetFiles, asset_manifest
 from attctrl.config import Config
-from attctrl.logger import new_logger, notification_queue
-from attctrl.scheduler import TaskScheduler
+from attctrl.coordinator import SchedulerCoordinator
+from attctrl.holidays import ALL_ACCOUNTS, holiday_calendar, parse_days_off
+from attctrl.logger import log_pipeline, new_logger, notification_broker
+from attctrl.logview import LOG_LEVELS, LogPage, log_reader
+from attctrl.metrics import registry
+from attctrl.runs import run_history
+from attctrl.schedules import (
+    BackendName,
+    ScheduleTemplate,
+    TaskSpec,
+    schedule_template_store,
+    specs_from_csv,
+    specs_from_json,
+    specs_to_csv,
+    specs_to_json,
+)
+from attctrl.scheduler import Task, TaskScheduler
+from attctrl.session import get_session_store
+from attctrl.timeline import ScheduleTimeline
 
 logger = new_logger(__name__)
 
 server_timezone = pytz.timezone(os.environ.get("TZ", "UTC"))
 
+if Config.LOG_FILE:
+    log_pipeline.add_log_file(
+        Config.LOG_FILE, Config.LOG_FILE_MAX_MB * 1024 * 1024, Config.LOG_FILE_BACKUPS
+    )
+
 if Config.GLITCHTIP_DNS:
+    import sentry_sdk
+
     sentry_sdk.init(Config.GLITCHTIP_DNS)
 
 API_KEY_NAME = "X-API-Key"
 
+# Paths answered while the app is still starting, so container probes do not flap.
+PROBE_PATHS = ("/health", "/ready")
+
 tasker = TaskScheduler()
+timeline = ScheduleTimeline(tasker)
+coordinator = SchedulerCoordinator(tasker, caches=(timeline,))
+
+
+def get_task_functions() -> Dict[str, Callable[..., Awaitable[bool]]]:
+    """
+    Browser task functions by task type. Playwright is imported on first use, not on app import.
+    """
+    from attctrl.browser import TASK_FUNCTIONS  # noqa: PLC0415
+
+    return TASK_FUNCTIONS
+
+
+async def start_services(app: FastAPI):
+    """
+    Start the scheduler and warm up the browser once the server is up.
+
+    Task functions, Playwright and SQLAlchemy are imported in a worker thread,
+    so /health is served meanwhile. Other requests wait for this to finish.
+    With several workers, only the elected leader runs the tasks, see SchedulerCoordinator.
+    """
+    try:
+        await asyncio.to_thread(importlib.import_module, "attctrl.browser")
+        await asyncio.to_thread(importlib.import_module, "attctrl.jobstore")
+        await coordinator.start()
+    except Exception as e:
+        logger.error(f"App failed to start: {e}")
+        raise
+    try:
+        await asyncio.to_thread(asset_manifest.build)
+    except OSError as e:
+        # NOTE: Static files are still served, just not precompressed.
+        logger.warning(f"Failed to build compressed static files: {e}")
+
+    async def start_warmup():
+        # NOTE: Isolated browser jobs launch their own browser.
+        if Config.BROWSER_WARMUP and not Config.BROWSER_ISOLATION:
+            from attctrl.pool import browser_pool  # noqa: PLC0415
+
+            app.state.browser_warmup = asyncio.create_task(browser_pool.warmup())
+
+    # NOTE: Only the worker running the tasks needs a warm browser.
+    coordinator.on_promote = start_warmup
+    if coordinator.is_leader:
+        await start_warmup()
+    logger.info("App is ready")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.startup = asyncio.create_task(start_services(app))
+    yield
+    if not app.state.startup.done():
+        app.state.startup.cancel()
+    await coordinator.stop()
+    tasker.shutdown()
+    if "attctrl.attendance" in sys.modules:
+        from attctrl.attendance import http_client  # noqa: PLC0415
+
+        await http_client.aclose()
+    if "attctrl.isolation" in sys.modules:
+        from attctrl.isolation import isolated_runner  # noqa: PLC0415
+
+        await isolated_runner.shutdown()
+    if "attctrl.pool" in sys.modules:
+        from attctrl.pool import browser_pool  # noqa: PLC0415
+
+        await browser_pool.shutdown()
+    run_history.close()
+
+
 app = FastAPI(
-    workers=1,
+    lifespan=lifespan,
     docs_url="/docs" if Config.DEBUG else None,
     redoc_url="/redoc" if Config.DEBUG else None,
 )
-app.mount("/static", StaticFiles(directory=Config.STATIC_DIR), name="static")
+app.mount("/static", AssetFiles(), name="static")
 templates = Jinja2Templates(directory=Config.TEMPLATE_DIR)
+templates.env.globals["static_url"] = asset_manifest.url
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
+api_key_cookie = APIKeyCookie(name=API_KEY_NAME, auto_error=False)
 
 
-async def verify_token(api_key_header: str = Security(api_key_header)):
+async def verify_token(
+    api_key_header: str = Security(api_key_header),
+    api_key_cookie: str = Security(api_key_cookie),
+):
     if not Config.APP_AUTH:
         return True
-    if api_key_header == Config.AUTH_TOKEN:
+    if Config.AUTH_TOKEN in (api_key_header, api_key_cookie):
         return True
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN, detail="Could not validate credentials"
     )
 
 
+@app.middleware("http")
+async def startup_middleware(request: Request, call_next):
+    startup = getattr(request.app.state, "startup", None)
+    if startup is None or request.url.path.startswith((*PROBE_PATHS, "/static")):
+        return await call_next(request)
+    try:
+        await asyncio.shield(startup)
+    except Exception:
+        return PlainTextResponse("App failed to start", status_code=503)
+    return await call_next(request)
+
+
 @app.middleware("http")
 async def auth_middleware(request: Request, call_next):
     if not Config.APP_AUTH:
         return await call_next(request)
 
-    public_paths = ["/login", "/static"]
+    public_paths = ["/login", "/static", *PROBE_PATHS]
+    if Config.METRICS_PUBLIC:
+        public_paths.append("/metrics")
 
     if any(request.url.path.startswith(path) for path in public_paths):
         return await call_next(request)
@@ -65,16 +208,130 @@ async def auth_middleware(request: Request, call_next):
     return await call_next(request)
 
 
+def task_view_context() -> dict:
+    return {
+        "tasks": tasker.get_tasks(),
+        "accounts": {account.id: account.name for account in account_store.get_accounts()},
+        "logins_limit": Config.ZOHO_DAILY_LOGIN_LIMIT,
+    }
+
+
+# Digest of the task view by task index version and account names, only the latest is kept.
+task_view_digests: Dict[Tuple[int, Tuple[Tuple[str, str], ...]], str] = {}
+
+
+def task_view_etag() -> str:
+    """
+    Validator of the rendered task table: digest of the tasks and account names, the same
+    on every worker. It's computed again only when the task index changed.
+    """
+    accounts = tuple((account.id, account.name) for account in account_store.get_accounts())
+    # NOTE: Index version only keys the cache, versions of different workers are unrelated.
+    key = (tasker.version, accounts)
+    digest = task_view_digests.get(key)
+    if digest is None:
+        tasks = sorted((task.model_dump() for task in tasker.get_tasks()), key=lambda t: t["id"])
+        view = json.dumps([tasks, accounts, Config.ZOHO_DAILY_LOGIN_LIMIT], sort_keys=True)
+        digest = hashlib.blake2b(view.encode(), digest_size=12).hexdigest()
+        task_view_digests.clear()
+        task_view_digests[key] = digest
+    return f'W/"tasks-{digest}"'
+
+
+def task_rows_response(request: Request, tasks: List[Task]) -> HTMLResponse:
+    """
+    New task rows, appended to the task table with out-of-band swaps.
+    """
+    return templates.TemplateResponse(
+        request=request,
+        name="components/task_rows.html",
+        context={
+            "tasks": tasks,
+            "accounts": {account.id: account.name for account in account_store.get_accounts()},
+        },
+    )
+
+
+def task_to_spec(task: Task) -> Optional[TaskSpec]:
+    """
+    Spec of a task for the export.
+
+    :return: Task spec or None if the task runs a function that is not a task type
+    """
+    task_type = next(
+        (key for key, func in get_task_functions().items() if func.__name__ == task.func), None
+    )
+    if task_type is None:
+        logger.warning(f"Task '{task.id}' of unknown type '{task.func}' is not exported")
+        return None
+    return TaskSpec.model_construct(
+        type=task_type,
+        account=task.account,
+        dow=task.dow,
+        time=task.time,
+        jitter=task.jitter,
+        timezone=task.timezone,
+        backend=task.backend,
+    )
+
+
+def add_task_specs(specs: List[TaskSpec]) -> List[Task]:
+    """
+    Check the accounts of the tasks and add them all in one go.
+    """
+    known_accounts = {account.id for account in account_store.get_accounts()}
+    errors = [
+        f"#{i + 1}: unknown account '{spec.account}'"
+        for i, spec in enumerate(specs)
+        if spec.account not in known_accounts
+    ]
+    if not specs:
+        errors.append("No tasks given")
+    if errors:
+        logger.error(f"Failed to add tasks: {'; '.join(errors)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="; ".join(errors))
+    try:
+        return tasker.add_tasks(specs, get_task_functions())
+    except ValueError as e:
+        logger.error(f"Failed to add tasks: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+
+def account_view_context() -> dict:
+    return {
+        "accounts": account_store.get_accounts(),
+        "logins_today": {
+            account.id: get_session_store(account.id).logins_today()
+            for account in account_store.get_accounts()
+        },
+        "logins_limit": Config.ZOHO_DAILY_LOGIN_LIMIT,
+    }
+
+
+def days_off_response(request: Request) -> HTMLResponse:
+    return templates.TemplateResponse(
+        request=request,
+        name="components/days_off_view.html",
+        context={
+            "days_off": holiday_calendar.get_days_off(since=date.today()),
+            "accounts": {account.id: account.name for account in account_store.get_accounts()},
+            "all_accounts": ALL_ACCOUNTS,
+        },
+    )
+
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     server_time = datetime.now().isoformat()
     return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
+        request=request,
+        name="index.html",
+        context={
             "Config": Config,
             "server_time": server_time,
             "server_timezone": server_timezone,
+            "accounts": account_store.get_accounts(),
+            "schedule_templates": schedule_template_store.get_templates(),
         },
     )
 
@@ -84,13 +341,61 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    startup = getattr(app.state, "startup", None)
+    if startup is None or not startup.done():
+        return JSONResponse({"status": "starting"}, status_code=503)
+    if startup.cancelled() or startup.exception() is not None or not tasker.running:
+        return JSONResponse({"status": "failed"}, status_code=503)
+    warmup = getattr(app.state, "browser_warmup", None)
+    return {
+        "status": "ready",
+        "role": coordinator.role,
+        "browser": "cold" if warmup is None else "warm" if warmup.done() else "warming",
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/notifications")
-async def get_notifications(token: bool = Depends(verify_token)):
+async def get_notifications(cursor: int = 0, token: bool = Depends(verify_token)):
     if not token:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
-    notifications = list(notification_queue)
-    notification_queue.clear()
-    return JSONResponse(content={"notifications": notifications})
+    notifications = notification_broker.get_since(cursor)
+    return JSONResponse(
+        content={"notifications": notifications, "cursor": notification_broker.last_id}
+    )
+
+
+@app.get("/notifications/stream")
+async def stream_notifications(
+    last_event_id: Optional[str] = Header(None),
+    cursor: Optional[int] = None,
+    token: bool = Depends(verify_token),
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    if last_event_id is not None:
+        cursor = notification_broker.parse_event_id(last_event_id)
+
+    async def event_stream():
+        yield "retry: 3000\n\n"
+        async for notifications in notification_broker.subscribe(cursor):
+            if not notifications:
+                yield ": keep-alive\n\n"
+            for notification in notifications:
+                event_id = notification_broker.event_id(notification)
+                yield f"id: {event_id}\ndata: {json.dumps(notification)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/notifications/test")
@@ -110,10 +415,15 @@ async def view_tasks(request: Request, token: bool = Depends(verify_token)):
     if not token:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
 
+    etag = task_view_etag()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     return templates.TemplateResponse(
         request=request,
         name="components/task_view.html",
-        context={"tasks": tasker.get_tasks()},
+        context=task_view_context(),
+        headers=headers,
     )
 
 
@@ -123,8 +433,10 @@ async def create_task(
     token: bool = Depends(verify_token),
     time: str = Form(...),
     task_type: str = Form(..., alias="task_type"),
+    account_id: str = Form(DEFAULT_ACCOUNT_ID),
     jitter: Optional[int] = Form(None),
     timezone: Optional[str] = Form(None),
+    backend: Optional[str] = Form(None),
     monday: str = Form(None),
     tuesday: str = Form(None),
     wednesday: str = Form(None),
@@ -139,52 +451,449 @@ async def create_task(
     days = ",".join(
         [day for day in [monday, tuesday, wednesday, thursday, friday, saturday, sunday] if day]
     )
-    task_function = {
-        "checkin": zoho_check_in,
-        "checkout": zoho_check_out,
-        "test": zoho_test,
-    }.get(task_type)
+    task_function = get_task_functions().get(task_type)
 
+    task = None
     if task_function:
-        tasker.add_task(
+        task = tasker.add_task(
             task_func=task_function,
             day_of_week=days,
             time=time,
             jitter=jitter,
             timezone=timezone,
+            account_id=account_id,
+            backend=backend if backend in get_args(BackendName) else None,
         )
+    if task is None:
+        return HTMLResponse("")
 
-    return templates.TemplateResponse(
-        request=request,
-        name="components/task_view.html",
-        context={"tasks": tasker.get_tasks()},
-    )
+    response = task_rows_response(request, [task])
+    response.headers["HX-Trigger"] = "tasks-changed"
+    return response
 
 
 @app.get("/tasks/add_test_task")
 async def add_test_task(_: Request, token: bool = Depends(verify_token)):
     if not token:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
-    tasker.add_task(zoho_test, "mon,tue,wed,thu,fri", "19:25:00")
+    tasker.add_task(get_task_functions()["test"], "mon,tue,wed,thu,fri", "19:25:00")
     return {"message": "Test task added successfully"}
 
 
+@app.post("/tasks/{task_id}/run")
+async def run_task(task_id: str, token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    try:
+        result = await coordinator.run_task(task_id)
+    except OSError as e:
+        logger.error(f"Failed to reach the scheduler leader: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Scheduler is not available"
+        ) from e
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return {"task_id": task_id, "success": bool(result)}
+
+
 @app.delete("/tasks/{task_id}", response_class=HTMLResponse)
-async def delete_task(request: Request, task_id: str, token: bool = Depends(verify_token)):
+async def delete_task(task_id: str, token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    if not tasker.remove_task(task_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return HTMLResponse("", headers={"HX-Trigger": "tasks-changed"})
+
+
+@app.delete("/tasks")
+async def delete_tasks(
+    ids: Annotated[Optional[List[str]], Query(alias="id")] = None,
+    account_id: Optional[str] = None,
+    token: bool = Depends(verify_token),
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    if not ids and not account_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No tasks selected")
+
+    task_ids = list(ids or [])
+    if account_id:
+        task_ids += [task.id for task in tasker.get_tasks() if task.account == account_id]
+    removed = tasker.remove_tasks(task_ids)
+    return JSONResponse({"removed": removed}, headers={"HX-Trigger": "tasks-changed"})
+
+
+@app.post("/tasks/bulk")
+async def create_tasks(specs: List[TaskSpec], token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    return add_task_specs(specs)
+
+
+@app.get("/tasks/timeline")
+async def get_timeline(
+    limit: int = 20, account_id: Optional[str] = None, token: bool = Depends(verify_token)
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    return timeline.get_timeline(limit=min(limit, 200), account=account_id)
+
+
+@app.get("/tasks/timeline/view", response_class=HTMLResponse)
+async def view_timeline(request: Request, token: bool = Depends(verify_token)):
     if not token:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
 
-    tasker.remove_task(task_id)
     return templates.TemplateResponse(
         request=request,
-        name="components/task_view.html",
-        context={"tasks": tasker.get_tasks()},
+        name="components/timeline_view.html",
+        context={
+            "entries": timeline.get_timeline(),
+            "accounts": {account.id: account.name for account in account_store.get_accounts()},
+        },
     )
 
 
+@app.get("/tasks/export")
+async def export_tasks(
+    fmt: str = Query("json", alias="format"), token: bool = Depends(verify_token)
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    specs = [spec for spec in map(task_to_spec, tasker.get_tasks()) if spec is not None]
+    if fmt == "csv":
+        content, media_type = specs_to_csv(specs), "text/csv"
+    elif fmt == "json":
+        content, media_type = specs_to_json(specs), "application/json"
+    else:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown format")
+    headers = {"Content-Disposition": f'attachment; filename="tasks.{fmt}"'}
+    return Response(content, media_type=media_type, headers=headers)
+
+
+@app.post("/tasks/import", response_class=HTMLResponse)
+async def import_tasks(request: Request, file: UploadFile, token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    data = (await file.read()).decode("utf-8-sig")
+    is_csv = (file.filename or "").lower().endswith(".csv") or file.content_type == "text/csv"
+    try:
+        specs = specs_from_csv(data) if is_csv else specs_from_json(data)
+    except ValueError as e:
+        logger.error(f"Failed to import tasks: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    tasks = add_task_specs(specs)
+    response = task_rows_response(request, tasks)
+    response.headers["HX-Trigger"] = "tasks-changed"
+    return response
+
+
+@app.get("/tasks/templates")
+async def get_schedule_templates(token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    return schedule_template_store.get_templates()
+
+
+@app.post("/tasks/templates")
+async def save_schedule_template(template: ScheduleTemplate, token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    schedule_template_store.save_template(template)
+    return template
+
+
+@app.delete("/tasks/templates/{name}")
+async def delete_schedule_template(name: str, token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    if not schedule_template_store.remove_template(name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found")
+    return {"status": "ok"}
+
+
+@app.post("/tasks/templates/apply", response_class=HTMLResponse)
+async def apply_schedule_template(
+    request: Request,
+    name: str = Form(...),
+    account_id: str = Form(DEFAULT_ACCOUNT_ID),
+    token: bool = Depends(verify_token),
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    template = schedule_template_store.get_template(name)
+    if template is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found")
+    tasks = add_task_specs(template.for_account(account_id))
+    return task_rows_response(request, tasks)
+
+
+HISTORY_PAGE_SIZE = 20
+
+
+async def history_rows_context(
+    before_id: Optional[int],
+    account: Optional[str],
+    outcome: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+) -> dict:
+    try:
+        runs = await asyncio.to_thread(
+            run_history.get_runs,
+            HISTORY_PAGE_SIZE + 1,
+            before_id,
+            account or None,
+            outcome or None,
+            date.fromisoformat(date_from) if date_from else None,
+            date.fromisoformat(date_to) if date_to else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    filters = {
+        "account": account or "",
+        "outcome": outcome or "",
+        "date_from": date_from or "",
+        "date_to": date_to or "",
+    }
+    return {
+        "runs": runs[:HISTORY_PAGE_SIZE],
+        "has_more": len(runs) > HISTORY_PAGE_SIZE,
+        "filters": filters,
+        "account_names": {account.id: account.name for account in account_store.get_accounts()},
+    }
+
+
+@app.get("/history", response_class=HTMLResponse)
+async def view_history(
+    request: Request,
+    token: bool = Depends(verify_token),
+    account: Optional[str] = None,
+    outcome: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    context = await history_rows_context(None, account, outcome, date_from, date_to)
+    context["accounts"] = account_store.get_accounts()
+    return templates.TemplateResponse(
+        request=request, name="components/history_view.html", context=context
+    )
+
+
+@app.get("/history/rows", response_class=HTMLResponse)
+async def view_history_rows(
+    request: Request,
+    token: bool = Depends(verify_token),
+    before_id: Optional[int] = None,
+    account: Optional[str] = None,
+    outcome: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    return templates.TemplateResponse(
+        request=request,
+        name="components/history_rows.html",
+        context=await history_rows_context(before_id, account, outcome, date_from, date_to),
+    )
+
+
+LOG_PAGE_SIZE = 100
+# Levels shown until the filter is changed.
+DEFAULT_LOG_LEVELS = ("INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+async def log_rows_context(
+    before: Optional[str], after: Optional[str], level: Optional[List[str]], q: str
+) -> dict:
+    if log_reader is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Log file is disabled")
+    levels = [name for name in level or DEFAULT_LOG_LEVELS if name in LOG_LEVELS]
+    try:
+        if after is not None:
+            page: LogPage = await asyncio.to_thread(
+                log_reader.read_after, after, LOG_PAGE_SIZE * 5, levels, q
+            )
+        else:
+            page = await asyncio.to_thread(log_reader.read_before, before, LOG_PAGE_SIZE, levels, q)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    return {
+        "page": page,
+        "levels": levels,
+        "query": q,
+        "filters": urlencode({"level": levels, "q": q}, doseq=True),
+        "follow": before is None,
+        "older": after is None,
+    }
+
+
+@app.get("/logs", response_class=HTMLResponse)
+async def view_logs(
+    request: Request,
+    token: bool = Depends(verify_token),
+    level: Annotated[Optional[List[str]], Query()] = None,
+    q: str = "",
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    context = {"enabled": log_reader is not None, "all_levels": LOG_LEVELS}
+    if log_reader is not None:
+        context.update(await log_rows_context(None, None, level, q))
+    return templates.TemplateResponse(
+        request=request, name="components/log_view.html", context=context
+    )
+
+
+@app.get("/logs/rows", response_class=HTMLResponse)
+async def view_log_rows(
+    request: Request,
+    token: bool = Depends(verify_token),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    level: Annotated[Optional[List[str]], Query()] = None,
+    q: str = "",
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    context = await log_rows_context(before, after, level, q)
+    if after is not None and context["page"].after == after:
+        # NOTE: Nothing new, HTMX keeps the polling row as it is.
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return templates.TemplateResponse(
+        request=request, name="components/log_rows.html", context=context
+    )
+
+
+@app.get("/artifacts/{run_key}/{name}")
+async def get_artifact(run_key: str, name: str, token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    try:
+        path = artifact_store.path(run_key, name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artifact not found")
+    # NOTE: Traces are opened with 'playwright show-trace' or on trace.playwright.dev.
+    filename = f"{run_key}-{name}" if path.suffix == ".zip" else None
+    return FileResponse(path, filename=filename)
+
+
+@app.get("/accounts", response_class=HTMLResponse)
+async def view_accounts(request: Request, token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    return templates.TemplateResponse(
+        request=request,
+        name="components/account_view.html",
+        context=account_view_context(),
+    )
+
+
+@app.post("/accounts", response_class=HTMLResponse)
+async def create_account(
+    request: Request,
+    token: bool = Depends(verify_token),
+    name: str = Form(...),
+    username: str = Form(...),
+    password: str = Form(...),
+    company_id: str = Form(...),
+    geoloc_lat: Optional[float] = Form(None),
+    geoloc_long: Optional[float] = Form(None),
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    account_store.add_account(name, username, password, company_id, geoloc_lat, geoloc_long)
+    return templates.TemplateResponse(
+        request=request,
+        name="components/account_view.html",
+        context=account_view_context(),
+    )
+
+
+@app.delete("/accounts/{account_id}", response_class=HTMLResponse)
+async def delete_account(request: Request, account_id: str, token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    if any(task.account == account_id for task in tasker.get_tasks()):
+        logger.error("Account still has scheduled tasks. Remove them first.")
+    else:
+        account_store.remove_account(account_id)
+    return templates.TemplateResponse(
+        request=request,
+        name="components/account_view.html",
+        context=account_view_context(),
+    )
+
+
+@app.get("/days-off", response_class=HTMLResponse)
+async def view_days_off(request: Request, token: bool = Depends(verify_token)):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    return days_off_response(request)
+
+
+@app.post("/days-off", response_class=HTMLResponse)
+async def import_days_off(
+    request: Request,
+    token: bool = Depends(verify_token),
+    account_id: str = Form(ALL_ACCOUNTS),
+    file: Optional[UploadFile] = None,
+    dates: str = Form(""),
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    if account_id != ALL_ACCOUNTS and account_store.get_account(account_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
+    data = (await file.read()).decode("utf-8-sig") if file is not None else ""
+    try:
+        days = {**parse_days_off(data), **parse_days_off(dates)}
+    except ValueError as e:
+        logger.error(f"Failed to import days off: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    await asyncio.to_thread(holiday_calendar.add_days, account_id, days)
+    response = days_off_response(request)
+    response.headers["HX-Trigger"] = "days-off-changed"
+    return response
+
+
+@app.delete("/days-off/{account_id}/{day}", response_class=HTMLResponse)
+async def delete_day_off(
+    request: Request, account_id: str, day: date, token: bool = Depends(verify_token)
+):
+    if not token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    await asyncio.to_thread(holiday_calendar.remove_day, account_id, day)
+    response = days_off_response(request)
+    response.headers["HX-Trigger"] = "days-off-changed"
+    return response
+
+
 @app.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request, "Config": Config})
+    return templates.TemplateResponse(
+        request=request, name="login.html", context={"Config": Config}
+    )
 
 
 @app.post("/login")
@@ -201,8 +910,9 @@ async def login(request: Request, username: str = Form(...), password: str = For
         return response
     else:
         return templates.TemplateResponse(
-            "login.html",
-            {"request": request, "Config": Config, "error": "Invalid credentials"},
+            request=request,
+            name="login.html",
+            context={"Config": Config, "error": "Invalid credentials"},
             status_code=400,
         )
 
@@ -0,0 +1,176 @@
+import random
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Tuple
+from uuid import uuid4
+
+from attctrl.config import Config
+from attctrl.logger import new_logger
+from attctrl.runs import note_run_artifact
+
+logger = new_logger(__name__)
+
+
+class ArtifactStore:
+    """
+    Bounded on-disk store of failure artifacts of task runs (screenshots, Playwright traces).
+
+    Every run writes into its own directory. Pruning drops whole runs, oldest first, once they
+    are older than the max age or the store grows over the max size.
+
+    :param data_dir: Directory the 'artifacts' folder is created in
+    :param max_bytes: Max total size of the stored artifacts
+    :param max_age_days: Max age of a stored run
+    """
+
+    def __init__(
+        self,
+        data_dir: Path = Config.DATA_DIR,
+        max_bytes: int = Config.ARTIFACTS_MAX_MB * 1024 * 1024,
+        max_age_days: float = Config.ARTIFACTS_MAX_AGE_DAYS,
+    ) -> None:
+        self.root = Path(data_dir, "artifacts")
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 24 * 3600
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_key(label: str) -> str:
+        return f"{datetime.now():%Y%m%d-%H%M%S}-{label}-{uuid4().hex[:6]}"
+
+    def path(self, run_key: str, name: str) -> Path:
+        """
+        Path of an artifact. Both parts must be plain names, so a path from a request can't
+        point outside of the store.
+
+        :param run_key: Directory of the run
+        :param name: File name of the artifact
+        :raises ValueError: If a part is not a plain name
+        """
+        for part in (run_key, name):
+            if not part or part.startswith(".") or "/" in part or "\\" in part:
+                raise ValueError(f"Invalid artifact path part '{part}'")
+        return Path(self.root, run_key, name)
+
+    def _runs(self) -> List[Tuple[float, int, Path]]:
+        runs = []
+        for run_dir in self.root.iterdir():
+            files = [file.stat() for file in run_dir.iterdir() if file.is_file()]
+            mtime = max((stat.st_mtime for stat in files), default=run_dir.stat().st_mtime)
+            runs.append((mtime, sum(stat.st_size for stat in files), run_dir))
+        return sorted(runs)
+
+    def prune(self) -> int:
+        """
+        Drop runs over the age and size limits, oldest first.
+
+        :return: Number of dropped runs
+        """
+        if not self.root.exists():
+            return 0
+        with self._lock:
+            runs = self._runs()
+            total = sum(size for _, size, _ in runs)
+            min_mtime = time.time() - self.max_age
+            dropped = 0
+            for mtime, size, run_dir in runs:
+                if mtime >= min_mtime and total <= self.max_bytes:
+                    break
+                shutil.rmtree(run_dir, ignore_errors=True)
+                total -= size
+                dropped += 1
+        if dropped:
+            logger.debug(f"Dropped artifacts of {dropped} old runs")
+        return dropped
+
+
+artifact_store = ArtifactStore()
+
+
+class RunArtifacts:
+    """
+    Artifacts captured during one task run. Nothing is written until the run fails or its
+    trace is sampled, the directory of the run is created on the first artifact.
+
+    :param label: Readable part of the run directory name, e.g. 'do_check_in-main'
+    :param store: Store to write to
+    """
+
+    def __init__(self, label: str, store: ArtifactStore = artifact_store) -> None:
+        self.store = store
+        self.run_key = store.new_run_key(label)
+        self.names: List[str] = []
+        self.tracing = False
+
+    def _new_path(self, name: str) -> Path:
+        path = self.store.path(self.run_key, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _add(self, name: str):
+        self.names.append(name)
+        note_run_artifact(f"{self.run_key}/{name}")
+
+    async def screenshot(self, page: Any, name: str):
+        """
+        Save a full page screenshot. Errors are only logged, the page may be already gone.
+
+        :param page: Playwright page
+        :param name: File name without extension
+        """
+        if not Config.ARTIFACTS_SCREENSHOTS or page is None or page.is_closed():
+            return
+        try:
+            await page.screenshot(path=self._new_path(f"{name}.png"), full_page=True)
+            self._add(f"{name}.png")
+        except Exception as e:
+            logger.warning(f"Failed to take a failure screenshot: {e}")
+
+    async def start_trace(self, context: Any):
+        """
+        Start a Playwright trace of the context for a sampled share of runs.
+
+        :param context: Playwright browser context
+        """
+        if random.random() >= Config.ARTIFACTS_TRACE_SAMPLE:
+            return
+        try:
+            # NOTE: Starting the trace starts its first chunk.
+            await context.tracing.start(screenshots=True, snapshots=True, sources=False)
+            self.tracing = True
+        except Exception as e:
+            logger.warning(f"Failed to start tracing: {e}")
+
+    async def save_trace(self, context: Any, name: str):
+        """
+        Save the trace recorded since the last saved one, if the run is traced,
+        and go on tracing.
+
+        :param context: Playwright browser context
+        :param name: File name without extension
+        """
+        if not self.tracing:
+            return
+        try:
+            await context.tracing.stop_chunk(path=self._new_path(f"{name}.zip"))
+            self._add(f"{name}.zip")
+            await context.tracing.start_chunk()
+        except Exception as e:
+            logger.warning(f"Failed to save the trace: {e}")
+
+    async def stop_trace(self, context: Any):
+        """
+        Stop the trace, if started, dropping what was recorded since the last saved one.
+
+        :param context: Playwright browser context
+        """
+        if not self.tracing:
+            return
+        self.tracing = False
+        try:
+            await context.tracing.stop()
+        except Exception as e:
+            logger.warning(f"Failed to stop tracing: {e}")
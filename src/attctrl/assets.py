@@ -0,0 +1,213 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from attctrl.config import Config
+from attctrl.logger import new_logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = new_logger(__name__)
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Variant suffixes by content encoding, in order of preference.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class Asset:
+    """
+    Static file published under a content-hashed name.
+    """
+
+    name: str
+    url_name: str
+    source: Path
+
+    @property
+    def media_type(self) -> str:
+        return mimetypes.guess_type(self.name)[0] or "application/octet-stream"
+
+
+def fingerprint(name: str, digest: str) -> str:
+    """
+    Insert a content hash before the last suffix, 'htmx.min.js' -> 'htmx.min.<hash>.js'.
+    """
+    stem, dot, suffix = name.rpartition(".")
+    return f"{stem}.{digest}.{suffix}" if dot else f"{name}.{digest}"
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """
+    Content encodings accepted by the client, 'q=0' ones excluded.
+
+    :param accept_encoding: Value of the Accept-Encoding header
+    """
+    accepted = []
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            if params and float(q) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.append(coding.strip().lower())
+    return accepted
+
+
+class AssetManifest:
+    """
+    Content-hashed names and precompressed variants of the files in the static dir.
+
+    Names are hashed on first use, which is cheap, so a hashed URL handed out by any process
+    resolves right away. Compressed variants are written to the build dir by build(), once
+    per file content, and served only once they exist.
+
+    :param static_dir: Source files
+    :param build_dir: Directory for the compressed variants and the manifest
+    """
+
+    def __init__(
+        self,
+        static_dir: Path = Config.STATIC_DIR,
+        build_dir: Path = Path(Config.DATA_DIR, "static"),
+    ) -> None:
+        self.static_dir = static_dir
+        self.build_dir = build_dir
+        self._assets: Optional[Dict[str, Asset]] = None
+        self._by_url: Dict[str, Asset] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def assets(self) -> Dict[str, Asset]:
+        if self._assets is None:
+            with self._lock:
+                if self._assets is None:
+                    assets = {}
+                    for source in sorted(self.static_dir.iterdir()):
+                        if source.is_file():
+                            digest = hashlib.sha256(source.read_bytes()).hexdigest()[:12]
+                            assets[source.name] = Asset(
+                                source.name, fingerprint(source.name, digest), source
+                            )
+                    self._by_url = {asset.url_name: asset for asset in assets.values()}
+                    self._assets = assets
+        return self._assets
+
+    def url(self, name: str) -> str:
+        """
+        URL of a static file, content-hashed when the file is known. Template helper.
+
+        :param name: File name in the static dir, e.g. 'htmx.min.js'
+        """
+        asset = self.assets.get(name)
+        return f"/static/{asset.url_name if asset else name}"
+
+    def get(self, url_name: str) -> Optional[Asset]:
+        """
+        Asset published under a content-hashed name.
+        """
+        _ = self.assets
+        return self._by_url.get(url_name)
+
+    def variant(self, asset: Asset, accept_encoding: str) -> Tuple[Optional[str], Path]:
+        """
+        Pick the preferred built variant the client accepts.
+
+        :param asset: Asset to serve
+        :param accept_encoding: Value of the Accept-Encoding header
+        :return: Content encoding (None for identity) and the file to send
+        """
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, suffix in ENCODINGS.items():
+            if encoding in accepted:
+                path = Path(self.build_dir, asset.url_name + suffix)
+                if path.is_file():
+                    return encoding, path
+        return None, asset.source
+
+    def build(self) -> int:
+        """
+        Write the missing compressed variants and the manifest, drop stale variants.
+
+        :return: Number of written files
+        """
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        compressors = {"gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressors["br"] = lambda data: brotli.compress(data, quality=11)
+        expected, written = set(), 0
+        for asset in self.assets.values():
+            data = None
+            for encoding, compress in compressors.items():
+                path = Path(self.build_dir, asset.url_name + ENCODINGS[encoding])
+                expected.add(path.name)
+                if path.exists():
+                    continue
+                data = data if data is not None else asset.source.read_bytes()
+                compressed = compress(data)
+                if len(compressed) >= len(data):
+                    continue
+                # NOTE: Every worker builds on start, so temp files must not collide.
+                tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(compressed)
+                tmp_path.replace(path)
+                written += 1
+        for path in self.build_dir.iterdir():
+            if path.name not in expected and not path.name.startswith((".", "manifest.")):
+                path.unlink(missing_ok=True)
+        manifest = {name: asset.url_name for name, asset in self.assets.items()}
+        manifest_path = Path(self.build_dir, "manifest.json")
+        tmp_path = manifest_path.with_name(f".manifest.json.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        tmp_path.replace(manifest_path)
+        if written:
+            logger.debug(f"Built {written} compressed static files")
+        return written
+
+
+asset_manifest = AssetManifest()
+
+
+class AssetFiles(StaticFiles):
+    """
+    Static files with content negotiation of precompressed variants.
+
+    Content-hashed names are cached by clients for good, as their content never changes.
+    Plain names are still served, but have to be revalidated.
+
+    :param manifest: Manifest of the hashed names
+    """
+
+    def __init__(self, manifest: AssetManifest = asset_manifest, **kwargs) -> None:
+        super().__init__(directory=manifest.static_dir, **kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        asset = self.manifest.get(path)
+        if asset is None:
+            response = await super().get_response(path, scope)
+            response.headers.setdefault("Cache-Control", "no-cache")
+            return response
+        encoding, file = self.manifest.variant(
+            asset, Headers(scope=scope).get("accept-encoding", "")
+        )
+        headers = {"Cache-Control": IMMUTABLE_CACHE, "Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return FileResponse(file, headers=headers, media_type=asset.media_type)
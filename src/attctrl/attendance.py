@@ -0,0 +1,218 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from attctrl.accounts import Account
+from attctrl.config import Config
+from attctrl.logger import new_logger
+from attctrl.retry import (
+    AlreadyInStateError,
+    AttendanceRejectedError,
+    FailureKind,
+    TaskError,
+    classify_failure,
+)
+from attctrl.runs import note_run_steps
+from attctrl.session import get_session_store
+from attctrl.timing import StepTimer
+
+logger = new_logger(__name__)
+
+CSRF_COOKIE = "CSRF_TOKEN"
+CSRF_PARAM = "conreqcsr"
+
+
+class SessionUnavailableError(TaskError):
+    """
+    No usable cached Zoho session for direct HTTP calls, a browser sign-in is needed.
+    """
+
+    kind = FailureKind.AUTH
+
+
+class AttendanceUncertainError(TaskError):
+    """
+    Attendance request was sent, but its result is unknown.
+    """
+
+    kind = FailureKind.TRANSIENT
+
+
+class AttendanceBackend(ABC):
+    """
+    Way of switching the attendance state of a Zoho account.
+    """
+
+    name = ""
+
+    @abstractmethod
+    async def switch(self, account: Account, check_in: bool, maybe_switched: bool = False) -> bool:
+        """
+        Check the account in or out.
+
+        :param account: Zoho account
+        :param check_in: Check in if True, check out otherwise
+        :param maybe_switched: An earlier try may have switched the state already, so finding
+            the account in the target state counts as success
+        :return: True on success
+        :raises TaskError: If Zoho refused the switch, or the underlying error
+        """
+
+
+def cookie_header(cookies: List[Dict[str, Any]], url: str) -> str:
+    """
+    Build the Cookie header for a request from Playwright storage state cookies.
+
+    :param cookies: Cookies of the storage state
+    :param url: Request URL, only cookies matching its host, path and scheme are sent
+    :return: Header value, empty if no cookie matches
+    """
+    parts = urlsplit(url)
+    host, path, now = parts.hostname or "", parts.path or "/", time.time()
+    pairs = []
+    for cookie in cookies:
+        domain = cookie.get("domain", "").lstrip(".")
+        if host != domain and not host.endswith(f".{domain}"):
+            continue
+        if not path.startswith(cookie.get("path", "/")):
+            continue
+        if cookie.get("secure") and parts.scheme != "https":
+            continue
+        expires = cookie.get("expires", -1)
+        if 0 < expires < now:
+            continue
+        pairs.append(f"{cookie['name']}={cookie['value']}")
+    return "; ".join(pairs)
+
+
+def error_message(body: Any) -> str:
+    """
+    Get the error message of a Zoho JSON response.
+
+    :param body: Parsed response body
+    :return: Message, empty if the body has no error
+    """
+    error = body.get("error") if isinstance(body, dict) else None
+    if isinstance(error, dict):
+        error = error.get("message") or error.get("msg") or error
+    return str(error) if error else ""
+
+
+class ZohoHttpClient:
+    """
+    Pooled HTTP client shared by all accounts. Created on first use in the running event loop.
+    """
+
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=Config.BROWSER_STEP_TIMEOUT,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+                headers={"X-Requested-With": "XMLHttpRequest"},
+                follow_redirects=False,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+http_client = ZohoHttpClient()
+
+
+class HttpBackend(AttendanceBackend):
+    """
+    Switches the attendance with direct calls to the Zoho People attendance action,
+    authenticated with the session cookies cached by the browser backend.
+
+    A run that fails for any reason but a known attendance state is handed over to the
+    fallback backend. A browser run signs in again when needed and refreshes the cached
+    session, so the next run can go over HTTP again.
+
+    :param fallback: Backend taking over failed runs, None to fail right away
+    """
+
+    name = "http"
+
+    def __init__(self, fallback: Optional[AttendanceBackend] = None) -> None:
+        self.fallback = fallback
+
+    @staticmethod
+    def action_url(account: Account) -> str:
+        return Config.ZOHO_ATTENDANCE_URL.format(company_id=account.company_id)
+
+    async def _post(self, url: str, cookies: List[Dict[str, Any]], data: Dict[str, Any]) -> Any:
+        response = await http_client.client.post(
+            url, data=data, headers={"Cookie": cookie_header(cookies, url)}
+        )
+        if response.is_redirect or response.status_code in (401, 403):
+            raise SessionUnavailableError(
+                f"Cached Zoho session expired (HTTP {response.status_code})"
+            )
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if not response.is_success or (isinstance(body, dict) and body.get("error")):
+            raise AttendanceRejectedError(response.status_code, error_message(body))
+        if body is None:
+            raise SessionUnavailableError("Zoho answered with a page instead of JSON")
+        return body
+
+    async def _switch(self, account: Account, check_in: bool, maybe_switched: bool) -> bool:
+        storage_state = get_session_store(account.id).load() if Config.SESSION_REUSE else None
+        cookies = (storage_state or {}).get("cookies", [])
+        csrf = next((cookie["value"] for cookie in cookies if cookie["name"] == CSRF_COOKIE), None)
+        if not cookies or csrf is None:
+            raise SessionUnavailableError("No cached Zoho session")
+        url = self.action_url(account)
+        timer = StepTimer()
+        try:
+            with timer.step("http_state"):
+                state = await self._post(url, cookies, {"mode": "getStatus", CSRF_PARAM: csrf})
+            if bool(state.get("checkedIn")) == check_in:
+                if maybe_switched:
+                    logger.info(f"Attendance of {account.name} is already switched")
+                    return True
+                action, target = ("check-in", "in") if check_in else ("check-out", "out")
+                msg = f"Can't {action} because the account is already checked {target}"
+                raise AlreadyInStateError(msg)
+            data = {
+                "mode": "punchIn" if check_in else "punchOut",
+                CSRF_PARAM: csrf,
+                "latitude": account.geoloc_lat,
+                "longitude": account.geoloc_long,
+            }
+            with timer.step("http_switch"):
+                try:
+                    await self._post(url, cookies, data)
+                except httpx.TransportError as e:
+                    raise AttendanceUncertainError(f"Attendance request failed: {e}") from e
+            return True
+        finally:
+            note_run_steps(timer.steps)
+
+    async def switch(self, account: Account, check_in: bool, maybe_switched: bool = False) -> bool:
+        try:
+            return await self._switch(account, check_in, maybe_switched)
+        except AlreadyInStateError:
+            raise
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            kind = classify_failure(e)
+            logger.warning(
+                f"HTTP attendance of {account.name} failed ({kind.value}): {e}."
+                f" Falling back to {self.fallback.name}"
+            )
+            maybe_switched = maybe_switched or isinstance(e, AttendanceUncertainError)
+            return await self.fallback.switch(account, check_in, maybe_switched)
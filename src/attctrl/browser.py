@@ -1,9 +1,35 @@
-import threading
-
-from playwright.sync_api import Page, expect, sync_playwright
-
+import asyncio
+import re
+from typing import Awaitable, Callable, Dict, Optional
+
+from playwright.async_api import (
+    BrowserContext,
+    Locator,
+    Page,
+    Response,
+    TimeoutError as PlaywrightTimeoutError,
+    expect,
+)
+
+from attctrl.accounts import DEFAULT_ACCOUNT_ID, Account, account_store
+from attctrl.artifacts import RunArtifacts, artifact_store
+from attctrl.attendance import AttendanceBackend, HttpBackend
 from attctrl.config import Config
+from attctrl.holidays import scheduled_day_off
+from attctrl.isolation import isolated_runner
 from attctrl.logger import new_logger
+from attctrl.pool import browser_pool
+from attctrl.retry import (
+    AlreadyInStateError,
+    AttendanceRejectedError,
+    AuthError,
+    SignInLimitError,
+    classify_failure,
+    retry_policy,
+)
+from attctrl.runs import RunRecord, current_run, note_run_error, note_run_steps, track_run
+from attctrl.session import get_session_store
+from attctrl.timing import StepTimer, wait_for_first
 
 logger = new_logger(__name__)
 
@@ -25,168 +51,471 @@ class LoginPage(BasicPage):
         self.understand_button = page.locator("button#continue_button")
         self.daily_limit = page.locator("text=You've reached your daily sign-in limit.")
         self.mfa_reminder = page.locator("text=Remind me later")
+        self.login_error = page.get_by_text(
+            re.compile(r"Incorrect password|account cannot be found", re.IGNORECASE)
+        )
 
-    def is_daily_limit_warning(self) -> bool:
-        try:
-            expect(self.understand_button).to_be_visible()
-            return True
-        except Exception:
-            return False
-
-    def is_daily_limit_reached(self) -> bool:
-        try:
-            expect(self.daily_limit).to_be_visible()
-            return True
-        except Exception:
-            return False
-
-    def is_mfa_reminder(self) -> bool:
-        try:
-            expect(self.mfa_reminder).to_be_visible()
-            return True
-        except Exception:
-            return False
+    def post_login_screens(self) -> Dict[str, Locator]:
+        """
+        Optional screens Zoho may show between the password step and the dashboard.
+        """
+        return {
+            "mfa_reminder": self.mfa_reminder,
+            "daily_limit_warning": self.understand_button,
+        }
 
 
 class DashboardPage:
     def __init__(self, page: Page) -> None:
         self.page = page
         self.url = "**/dashboard"
+        self.landing_url = re.compile(r"/dashboard|/signin")
         self.logout_url = "**/logout.html"
         self.iframe = "iframe#peopleLoadFrame"
-        self.att_button = (
-            self.page.frame_locator(self.iframe)
-            .locator("button", has_text="Check-in")
-            .or_(page.locator("button", has_text="Check-out"))
+        self.attendance_request = re.compile(r"attendance", re.IGNORECASE)
+        self.frame = self.page.frame_locator(self.iframe)
+        self.att_button = self.frame.locator("button", has_text="Check-in").or_(
+            self.frame.locator("button", has_text="Check-out")
         )
         self.profile_avatar = self.page.locator("._unifiedui-profile-dp")
         self.sign_out_link = self.page.locator("span:has-text('Sign Out')")
 
-    def wait_for_loading(self):
-        self.page.wait_for_url(self.url)
-
-    def wait_for_logout(self):
-        self.page.wait_for_url(self.logout_url)
+    async def wait_for_loading(self):
+        await self.page.wait_for_url(self.url)
 
+    async def wait_for_logout(self):
+        await self.page.wait_for_url(self.logout_url)
 
-class BrowserControl:
-    def __init__(self, url: str = Config.ZOHO_LOGIN_LINK) -> None:
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(headless=not Config.DEBUG)
-        self.context = self.browser.new_context(
-            permissions=["geolocation"],
-            geolocation={"latitude": Config.GEOLOC_LAT, "longitude": Config.GEOLOC_LONG},
-            viewport={"width": 1280, "height": 720},
+    def is_attendance_response(self, response: Response) -> bool:
+        return response.request.method == "POST" and bool(
+            self.attendance_request.search(response.url)
         )
-        self.page = self.context.new_page()
-        self.login_pg = LoginPage(self.page)
-        self.dashboard_pg = DashboardPage(self.page)
 
-        self.page.goto(url)
 
-        self._teardown_lock = threading.Lock()
-        self._is_teardown = False
+class BrowserControl:
+    def __init__(
+        self,
+        context: BrowserContext,
+        account: Account,
+        artifacts: Optional[RunArtifacts] = None,
+        attempt: int = 1,
+    ) -> None:
+        self.context = context
+        self.account = account
+        self.artifacts = artifacts
+        self.attempt = attempt
+        self.session = get_session_store(account.id)
+        self.url = account.login_link
+        self.page: Page = None
+        self.login_pg: LoginPage = None
+        self.dashboard_pg: DashboardPage = None
+
+        self.timer = StepTimer()
+        self.step_timeout = Config.BROWSER_STEP_TIMEOUT
+
+        self.switch_clicked = False
 
-    def teardown(self):
-        if not self._is_teardown:
+        self._is_teardown = False
+        self._is_logged_in = False
+        self._captured_error: Optional[BaseException] = None
+
+    async def open(self):
+        with self.timer.step("open"):
+            self.page = await self.context.new_page()
+            self.page.set_default_timeout(self.step_timeout * 1000)
+            self.login_pg = LoginPage(self.page)
+            self.dashboard_pg = DashboardPage(self.page)
+            await self.page.goto(self.url)
+
+    async def teardown(self):
+        if not self._is_teardown and self.page is not None:
             self._is_teardown = True
-            with self._teardown_lock:
-                self.context.close()
-                self.browser.close()
-                self.playwright.stop()
-
-    def __del__(self):
-        self.teardown()
-
-    def __enter__(self):
+            # NOTE: Context and browser are owned by the browser pool.
+            await self.page.close()
+            note_run_steps(self.timer.steps)
+            logger.info(f"Browser steps timing: {self.timer.summary()}")
+
+    async def capture_failure(self, error: BaseException):
+        """
+        Screenshot the page of a failed attempt and save its trace, once per error.
+        A known attendance state is not a failure.
+        """
+        if (
+            self.artifacts is None
+            or error is self._captured_error
+            or isinstance(error, (AlreadyInStateError, asyncio.CancelledError))
+        ):
+            return
+        self._captured_error = error
+        await self.artifacts.screenshot(self.page, f"attempt-{self.attempt}")
+        await self.artifacts.save_trace(self.context, f"attempt-{self.attempt}-trace")
+
+    async def __aenter__(self):
+        try:
+            await self.open()
+        except BaseException as e:
+            await self.capture_failure(e)
+            await self.teardown()
+            raise
         return self
 
-    def __exit__(self, exc_type, exc_value, traceback):
-        self.teardown()
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_value is not None:
+            await self.capture_failure(exc_value)
+        await self.teardown()
 
-    def login(self, username: str = Config.ZOHO_USERNAME, password: str = Config.ZOHO_PASSWORD):
-        self.login_pg.username_input.fill(username)
-        self.login_pg.next_button.click()
-        if self.login_pg.is_daily_limit_reached():
-            # NOTE: Zoho have daily limit in 20 login events.
-            msg = "Daily sign-in limit reached. Breaking the task."
-            logger.exception(msg)
-            raise EnvironmentError(msg)
-        self.login_pg.password_input.fill(password)
-        self.login_pg.next_button.click()
-        if self.login_pg.is_mfa_reminder():
-            self.login_pg.mfa_reminder.click()
-        if self.login_pg.is_daily_limit_warning():
-            self.login_pg.understand_button.click()
-        self.dashboard_pg.wait_for_loading()
-        self.dashboard_pg.att_button.wait_for(state="visible")
-
-    def logout(self):
-        self.dashboard_pg.profile_avatar.click()
-        self.dashboard_pg.sign_out_link.click()
-        self.dashboard_pg.wait_for_logout()
-
-    def switch_attendancy(self):
-        self.dashboard_pg.att_button.click()
-        self.page.wait_for_timeout(5 * 1000)
-
-    def get_att_state(self) -> str:
-        return self.dashboard_pg.att_button.inner_text().split()[0]
-
-    def do_check_in(self) -> bool:
+    async def is_session_valid(self) -> bool:
+        """
+        Check if the restored session landed on the dashboard instead of the sign-in page.
+        """
         try:
-            self.login()
-            if "Check-in" not in self.get_att_state():
-                logger.error(
-                    "Can't check-in because current attendancy state is already 'Check-in'"
-                )
-                return False
-            self.switch_attendancy()
+            await self.page.wait_for_url(self.dashboard_pg.landing_url)
+        except PlaywrightTimeoutError:
+            return False
+        if "/dashboard" not in self.page.url:
+            return False
+        try:
+            await self.dashboard_pg.att_button.wait_for(state="visible")
             return True
-        except Exception:
+        except PlaywrightTimeoutError:
             return False
+
+    async def ensure_login(self):
+        """
+        Reuse the cached Zoho session when it is still valid, otherwise do a full sign-in.
+        """
+        with self.timer.step("session_check"):
+            is_session_valid = Config.SESSION_REUSE and await self.is_session_valid()
+        if is_session_valid:
+            logger.debug("Cached Zoho session is valid, sign-in skipped")
+            self._is_logged_in = True
+            return
+        if Config.SESSION_REUSE:
+            self.session.clear()
+        if "/signin" not in self.page.url:
+            await self.context.clear_cookies()
+            await self.page.goto(self.url)
+        await self.login()
+        self._is_logged_in = True
+        if Config.SESSION_REUSE:
+            self.session.save(await self.context.storage_state())
+
+    async def finish_session(self):
+        """
+        Keep the refreshed session for the next task, or log out when session reuse is disabled.
+        """
+        if not self._is_logged_in:
+            return
+        if Config.SESSION_REUSE:
+            self.session.save(await self.context.storage_state())
+        else:
+            with self.timer.step("logout"):
+                await self.logout()
+
+    async def login(self):
+        logins_today = self.session.register_login()
+        logger.info(
+            f"Zoho sign-in {logins_today}/{Config.ZOHO_DAILY_LOGIN_LIMIT} for today"
+            f" ({self.account.name})"
+        )
+        with self.timer.step("login_username"):
+            await self.login_pg.username_input.fill(self.account.username)
+            await self.login_pg.next_button.click()
+            screen = await wait_for_first(
+                {
+                    "password": self.login_pg.password_input.wait_for(state="visible"),
+                    "daily_limit": self.login_pg.daily_limit.wait_for(state="visible"),
+                    "login_error": self.login_pg.login_error.wait_for(state="visible"),
+                },
+                timeout=self.step_timeout,
+            )
+        if screen == "daily_limit":
+            # NOTE: Zoho have daily limit in 20 login events.
+            raise SignInLimitError("Daily sign-in limit reached. Breaking the task.")
+        if screen == "login_error":
+            raise AuthError(
+                f"Zoho rejected the login: {await self.login_pg.login_error.inner_text()}"
+            )
+        with self.timer.step("login_password"):
+            await self.login_pg.password_input.fill(self.account.password)
+            await self.login_pg.next_button.click()
+        with self.timer.step("dashboard"):
+            await self.pass_post_login_screens()
+            await self.dashboard_pg.att_button.wait_for(state="visible")
+
+    async def pass_post_login_screens(self):
+        """
+        Race the dashboard against the optional post-login screens and click through them.
+        """
+        screens = self.login_pg.post_login_screens()
+        for _ in range(len(screens) + 1):
+            signals = {
+                "dashboard": self.dashboard_pg.wait_for_loading(),
+                "login_error": self.login_pg.login_error.wait_for(state="visible"),
+            }
+            for name, locator in screens.items():
+                signals[name] = locator.wait_for(state="visible")
+            screen = await wait_for_first(signals, timeout=self.step_timeout)
+            if screen == "dashboard":
+                return
+            if screen == "login_error":
+                msg = await self.login_pg.login_error.inner_text()
+                raise AuthError(f"Zoho rejected the password: {msg}")
+            logger.debug(f"Zoho post-login screen '{screen}' skipped")
+            await screens.pop(screen).click()
+        await self.dashboard_pg.wait_for_loading()
+
+    async def logout(self):
+        await self.dashboard_pg.profile_avatar.click()
+        await self.dashboard_pg.sign_out_link.click()
+        await self.dashboard_pg.wait_for_logout()
+
+    async def switch_attendancy(self):
+        """
+        Click the attendance button and wait until Zoho confirms the new state.
+        """
+        expected = "Check-out" if "Check-in" in await self.get_att_state() else "Check-in"
+        with self.timer.step("switch"):
+            response = asyncio.ensure_future(
+                self.page.wait_for_event(
+                    "response", predicate=self.dashboard_pg.is_attendance_response
+                )
+            )
+            try:
+                await self.dashboard_pg.att_button.click()
+                self.switch_clicked = True
+                flipped = expect(self.dashboard_pg.att_button).to_contain_text(
+                    expected, timeout=self.step_timeout * 1000
+                )
+                signal = await wait_for_first(
+                    {"response": asyncio.shield(response), "flipped": flipped},
+                    timeout=self.step_timeout,
+                )
+                if signal == "response":
+                    if not response.result().ok:
+                        raise AttendanceRejectedError(response.result().status)
+                    await expect(self.dashboard_pg.att_button).to_contain_text(
+                        expected, timeout=self.step_timeout * 1000
+                    )
+            finally:
+                response.cancel()
+
+    async def get_att_state(self) -> str:
+        return (await self.dashboard_pg.att_button.inner_text()).split()[0]
+
+    async def do_check_in(self) -> bool:
+        try:
+            await self.ensure_login()
+            if "Check-in" not in await self.get_att_state():
+                msg = "Can't check-in because current attendancy state is already 'Check-in'"
+                raise AlreadyInStateError(msg)
+            await self.switch_attendancy()
+            return True
+        except BaseException as e:
+            # NOTE: Before the logout, so the artifacts show the page that failed.
+            await self.capture_failure(e)
+            raise
         finally:
-            self.logout()
+            await self.finish_session()
 
-    def do_check_out(self) -> bool:
+    async def do_check_out(self) -> bool:
         try:
-            self.login()
-            if "Check-out" not in self.get_att_state():
-                logger.error(
-                    "Can't check-out because current attendancy state is already 'Check-out'"
-                )
-                return False
-            self.switch_attendancy()
+            await self.ensure_login()
+            if "Check-out" not in await self.get_att_state():
+                msg = "Can't check-out because current attendancy state is already 'Check-out'"
+                raise AlreadyInStateError(msg)
+            await self.switch_attendancy()
             return True
-        except Exception:
-            return False
+        except BaseException as e:
+            # NOTE: Before the logout, so the artifacts show the page that failed.
+            await self.capture_failure(e)
+            raise
         finally:
-            self.logout()
+            await self.finish_session()
 
-    def do_test(self) -> bool:
+    async def do_test(self) -> bool:
         logger.info("Test task triggered")
         return True
 
 
-def zoho_check_in():
-    logger.info("Zoho check-in started")
-    with BrowserControl() as browser:
-        if browser.do_check_in():
-            logger.info("Zoho check-in successfully completed")
-        else:
-            logger.error("Zoho check-in failed!")
+class BrowserBackend(AttendanceBackend):
+    """
+    Drives the Zoho web UI in a context leased from the browser pool, retrying transient
+    failures. Signs in when the cached session is not valid and keeps the refreshed one.
+    """
+
+    name = "browser"
+
+    async def run(
+        self,
+        action: Callable[[BrowserControl], Awaitable[bool]],
+        account: Account,
+        maybe_switched: bool = False,
+    ) -> bool:
+        """
+        Run a BrowserControl action with retries, in a job process if BROWSER_ISOLATION is on.
+
+        :param action: BrowserControl method to run
+        :param account: Zoho account
+        :param maybe_switched: An earlier try may have switched the attendance already
+        :return: Result of the action
+        """
+        if Config.BROWSER_ISOLATION:
+            return await isolated_runner.run(action.__name__, account.id, maybe_switched)
+        return await self.run_in_process(action, account, maybe_switched)
+
+    async def run_in_process(
+        self,
+        action: Callable[[BrowserControl], Awaitable[bool]],
+        account: Account,
+        maybe_switched: bool = False,
+    ) -> bool:
+        """
+        Run a BrowserControl action with retries in a context leased from the browser pool.
+
+        :param action: BrowserControl method to run
+        :param account: Zoho account
+        :param maybe_switched: An earlier try may have switched the attendance already
+        :return: Result of the action
+        """
+        name = f"{action.__name__} ({account.name})"
+        switch_clicked = maybe_switched
+        artifacts = RunArtifacts(re.sub(r"[^\w-]", "_", f"{action.__name__}-{account.id}"))
+
+        async def attempt(context: BrowserContext, number: int) -> bool:
+            nonlocal switch_clicked
+            async with BrowserControl(context, account, artifacts, number) as browser:
+                try:
+                    return await action(browser)
+                except AlreadyInStateError:
+                    if switch_clicked:
+                        # NOTE: Previous attempt clicked the button but failed to see the result.
+                        logger.info(
+                            f"{name}: attempt {number} found the attendance already switched"
+                        )
+                        return True
+                    raise
+                finally:
+                    switch_clicked = switch_clicked or browser.switch_clicked
+
+        async def task(context: BrowserContext) -> bool:
+            # NOTE: Attempts share the leased context, so a restored session survives retries.
+            await artifacts.start_trace(context)
+            try:
+                return await retry_policy.run(lambda number: attempt(context, number), name)
+            finally:
+                await artifacts.stop_trace(context)
+
+        storage_state = get_session_store(account.id).load() if Config.SESSION_REUSE else None
+        try:
+            return await browser_pool.run(task, storage_state, account.geolocation)
+        finally:
+            if artifacts.names:
+                await asyncio.to_thread(artifact_store.prune)
+
+    async def switch(self, account: Account, check_in: bool, maybe_switched: bool = False) -> bool:
+        action = BrowserControl.do_check_in if check_in else BrowserControl.do_check_out
+        return await self.run(action, account, maybe_switched)
+
+
+browser_backend = BrowserBackend()
+
+ATTENDANCE_BACKENDS: Dict[str, AttendanceBackend] = {
+    "browser": browser_backend,
+    "http": HttpBackend(fallback=browser_backend),
+}
+
+
+def get_backend(name: Optional[str] = None) -> AttendanceBackend:
+    """
+    Get an attendance backend by its name.
+
+    :param name: Backend name (def: ATTENDANCE_BACKEND)
+    :return: Backend, the browser one if the name is unknown
+    """
+    return ATTENDANCE_BACKENDS.get(name or Config.ATTENDANCE_BACKEND, browser_backend)
+
+
+async def _run_task(
+    task_name: str, account_id: str, run: Callable[[Account], Awaitable[bool]]
+) -> bool:
+    account = account_store.get_account(account_id)
+    if account is None:
+        logger.error(f"Account '{account_id}' not found")
+        note_run_error(f"Account '{account_id}' not found")
+        return False
+    try:
+        return await run(account)
+    except Exception as e:
+        kind = classify_failure(e)
+        run = current_run.get()
+        # NOTE: The last artifact is the trace of the last attempt if traced, else its screenshot.
+        link = f"/artifacts/{run.artifacts[-1]}" if run is not None and run.artifacts else None
+        logger.error(
+            f"{task_name} ({account.name}): {kind.value} failure: {e}", extra={"link": link}
+        )
+        note_run_error(f"{kind.value}: {type(e).__name__}: {e}")
+        return False
+
+
+def _skip_day_off(run: RunRecord, task_name: str, account_id: str) -> bool:
+    label = scheduled_day_off(account_id)
+    if label is None:
+        return False
+    logger.info(f"Zoho {task_name} skipped, day off: {label} ({account_id})")
+    run.outcome = "skipped"
+    run.error = f"Day off: {label}"
+    return True
+
+
+async def zoho_check_in(
+    account_id: str = DEFAULT_ACCOUNT_ID, backend: Optional[str] = None
+) -> bool:
+    logger.info(f"Zoho check-in started ({account_id})")
+    async with track_run("checkin", account_id) as run:
+        if _skip_day_off(run, "check-in", account_id):
+            return False
+        if await _run_task(
+            "check-in", account_id, lambda account: get_backend(backend).switch(account, True)
+        ):
+            run.outcome = "success"
+            logger.info(f"Zoho check-in successfully completed ({account_id})")
+            return True
+        run.outcome = "failed"
+        logger.error(f"Zoho check-in failed! ({account_id})")
+        return False
 
 
-def zoho_check_out():
-    logger.info("Zoho check-out started")
-    with BrowserControl() as browser:
-        if browser.do_check_out():
-            logger.info("Zoho check-out successfully completed")
-        else:
-            logger.error("Zoho check-out failed!")
+async def zoho_check_out(
+    account_id: str = DEFAULT_ACCOUNT_ID, backend: Optional[str] = None
+) -> bool:
+    logger.info(f"Zoho check-out started ({account_id})")
+    async with track_run("checkout", account_id) as run:
+        if _skip_day_off(run, "check-out", account_id):
+            return False
+        if await _run_task(
+            "check-out", account_id, lambda account: get_backend(backend).switch(account, False)
+        ):
+            run.outcome = "success"
+            logger.info(f"Zoho check-out successfully completed ({account_id})")
+            return True
+        run.outcome = "failed"
+        logger.error(f"Zoho check-out failed! ({account_id})")
+        return False
+
+
+async def zoho_test(account_id: str = DEFAULT_ACCOUNT_ID, backend: Optional[str] = None) -> bool:  # noqa: ARG001
+    logger.info(f"Zoho test started ({account_id})")
+    async with track_run("test", account_id) as run:
+        result = await _run_task(
+            "test", account_id, lambda account: browser_backend.run(BrowserControl.do_test, account)
+        )
+        run.outcome = "success" if result else "failed"
+        return result
 
 
-def zoho_test():
-    logger.info("Zoho test started")
-    with BrowserControl() as browser:
-        browser.do_test()
+TASK_FUNCTIONS: Dict[str, Callable[..., Awaitable[bool]]] = {
+    "checkin": zoho_check_in,
+    "checkout": zoho_check_out,
+    "test": zoho_test,
+}
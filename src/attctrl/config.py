@@ -1,13 +1,40 @@
+import hmac
+import os
 from pathlib import Path
-from secrets import token_urlsafe
+from secrets import token_bytes
+from tempfile import mkstemp
 
-from decouple import config
+from decouple import Csv, config
 
 from attctrl.logger import new_logger
 
 logger = new_logger(__name__)
 
 
+def load_secret(path: Path, size: int = 32) -> bytes:
+    """
+    Read a random secret kept in a file, created on first use.
+
+    The file is written under a temporary name and linked into place, so workers starting
+    at the same time all end up with the one secret that was linked first.
+
+    :param path: Secret file
+    :param size: Size of a new secret in bytes
+    """
+    if not path.exists():
+        fd, tmp_name = mkstemp(prefix=f".{path.name}.", dir=path.parent)
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(token_bytes(size))
+            path.hardlink_to(tmp_path)
+        except FileExistsError:
+            pass
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    return path.read_bytes()
+
+
 class Config:
     try:
         DEBUG = config("DEBUG", default=False, cast=bool)
@@ -15,21 +42,77 @@ class Config:
         ZOHO_USERNAME = config("ZOHO_USERNAME")
         ZOHO_PASSWORD = config("ZOHO_PASSWORD")
         ZOHO_COMPANY_ID = config("ZOHO_COMPANY_ID")
-        ZOHO_LOGIN_LINK = f"https://one.zoho.com/zohoone/{ZOHO_COMPANY_ID}/home/cxapp/people/"
+        ZOHO_ONE_URL = config("ZOHO_ONE_URL", default="https://one.zoho.com")
+        ZOHO_LOGIN_LINK = f"{ZOHO_ONE_URL}/zohoone/{ZOHO_COMPANY_ID}/home/cxapp/people/"
+        ZOHO_ATTENDANCE_URL = config(
+            "ZOHO_ATTENDANCE_URL",
+            default="https://people.zoho.com/{company_id}/AttendanceAction.zp",
+        )
+        ATTENDANCE_BACKEND = config("ATTENDANCE_BACKEND", default="browser")
         GEOLOC_LAT = config("GEOLOC_LAT", default=0.0, cast=float)
         GEOLOC_LONG = config("GEOLOC_LONG", default=0.0, cast=float)
 
-        AUTH_TOKEN = token_urlsafe()
+        BROWSER_WARMUP = config("BROWSER_WARMUP", default=True, cast=bool)
+        BROWSER_MAX_USES = config("BROWSER_MAX_USES", default=20, cast=int)
+        BROWSER_MAX_CONTEXTS = config("BROWSER_MAX_CONTEXTS", default=3, cast=int)
+        BROWSER_STEP_TIMEOUT = config("BROWSER_STEP_TIMEOUT", default=30, cast=int)
+        BROWSER_LEAN = config("BROWSER_LEAN", default=True, cast=bool)
+        BROWSER_BLOCK_RESOURCES = config("BROWSER_BLOCK_RESOURCES", default=True, cast=bool)
+        BROWSER_BLOCKED_TYPES = config(
+            "BROWSER_BLOCKED_TYPES", default="image,media,font", cast=Csv(post_process=tuple)
+        )
+        BROWSER_ALLOWED_HOSTS = config(
+            "BROWSER_ALLOWED_HOSTS",
+            default="zoho.com,zoho.eu,zoho.in,zoho.com.au,zohocdn.com,zohostatic.com,"
+            "zohowebstatic.com,zohopublic.com",
+            cast=Csv(post_process=tuple),
+        )
+        BROWSER_ISOLATION = config("BROWSER_ISOLATION", default=False, cast=bool)
+        BROWSER_JOB_TIMEOUT = config("BROWSER_JOB_TIMEOUT", default=600, cast=int)
+        BROWSER_JOB_MAX_RSS_MB = config("BROWSER_JOB_MAX_RSS_MB", default=1536, cast=int)
+
+        TASK_RETRY_ATTEMPTS = config("TASK_RETRY_ATTEMPTS", default=3, cast=int)
+        TASK_RETRY_DEADLINE = config("TASK_RETRY_DEADLINE", default=300, cast=int)
+        TASK_RETRY_BACKOFF = config("TASK_RETRY_BACKOFF", default=5, cast=int)
+        JOBSTORE = config("JOBSTORE", default="sqlite")
+        JOBSTORE_POOL_SIZE = config("JOBSTORE_POOL_SIZE", default=5, cast=int)
+        JOBSTORE_FLUSH_INTERVAL = config("JOBSTORE_FLUSH_INTERVAL", default=5.0, cast=float)
+        TASK_MAX_RUNNING = config("TASK_MAX_RUNNING", default=BROWSER_MAX_CONTEXTS, cast=int)
+        TASK_SPREAD = config("TASK_SPREAD", default=False, cast=bool)
+
+        ARTIFACTS_SCREENSHOTS = config("ARTIFACTS_SCREENSHOTS", default=True, cast=bool)
+        ARTIFACTS_TRACE_SAMPLE = config("ARTIFACTS_TRACE_SAMPLE", default=0.0, cast=float)
+        ARTIFACTS_MAX_MB = config("ARTIFACTS_MAX_MB", default=200, cast=int)
+        ARTIFACTS_MAX_AGE_DAYS = config("ARTIFACTS_MAX_AGE_DAYS", default=14, cast=float)
+
+        SESSION_REUSE = config("SESSION_REUSE", default=True, cast=bool)
+        SESSION_SECRET = config("SESSION_SECRET", default=f"{ZOHO_USERNAME}:{ZOHO_PASSWORD}")
+        ZOHO_DAILY_LOGIN_LIMIT = 20
+
         APP_AUTH = config("APP_AUTH", default=False, cast=bool)
         APP_USERNAME = config("APP_USERNAME", default=ZOHO_USERNAME)
         APP_PASSWORD = config("APP_PASSWORD", default=ZOHO_PASSWORD)
+        METRICS_PUBLIC = config("METRICS_PUBLIC", default=False, cast=bool)
 
         APP_DIR = Path(__file__).resolve().parents[0]
         TEMPLATE_DIR = Path(APP_DIR, "templates")
         STATIC_DIR = Path(APP_DIR, "static")
         ROOT_DIR = Path(__file__).resolve().parents[2]
-        DATA_DIR = Path(ROOT_DIR, "data")
-        DATA_DIR.mkdir(exist_ok=True)
+        DATA_DIR = Path(ROOT_DIR, config("DATA_DIR", default="data"))
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+        # NOTE: Same token in every worker and across restarts, a new password invalidates it.
+        AUTH_TOKEN = hmac.new(
+            load_secret(Path(DATA_DIR, "auth.secret")),
+            f"{APP_USERNAME}:{APP_PASSWORD}".encode(),
+            "sha256",
+        ).hexdigest()
+
+        # NOTE: Empty LOG_FILE disables the log file and the log viewer.
+        LOG_FILE = config("LOG_FILE", default=Path(DATA_DIR, "logs", "attctrl.log").as_posix())
+        LOG_FILE = Path(ROOT_DIR, LOG_FILE) if LOG_FILE else None
+        LOG_FILE_MAX_MB = config("LOG_FILE_MAX_MB", default=10, cast=int)
+        LOG_FILE_BACKUPS = config("LOG_FILE_BACKUPS", default=5, cast=int)
     except Exception as e:
         logger.error(f"Fail to load app params from env: {e}")
         raise
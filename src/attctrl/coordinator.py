@@ -0,0 +1,341 @@
+import asyncio
+import json
+import os
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Set, Tuple
+
+from apscheduler.events import (
+    EVENT_ALL_JOBS_REMOVED,
+    EVENT_JOB_ADDED,
+    EVENT_JOB_MODIFIED,
+    EVENT_JOB_REMOVED,
+)
+
+from attctrl.config import Config
+from attctrl.logger import new_logger, notification_broker
+from attctrl.scheduler import TaskScheduler
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = new_logger(__name__)
+
+
+class Cache(Protocol):
+    def invalidate(self): ...
+
+
+class LeaderLock:
+    """
+    Exclusive lock on a file in the data dir. It's held as long as the process lives,
+    the OS drops it when the process exits or dies.
+
+    :param path: Lock file
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """
+        Try to take the lock without waiting.
+
+        :return: True if the lock is held by this process now
+        """
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            # NOTE: No file locks on this platform, so there is only one worker to coordinate.
+            self._fd = -1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            if self._fd >= 0:
+                os.close(self._fd)
+            self._fd = None
+
+
+class SchedulerCoordinator:
+    """
+    Lets several web workers share one schedule while exactly one of them runs the jobs.
+
+    Every worker starts the scheduler on the shared SQLite job store. The worker holding the
+    leader lock runs the jobs and serves a control socket in the data dir. Other workers
+    start the scheduler paused, so they only add, remove and list jobs, and subscribe to
+    the leader over the socket:
+
+    - job changes of any worker are announced, so the others drop their task index and
+      timeline caches, and the leader wakes up for jobs that are due earlier now;
+    - manual runs are executed by the leader;
+    - notifications of the leader (task results) are forwarded to every worker, so they
+      reach the browsers connected to any of them.
+
+    A follower that can't reach the leader tries to take the lock and becomes the leader.
+    Messages are JSON lines: requests {"op": ...} answered with {"ok": ..., "result": ...},
+    or a 'subscribe' request followed by a stream of {"event": ...} lines.
+
+    :param tasker: Scheduler of the worker
+    :param caches: Caches derived from the jobs, invalidated on changes of other workers
+    :param data_dir: Directory of the lock file and the control socket
+    :param retry_interval: Seconds between attempts to reach or replace the leader
+    """
+
+    def __init__(
+        self,
+        tasker: TaskScheduler,
+        caches: Tuple[Cache, ...] = (),
+        data_dir: Path = Config.DATA_DIR,
+        retry_interval: float = 2.0,
+    ) -> None:
+        self.tasker = tasker
+        self.caches = caches
+        self.lock = LeaderLock(Path(data_dir, "scheduler.lock"))
+        self.socket_path = Path(data_dir, "scheduler.sock")
+        self.retry_interval = retry_interval
+        self.on_promote: Optional[Callable[[], Awaitable[None]]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._change_pending = False
+        tasker.scheduler.add_listener(
+            self._on_local_change,
+            EVENT_JOB_ADDED | EVENT_JOB_MODIFIED | EVENT_JOB_REMOVED | EVENT_ALL_JOBS_REMOVED,
+        )
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock.held
+
+    @property
+    def role(self) -> str:
+        return "leader" if self.is_leader else "follower"
+
+    def _spawn(self, coro: Awaitable[Any]):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def start(self):
+        """
+        Elect the leader and start the scheduler of this worker in its role.
+
+        A follower starts once the leader is up, so the job store is only created by
+        the leader.
+
+        :raises RuntimeError: If another process leads and the job store can't be shared
+        """
+        self._loop = asyncio.get_running_loop()
+        if self.lock.acquire():
+            await self._lead()
+        elif Config.JOBSTORE != "sqlite":
+            # NOTE: Jobs added by a follower would never reach the store of the leader.
+            raise RuntimeError(
+                f"Job store '{Config.JOBSTORE}' can't be shared by several workers,"
+                " use JOBSTORE=sqlite or a single worker"
+            )
+        else:
+            started = self._loop.create_future()
+            self._spawn(self._follow(started))
+            await started
+        logger.info(f"Worker {os.getpid()} is the scheduler {self.role}")
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        for subscriber in list(self._subscribers):
+            with suppress(asyncio.QueueFull):
+                subscriber.put_nowait(None)
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            with suppress(OSError):
+                self.socket_path.unlink()
+        self.lock.release()
+
+    async def run_task(self, task_id: str) -> Optional[bool]:
+        """
+        Run a task right away, on the leader.
+
+        :param task_id: The unique identifier of the task to run
+        :return: Result of the task function or None if the task is not found
+        :raises OSError: If the leader can't be reached
+        """
+        if self.is_leader:
+            return await self.tasker.run_task(task_id)
+        return await self._request({"op": "run", "task_id": task_id})
+
+    def _invalidate(self):
+        self.tasker.invalidate()
+        for cache in self.caches:
+            cache.invalidate()
+
+    def _on_local_change(self, _event):
+        # NOTE: Batches emit an event per job, a single message is sent for all of them.
+        if self._loop is None or self._change_pending:
+            return
+        self._change_pending = True
+        self._loop.call_soon_threadsafe(self._announce_change)
+
+    def _announce_change(self):
+        self._change_pending = False
+        if self.is_leader:
+            self._broadcast({"event": "changed", "pid": os.getpid()})
+        else:
+            self._spawn(self._notify_leader())
+
+    async def _notify_leader(self):
+        try:
+            await self._request({"op": "changed", "pid": os.getpid()})
+        except OSError as e:
+            logger.warning(f"Failed to announce job changes to the scheduler leader: {e}")
+
+    async def _request(self, message: Dict[str, Any]) -> Any:
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+        finally:
+            writer.close()
+        if not line:
+            raise ConnectionResetError("Scheduler leader closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    # Leader side
+
+    async def _lead(self):
+        try:
+            if self.tasker.running:
+                self.tasker.resume()
+            else:
+                self.tasker.start()
+            # NOTE: The lock is held, so a socket file left behind is from a dead leader.
+            with suppress(FileNotFoundError):
+                self.socket_path.unlink()
+            self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        except BaseException:
+            # NOTE: Let another worker run the tasks.
+            self.lock.release()
+            raise
+        self._spawn(self._forward_notifications())
+
+    def _broadcast(self, event: Dict[str, Any]):
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.put_nowait(event)
+            except asyncio.QueueFull:
+                # NOTE: Subscriber is stuck, its stream ends, so it resubscribes and drops its caches.
+                self._subscribers.discard(subscriber)
+
+    async def _forward_notifications(self):
+        async for notifications in notification_broker.subscribe():
+            for notification in notifications:
+                data = {key: value for key, value in notification.items() if key != "id"}
+                self._broadcast({"event": "notification", "data": data})
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = json.loads(await reader.readline() or "{}")
+            op = request.get("op")
+            if op == "subscribe":
+                await self._stream(writer)
+                return
+            try:
+                if op == "changed":
+                    self._invalidate()
+                    self._broadcast({"event": "changed", "pid": request.get("pid")})
+                    result = None
+                elif op == "run":
+                    result = await self.tasker.run_task(request["task_id"])
+                else:
+                    raise ValueError(f"Unknown operation '{op}'")
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        except (OSError, ValueError) as e:
+            logger.debug(f"Control connection failed: {e}")
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        self._subscribers.add(queue)
+        try:
+            while (event := await queue.get()) is not None and queue in self._subscribers:
+                writer.write(json.dumps(event).encode() + b"\n")
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
+
+    # Follower side
+
+    async def _follow(self, started: asyncio.Future):
+        try:
+            while True:
+                try:
+                    await self._subscribe(started)
+                except (OSError, ValueError) as e:
+                    logger.debug(f"Scheduler leader is not reachable: {e}")
+                if self.lock.acquire():
+                    await self._promote()
+                    break
+                # NOTE: On start the leader is usually just a moment away.
+                await asyncio.sleep(self.retry_interval if started.done() else 0.1)
+        except Exception as e:
+            if not started.done():
+                started.set_exception(e)
+                return
+            raise
+        if not started.done():
+            started.set_result(None)
+
+    async def _subscribe(self, started: asyncio.Future):
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            writer.write(b'{"op": "subscribe"}\n')
+            await writer.drain()
+            if not self.tasker.running:
+                self.tasker.start(paused=True)
+                started.set_result(None)
+            # NOTE: Changes made while disconnected are not known.
+            self._invalidate()
+            while line := await reader.readline():
+                event = json.loads(line)
+                if event["event"] == "changed" and event.get("pid") != os.getpid():
+                    self._invalidate()
+                elif event["event"] == "notification":
+                    notification_broker.publish(event["data"])
+        finally:
+            writer.close()
+
+    async def _promote(self):
+        if self.tasker.running:
+            logger.warning(f"Scheduler leader is gone, worker {os.getpid()} takes over")
+        await self._lead()
+        if self.on_promote is not None:
+            await self.on_promote()
@@ -0,0 +1,47 @@
+import base64
+import threading
+from pathlib import Path
+from typing import Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+from attctrl.config import Config, load_secret
+
+__all__ = ["Cipher", "InvalidToken", "cipher"]
+
+
+class Cipher:
+    """
+    Symmetric encryption of app secrets stored in the data dir.
+
+    Key is derived with scrypt from SESSION_SECRET and a random salt kept next to the data.
+    """
+
+    def __init__(self, data_dir: Path = Config.DATA_DIR, secret: str = Config.SESSION_SECRET):
+        self.salt_file = Path(data_dir, "session.salt")
+        self._secret = secret
+        self._fernet: Optional[Fernet] = None
+        self._lock = threading.Lock()
+
+    def _get_fernet(self) -> Fernet:
+        with self._lock:
+            if self._fernet is None:
+                # NOTE: Workers starting at the same time must derive the key from one salt.
+                salt = load_secret(self.salt_file, 16)
+                kdf = Scrypt(salt=salt, length=32, n=2**14, r=8, p=1)
+                key = kdf.derive(self._secret.encode())
+                self._fernet = Fernet(base64.urlsafe_b64encode(key))
+            return self._fernet
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._get_fernet().encrypt(data)
+
+    def decrypt(self, data: bytes) -> bytes:
+        """
+        :raises InvalidToken: If data was encrypted with another key or is corrupted
+        """
+        return self._get_fernet().decrypt(data)
+
+
+cipher = Cipher()
@@ -0,0 +1,286 @@
+import itertools
+import json
+import re
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from attctrl.config import Config
+from attctrl.logger import new_logger
+from attctrl.runs import current_job
+
+logger = new_logger(__name__)
+
+ALL_ACCOUNTS = "*"
+# Task functions skipped on days off, test runs still run.
+DAY_OFF_TASKS = ("zoho_check_in", "zoho_check_out")
+# Longest range a single entry may cover, so a typo can't create years of days off.
+MAX_RANGE_DAYS = 366
+
+
+class DayOff(BaseModel):
+    account: str
+    day: date
+    label: str
+
+
+def _date_range(start: date, end: date) -> Iterator[date]:
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise ValueError(f"Range {start}..{end} is longer than {MAX_RANGE_DAYS} days")
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def parse_date_list(text: str) -> Dict[date, str]:
+    """
+    Parse days off given one per line: 'YYYY-MM-DD [label]' or 'YYYY-MM-DD..YYYY-MM-DD [label]'.
+    The label may also be separated by a comma. Empty lines and '#' comments are skipped.
+
+    :param text: Date list
+    :return: Labels by day
+    :raises ValueError: If a line can't be parsed
+    """
+    days: Dict[date, str] = {}
+    for number, raw_line in enumerate(text.splitlines(), start=1):
+        line = raw_line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        value, *label = re.split(r"[\s,]+", line, maxsplit=1)
+        start, _, end = value.partition("..")
+        try:
+            first = date.fromisoformat(start)
+            last = date.fromisoformat(end) if end else first
+            for day in _date_range(first, last):
+                days[day] = "".join(label).strip() or "Day off"
+        except ValueError as e:
+            raise ValueError(f"Line {number}: {e}") from e
+    return days
+
+
+def _ics_lines(text: str) -> Iterator[Tuple[str, Dict[str, str], str]]:
+    unfolded: List[str] = []
+    for line in text.splitlines():
+        # NOTE: Long ICS lines are folded, continuation lines start with a space or a tab.
+        if line[:1] in (" ", "\t") and unfolded:
+            unfolded[-1] += line[1:]
+        elif line:
+            unfolded.append(line)
+    for line in unfolded:
+        head, _, value = line.partition(":")
+        name, *params = head.split(";")
+        yield (
+            name.upper(),
+            dict(param.upper().split("=", 1) for param in params if "=" in param),
+            value,
+        )
+
+
+def _ics_date(value: str, params: Dict[str, str]) -> Optional[date]:
+    # NOTE: Date-times have a time part, e.g. '20261224T090000Z'.
+    if params.get("VALUE") == "DATE" or "T" not in value.upper():
+        return datetime.strptime(value[:8], "%Y%m%d").date()
+    return None
+
+
+def _yearly(start: date, rule: Dict[str, str], horizon: date) -> Iterator[date]:
+    count = int(rule["COUNT"]) if "COUNT" in rule else None
+    until = datetime.strptime(rule["UNTIL"][:8], "%Y%m%d").date() if "UNTIL" in rule else horizon
+    interval = int(rule.get("INTERVAL", 1))
+    for n in itertools.count(step=interval):
+        if count is not None and n // interval >= count:
+            return
+        try:
+            day = start.replace(year=start.year + n)
+        except ValueError:
+            # NOTE: Feb 29 in a non-leap year.
+            continue
+        if day > min(until, horizon):
+            return
+        yield day
+
+
+def parse_ics(text: str, horizon_years: int = 2) -> Dict[date, str]:
+    """
+    Parse the all-day events of an iCalendar file, e.g. a public holiday calendar.
+
+    Timed events are skipped, as they don't take the whole day. Yearly recurring events
+    are expanded up to the horizon, other recurrence rules are ignored.
+
+    :param text: ICS file content
+    :param horizon_years: How many years ahead recurring events are expanded
+    :return: Labels by day
+    :raises ValueError: If the file is not a calendar or has invalid dates
+    """
+    if "BEGIN:VCALENDAR" not in text.upper():
+        raise ValueError("Not an iCalendar file")
+    horizon = date.today().replace(month=12, day=31) + timedelta(days=365 * (horizon_years - 1))
+    days: Dict[date, str] = {}
+    event: Optional[Dict[str, Tuple[Dict[str, str], str]]] = None
+    skipped = 0
+    for name, params, value in _ics_lines(text):
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {}
+        elif name == "END" and value.upper() == "VEVENT" and event is not None:
+            start_params, start_value = event.get("DTSTART", ({}, ""))
+            start = _ics_date(start_value, start_params) if start_value else None
+            if start is None:
+                skipped += 1
+                event = None
+                continue
+            end_params, end_value = event.get("DTEND", ({}, ""))
+            end = _ics_date(end_value, end_params) if end_value else None
+            # NOTE: End date of all-day events is exclusive.
+            length = max(((end - start).days if end else 1), 1) - 1
+            label = re.sub(r"\\([,;\\])", r"\1", event.get("SUMMARY", ({}, ""))[1]).strip()
+            starts = [start]
+            if "RRULE" in event:
+                rule = dict(
+                    part.split("=", 1)
+                    for part in event["RRULE"][1].upper().split(";")
+                    if "=" in part
+                )
+                if rule.get("FREQ") == "YEARLY":
+                    starts = list(_yearly(start, rule, horizon))
+                else:
+                    logger.warning(f"Recurrence of '{label}' is not supported, only its first day")
+            for first in starts:
+                for day in _date_range(first, first + timedelta(days=length)):
+                    days[day] = label or "Day off"
+            event = None
+        elif event is not None:
+            event[name] = (params, value)
+    if skipped:
+        logger.info(f"{skipped} timed events skipped, only all-day events are days off")
+    return days
+
+
+def parse_days_off(text: str) -> Dict[date, str]:
+    """
+    Parse days off from an ICS file or a date list.
+    """
+    if "BEGIN:VCALENDAR" in text.upper():
+        return parse_ics(text)
+    return parse_date_list(text)
+
+
+class HolidayCalendar:
+    """
+    Public holidays and leave days, per account or for all accounts, kept in the data dir.
+
+    Days are indexed by account and date, so checking whether a run falls on a day off is
+    two dict lookups. The file is read again when another worker changed it.
+    """
+
+    def __init__(self, data_dir: Path = Config.DATA_DIR) -> None:
+        self.days_file = Path(data_dir, "days_off.json")
+        self._days: Dict[str, Dict[date, str]] = {}
+        self._mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[date, str]]:
+        try:
+            mtime = self.days_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._mtime:
+            self._days = {}
+            if mtime is not None:
+                try:
+                    data = json.loads(self.days_file.read_text())
+                    self._days = {
+                        account: {date.fromisoformat(day): label for day, label in days.items()}
+                        for account, days in data.items()
+                    }
+                except ValueError as e:
+                    logger.error(f"Failed to read days off: {e}")
+            self._mtime = mtime
+        return self._days
+
+    def _save(self):
+        data = {
+            account: {day.isoformat(): label for day, label in sorted(days.items())}
+            for account, days in self._days.items()
+            if days
+        }
+        tmp_file = self.days_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(data, indent=1))
+        tmp_file.replace(self.days_file)
+        self._mtime = self.days_file.stat().st_mtime_ns
+
+    def get_day_off(self, account_id: str, day: date) -> Optional[str]:
+        """
+        Get the label of a day off of an account.
+
+        :param account_id: Account identifier
+        :param day: Day to check
+        :return: Label, or None if it's a working day
+        """
+        with self._lock:
+            days = self._load()
+            label = days.get(account_id, {}).get(day)
+            return label if label is not None else days.get(ALL_ACCOUNTS, {}).get(day)
+
+    def get_days_off(self, since: Optional[date] = None) -> List[DayOff]:
+        """
+        Get all days off in order of date.
+
+        :param since: Only return days from this day on
+        """
+        with self._lock:
+            days = [
+                DayOff(account=account, day=day, label=label)
+                for account, account_days in self._load().items()
+                for day, label in account_days.items()
+                if since is None or day >= since
+            ]
+        return sorted(days, key=lambda day_off: (day_off.day, day_off.account))
+
+    def add_days(self, account_id: str, days: Dict[date, str]) -> int:
+        """
+        Add days off, replacing the labels of known ones.
+
+        :param account_id: Account identifier, ALL_ACCOUNTS for everybody
+        :param days: Labels by day
+        :return: Number of added days
+        """
+        with self._lock:
+            self._load().setdefault(account_id, {}).update(days)
+            self._save()
+        logger.info(f"{len(days)} days off added")
+        return len(days)
+
+    def remove_day(self, account_id: str, day: date) -> bool:
+        """
+        Remove a day off.
+
+        :return: True if the day was removed
+        """
+        with self._lock:
+            if self._load().get(account_id, {}).pop(day, None) is None:
+                return False
+            self._save()
+            return True
+
+
+holiday_calendar = HolidayCalendar()
+
+
+def scheduled_day_off(account_id: str) -> Optional[str]:
+    """
+    Check if the scheduled run being executed falls on a day off of the account.
+    Manual runs are never skipped.
+
+    :param account_id: Account the run is for
+    :return: Label of the day off, or None
+    """
+    job = current_job.get()
+    if job is None or job.fire_time is None:
+        return None
+    # NOTE: Day in the task's own timezone, jitter may push the run past midnight.
+    fire_time = job.nominal_time or job.fire_time
+    return holiday_calendar.get_day_off(account_id, fire_time.date())
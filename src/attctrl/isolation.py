@@ -0,0 +1,395 @@
+import asyncio
+import ctypes
+import json
+import os
+import signal
+import sys
+from collections import defaultdict
+from contextlib import suppress
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set
+
+from attctrl.config import Config
+from attctrl.logger import log_pipeline, new_logger, notification_broker
+from attctrl.metrics import isolated_job_peak_rss_bytes, isolated_jobs, isolated_workers
+from attctrl.retry import FailureKind, TaskError, classify_failure
+from attctrl.runs import RunRecord, current_run, note_run_artifact, note_run_steps
+
+logger = new_logger(__name__)
+
+# BrowserControl actions a job process may run.
+ISOLATED_ACTIONS = ("do_check_in", "do_check_out", "do_test")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+PR_SET_CHILD_SUBREAPER = 36
+
+
+class IsolatedJobError(TaskError):
+    """
+    Browser job process failed, was killed or reported a failure of the job.
+
+    :param message: Error message
+    :param kind: Failure kind reported by the job
+    :param reason: Outcome of the job for the metrics: 'failed', 'timeout', 'memory', 'crashed'
+    """
+
+    def __init__(
+        self, message: str, kind: FailureKind = FailureKind.UNKNOWN, reason: str = "failed"
+    ) -> None:
+        super().__init__(message)
+        self.kind = kind
+        self.reason = reason
+
+
+class ProcStat(NamedTuple):
+    ppid: int
+    start_time: int
+    rss: int
+    zombie: bool
+
+
+def read_proc_stats() -> Dict[int, ProcStat]:
+    """
+    Parent, start time and resident memory of all processes (Linux only, empty elsewhere).
+    """
+    stats = {}
+    with suppress(OSError):
+        for entry in Path("/proc").iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                data = Path(entry, "stat").read_bytes()
+            except OSError:
+                continue
+            # NOTE: Command name may contain spaces, fields are counted after it.
+            fields = data[data.rindex(b")") + 2 :].split()
+            stats[int(entry.name)] = ProcStat(
+                ppid=int(fields[1]),
+                start_time=int(fields[19]),
+                rss=int(fields[21]) * PAGE_SIZE,
+                zombie=fields[0] == b"Z",
+            )
+    return stats
+
+
+class ProcessTree:
+    """
+    Processes started by a job process, the process itself included.
+
+    Playwright starts Chromium in a process group of its own, so killing the group of the job
+    is not enough. Members are remembered with their start time: a process orphaned by a dead
+    parent is reparented but still known, and a reused pid is never taken for a member.
+
+    :param root: Pid of the job process
+    """
+
+    def __init__(self, root: int) -> None:
+        self.root = root
+        self.members: Dict[int, int] = {}
+
+    def refresh(self) -> int:
+        """
+        Find the current members.
+
+        :return: Total resident memory of the members in bytes
+        """
+        stats = read_proc_stats()
+        members = {
+            pid: start_time
+            for pid, start_time in self.members.items()
+            if pid in stats and stats[pid].start_time == start_time
+        }
+        if self.root in stats:
+            members.setdefault(self.root, stats[self.root].start_time)
+        children: Dict[int, List[int]] = defaultdict(list)
+        for pid, stat in stats.items():
+            children[stat.ppid].append(pid)
+        pending = list(members)
+        while pending:
+            for child in children[pending.pop()]:
+                if child not in members:
+                    members[child] = stats[child].start_time
+                    pending.append(child)
+        self.members = members
+        return sum(stats[pid].rss for pid in members)
+
+    def kill(self, include_root: bool = True) -> int:
+        """
+        Kill all members, repeated for processes started while killing.
+
+        :param include_root: Kill the job process too, not only the processes it started
+        :return: Number of killed processes
+        """
+        killed = 0
+        for _ in range(3):
+            self.refresh()
+            stats = read_proc_stats()
+            alive = [
+                pid
+                for pid in self.members
+                if pid in stats and not stats[pid].zombie and (include_root or pid != self.root)
+            ]
+            if not alive:
+                break
+            for pid in alive:
+                with suppress(ProcessLookupError, PermissionError):
+                    os.kill(pid, signal.SIGKILL)
+                    killed += 1
+        return killed
+
+
+def become_subreaper() -> bool:
+    """
+    Adopt the orphaned descendants of this process instead of init, so processes left behind
+    by a dying parent stay in the tree of the job (Linux only).
+
+    :return: True if the process is a subreaper now
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+class IsolatedRunner:
+    """
+    Runs browser jobs in subprocesses, so the web server never hosts Playwright or Chromium.
+
+    Each job gets a fresh process running BrowserBackend with its own browser. The parent
+    watches the wall-clock time and the resident memory of the job's whole process tree and
+    kills the tree once a limit is crossed, or when the job is over, so nothing stays resident.
+    The job process reports its result, browser steps and artifacts, and forwards its
+    notifications, as JSON lines on stdout.
+
+    :param max_workers: Max number of job processes running at the same time
+    :param timeout: Seconds a job may run
+    :param max_rss: Max resident memory of a job's process tree in bytes
+    :param poll_interval: Seconds between checks of the limits
+    :param command: Command starting a job process, reading the job from stdin
+    """
+
+    def __init__(
+        self,
+        max_workers: int = Config.BROWSER_MAX_CONTEXTS,
+        timeout: float = Config.BROWSER_JOB_TIMEOUT,
+        max_rss: int = Config.BROWSER_JOB_MAX_RSS_MB * 1024 * 1024,
+        poll_interval: float = 1.0,
+        command: Sequence[str] = (sys.executable, "-m", "attctrl.isolation"),
+    ) -> None:
+        self.timeout = timeout
+        self.max_rss = max_rss
+        self.poll_interval = poll_interval
+        self.command = command
+        self._slots = asyncio.Semaphore(max_workers)
+        self._trees: Set[ProcessTree] = set()
+
+    async def run(self, action: str, account_id: str, maybe_switched: bool = False) -> bool:
+        """
+        Run a BrowserControl action in a job process.
+
+        :param action: Name of the BrowserControl method, see ISOLATED_ACTIONS
+        :param account_id: Zoho account identifier
+        :param maybe_switched: An earlier try may have switched the attendance already
+        :return: Result of the action
+        :raises IsolatedJobError: If the job failed or its process was killed
+        """
+        job = {"action": action, "account_id": account_id, "maybe_switched": maybe_switched}
+        async with self._slots:
+            # NOTE: The package may be run from the source tree, not installed.
+            python_path = [str(Config.APP_DIR.parent), os.environ.get("PYTHONPATH", "")]
+            process = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, python_path))},
+                start_new_session=True,
+                limit=1024 * 1024,
+            )
+            tree = ProcessTree(process.pid)
+            self._trees.add(tree)
+            isolated_workers.inc()
+            outcome = "crashed"
+            try:
+                with suppress(ConnectionError):
+                    process.stdin.write(json.dumps(job).encode() + b"\n")
+                    await process.stdin.drain()
+                    process.stdin.close()
+                response = await self._communicate(process, tree)
+                outcome = "success" if response["ok"] else "failed"
+            except IsolatedJobError as e:
+                outcome = e.reason
+                raise
+            finally:
+                await asyncio.to_thread(tree.kill)
+                # NOTE: Without /proc the tree is unknown, the job process is killed at least.
+                with suppress(ProcessLookupError):
+                    process.kill()
+                await process.wait()
+                self._trees.discard(tree)
+                isolated_workers.dec()
+                isolated_jobs.inc(outcome=outcome)
+        note_run_steps(response.get("steps", {}))
+        for artifact in response.get("artifacts", []):
+            note_run_artifact(artifact)
+        if response["ok"]:
+            return bool(response["result"])
+        error = response["error"]
+        raise IsolatedJobError(
+            f"{error['type']}: {error['message']}", FailureKind(error["kind"]), "failed"
+        )
+
+    async def _communicate(
+        self, process: asyncio.subprocess.Process, tree: ProcessTree
+    ) -> Dict[str, Any]:
+        response: Optional[Dict[str, Any]] = None
+
+        async def read():
+            nonlocal response
+            async for line in process.stdout:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.debug(f"Browser job output: {line.decode(errors='replace').rstrip()}")
+                    continue
+                if message.get("event") == "notification":
+                    notification_broker.publish(message["data"])
+                elif message.get("event") == "result":
+                    response = message
+                    # NOTE: A leftover process may still hold the pipe open, EOF is not awaited.
+                    return
+
+        reader = asyncio.ensure_future(read())
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        peak = 0
+        try:
+            while not reader.done():
+                await asyncio.wait({reader}, timeout=self.poll_interval)
+                if process.returncode is not None:
+                    # NOTE: Process.wait() would also wait for the pipe, which a leftover
+                    #  process may hold open. Output already sent is still read.
+                    await asyncio.wait({reader}, timeout=self.poll_interval)
+                    break
+                rss = await asyncio.to_thread(tree.refresh)
+                peak = max(peak, rss)
+                if rss > self.max_rss:
+                    raise IsolatedJobError(
+                        f"Browser job killed, memory {rss / 1024 / 1024:.0f} MB over the limit"
+                        f" of {self.max_rss / 1024 / 1024:.0f} MB",
+                        reason="memory",
+                    )
+                if not reader.done() and asyncio.get_running_loop().time() > deadline:
+                    raise IsolatedJobError(
+                        f"Browser job killed after running for {self.timeout:.0f}s",
+                        reason="timeout",
+                    )
+        finally:
+            reader.cancel()
+            if peak:
+                isolated_job_peak_rss_bytes.observe(peak)
+        if response is None:
+            raise IsolatedJobError(
+                f"Browser job process exited with code {process.returncode} without a result",
+                reason="crashed",
+            )
+        return response
+
+    async def shutdown(self):
+        """
+        Kill the processes of running jobs.
+        """
+        for tree in list(self._trees):
+            await asyncio.to_thread(tree.kill)
+
+
+isolated_runner = IsolatedRunner()
+
+
+class JobOutput:
+    """
+    Messages of a job process to the runner, JSON lines on stdout.
+    """
+
+    def __init__(self) -> None:
+        self.cursor = 0
+
+    @staticmethod
+    def write(message: Dict[str, Any]):
+        sys.stdout.write(json.dumps(message, default=str) + "\n")
+        sys.stdout.flush()
+
+    def forward(self, notifications: List[dict]):
+        for notification in notifications:
+            self.cursor = notification["id"]
+            data = {key: value for key, value in notification.items() if key != "id"}
+            self.write({"event": "notification", "data": data})
+
+    async def forward_notifications(self):
+        async for notifications in notification_broker.subscribe(cursor=self.cursor):
+            self.forward(notifications)
+
+
+async def run_job(job: Dict[str, Any], output: JobOutput) -> Dict[str, Any]:
+    """
+    Run a browser job in this process, with the in-process browser backend.
+
+    :param job: Job sent by the runner
+    :param output: Output the notifications are forwarded to meanwhile
+    :return: Result message for the runner
+    """
+    from attctrl.accounts import account_store  # noqa: PLC0415
+    from attctrl.browser import BrowserControl, browser_backend  # noqa: PLC0415
+    from attctrl.pool import browser_pool  # noqa: PLC0415
+
+    run = RunRecord(
+        task_type=job["action"], account=job["account_id"], started_at=datetime.now(timezone.utc)
+    )
+    current_run.set(run)
+    forwarding = asyncio.ensure_future(output.forward_notifications())
+    try:
+        account = account_store.get_account(job["account_id"])
+        if account is None:
+            raise ValueError(f"Account '{job['account_id']}' not found")
+        if job["action"] not in ISOLATED_ACTIONS:
+            raise ValueError(f"Unknown browser action '{job['action']}'")
+        result = await browser_backend.run_in_process(
+            getattr(BrowserControl, job["action"]), account, job["maybe_switched"]
+        )
+        message = {"ok": True, "result": bool(result)}
+    except Exception as e:
+        message = {
+            "ok": False,
+            "error": {
+                "type": type(e).__name__,
+                "kind": classify_failure(e).value,
+                "message": str(e),
+            },
+        }
+    finally:
+        forwarding.cancel()
+        await browser_pool.shutdown()
+    return {"event": "result", **message, "steps": run.steps, "artifacts": run.artifacts}
+
+
+def main():
+    """
+    Entry point of a job process: reads one job from stdin and reports on stdout.
+    """
+    job = json.loads(sys.stdin.readline())
+    become_subreaper()
+    if Config.LOG_FILE:
+        log_pipeline.add_log_file(
+            Config.LOG_FILE, Config.LOG_FILE_MAX_MB * 1024 * 1024, Config.LOG_FILE_BACKUPS
+        )
+    output = JobOutput()
+    result = asyncio.run(run_job(job, output))
+    # NOTE: Records still queued are written out before the last notifications are sent.
+    log_pipeline.stop()
+    output.forward(notification_broker.get_since(output.cursor))
+    output.write(result)
+    # NOTE: Browser processes Playwright failed to close would be orphaned once this one exits.
+    ProcessTree(os.getpid()).kill(include_root=False)
+
+
+if __name__ == "__main__":
+    main()
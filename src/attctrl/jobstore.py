@@ -0,0 +1,257 @@
+import os
+import pickle
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from tempfile import mkstemp
+from typing import Iterator, Optional, Union
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.util import datetime_to_utc_timestamp
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from attctrl.config import Config
+from attctrl.logger import new_logger
+
+logger = new_logger(__name__)
+
+
+class TaskJobStore(SQLAlchemyJobStore):
+    """
+    SQLAlchemy job store able to group job writes into one transaction.
+
+    Inside transaction() every job added or removed by the current thread goes through the
+    same connection and is committed at once, or not at all if any of the writes fails.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._local = threading.local()
+
+    @property
+    def _connection(self) -> Optional[Connection]:
+        return getattr(self._local, "connection", None)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        if self._connection is not None:
+            yield
+            return
+        with self.engine.begin() as connection:
+            self._local.connection = connection
+            try:
+                yield
+            finally:
+                self._local.connection = None
+
+    def add_job(self, job):
+        if self._connection is None:
+            return super().add_job(job)
+        insert = self.jobs_t.insert().values(
+            id=job.id,
+            next_run_time=datetime_to_utc_timestamp(job.next_run_time),
+            job_state=pickle.dumps(job.__getstate__(), self.pickle_protocol),
+        )
+        try:
+            self._connection.execute(insert)
+        except IntegrityError as e:
+            raise ConflictingIdError(job.id) from e
+        return None
+
+    def remove_job(self, job_id):
+        if self._connection is None:
+            return super().remove_job(job_id)
+        delete = self.jobs_t.delete().where(self.jobs_t.c.id == job_id)
+        if self._connection.execute(delete).rowcount == 0:
+            raise JobLookupError(job_id)
+        return None
+
+
+def create_sqlite_engine(path: Path, pool_size: int = Config.JOBSTORE_POOL_SIZE) -> Engine:
+    """
+    Create a SQLite engine tuned for the job store.
+
+    WAL journal lets the scheduler and request handlers read while a write is in progress,
+    and synchronous=NORMAL skips the fsync of every commit that WAL does not need.
+
+    :param path: Database file
+    :param pool_size: Number of pooled connections kept open
+    :return: SQLAlchemy engine
+    """
+    engine = create_engine(
+        f"sqlite:///{path.as_posix()}",
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        connect_args={"timeout": 30, "check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return engine
+
+
+class SnapshotJobStore(MemoryJobStore):
+    """
+    In-memory job store persisted as a pickled snapshot in the data dir.
+
+    Reads and writes never touch the disk. Changes are written behind every flush_interval
+    seconds by a background thread, and on shutdown. With flush_interval=0 every change is
+    written at once, a transaction() is written once when it ends. Snapshots are replaced
+    atomically, so a crash loses at most the changes of the last interval.
+
+    :param path: Snapshot file
+    :param flush_interval: Seconds between snapshot writes, 0 to write on every change
+    :param pickle_protocol: Pickle protocol of the job states
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        flush_interval: float = Config.JOBSTORE_FLUSH_INTERVAL,
+        pickle_protocol: int = pickle.HIGHEST_PROTOCOL,
+    ) -> None:
+        super().__init__()
+        self.path = path
+        self.flush_interval = flush_interval
+        self.pickle_protocol = pickle_protocol
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._depth = 0
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            states = pickle.loads(self.path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.error(f"Failed to read the job snapshot: {e}")
+            return
+        for state in states:
+            try:
+                job = Job.__new__(Job)
+                job.__setstate__({**state, "jobstore": self})
+            except Exception as e:
+                logger.error(f"Unable to restore job '{state.get('id')}', skipping it: {e}")
+                continue
+            job._scheduler = self._scheduler
+            job._jobstore_alias = self._alias
+            super().add_job(job)
+
+    def _changed(self):
+        self._dirty = True
+        if not self.flush_interval and not self._depth:
+            self.flush()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """
+        Write the snapshot if anything changed since the last one.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            data = pickle.dumps([job.__getstate__() for job, _ in self._jobs], self.pickle_protocol)
+            self._dirty = False
+        tmp_file = None
+        try:
+            # NOTE: Unique name, the flusher thread and shutdown may write at the same time.
+            fd, tmp_name = mkstemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+            tmp_file = Path(tmp_name)
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            tmp_file.replace(self.path)
+        except OSError as e:
+            logger.error(f"Failed to write the job snapshot: {e}")
+            if tmp_file is not None:
+                tmp_file.unlink(missing_ok=True)
+            with self._lock:
+                self._dirty = True
+
+    def start(self, scheduler, alias):
+        super().start(scheduler, alias)
+        with self._lock:
+            self._load()
+        if self.flush_interval:
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            jobs, jobs_index = list(self._jobs), dict(self._jobs_index)
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._jobs, self._jobs_index = jobs, jobs_index
+                raise
+            finally:
+                self._depth -= 1
+            if self._dirty and not self.flush_interval and not self._depth:
+                self.flush()
+
+    def add_job(self, job):
+        with self._lock:
+            super().add_job(job)
+            self._changed()
+
+    def update_job(self, job):
+        with self._lock:
+            super().update_job(job)
+            self._changed()
+
+    def remove_job(self, job_id):
+        with self._lock:
+            super().remove_job(job_id)
+            self._changed()
+
+    def remove_all_jobs(self):
+        with self._lock:
+            super().remove_all_jobs()
+            self._changed()
+
+    def shutdown(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        with self._lock:
+            self._jobs, self._jobs_index = [], {}
+
+
+TransactionalJobStore = Union[TaskJobStore, SnapshotJobStore]
+
+
+def create_jobstore(
+    kind: str = Config.JOBSTORE, data_dir: Path = Config.DATA_DIR
+) -> TransactionalJobStore:
+    """
+    Create the job store of the scheduler.
+
+    :param kind: 'sqlite' for the WAL SQLite store, 'memory' for the in-memory store
+        with write-behind snapshots
+    :param data_dir: Directory of the store files
+    :return: Job store supporting transaction()
+    """
+    if kind == "memory":
+        return SnapshotJobStore(Path(data_dir, "jobs.pickle"))
+    if kind != "sqlite":
+        logger.warning(f"Unknown job store '{kind}', using sqlite")
+    return TaskJobStore(engine=create_sqlite_engine(Path(data_dir, "jobs.sqlite")))
@@ -1,20 +1,133 @@
+import asyncio
+import atexit
 import logging
+import os
+import queue
+import threading
 from collections import deque
-from logging.handlers import RotatingFileHandler
+from contextlib import suppress
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import ClassVar, Dict, List, Optional
+from secrets import token_hex
+from typing import AsyncIterator, ClassVar, Dict, List, Optional, Set, Tuple
 
-notification_queue = deque(maxlen=100)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FILE_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class NotificationBroker:
+    """
+    Fan-out of notifications to any number of subscribers.
+
+    Every notification gets a sequence number and is kept in a bounded ring buffer. Subscribers
+    only hold a cursor into the buffer, so publishing never blocks on slow clients and a client
+    that reconnects with its last seen id gets the missed notifications replayed. A client that
+    falls behind the buffer skips to the oldest kept notification.
+
+    Sequence numbers are only valid in the process, event ids sent to clients carry the epoch
+    of the broker, so a cursor of a restarted process or of another worker is not taken for
+    one of this broker. Such a client, or one ahead of the broker, gets only new notifications.
+    """
+
+    def __init__(self, maxlen: int = 100) -> None:
+        self.epoch = token_hex(4)
+        self._items: deque = deque(maxlen=maxlen)
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, notification: dict):
+        with self._lock:
+            self._last_id += 1
+            self._items.append({"id": self._last_id, **notification})
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            # NOTE: Subscriber loop may be already closed.
+            with suppress(RuntimeError):
+                loop.call_soon_threadsafe(event.set)
+
+    def event_id(self, notification: dict) -> str:
+        """
+        Id of a notification for clients, e.g. the SSE event id.
+        """
+        return f"{self.epoch}-{notification['id']}"
+
+    def parse_event_id(self, event_id: str) -> Optional[int]:
+        """
+        Get the cursor of an event id sent by a client.
+
+        :param event_id: Event id made by event_id()
+        :return: Cursor, None if the id was not made by this broker
+        """
+        epoch, _, cursor = event_id.partition("-")
+        if epoch != self.epoch or not cursor.isdigit():
+            return None
+        return int(cursor)
+
+    def get_since(self, cursor: int) -> List[dict]:
+        """
+        Get notifications newer than the cursor.
+
+        :param cursor: Id of the last notification seen by the client
+        """
+        with self._lock:
+            return [item for item in self._items if item["id"] > cursor]
+
+    async def subscribe(
+        self, cursor: Optional[int] = None, heartbeat: float = 15.0
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Stream batches of new notifications. Yields an empty batch on heartbeat.
+
+        :param cursor: Id of the last notification seen by the client (def: only new ones)
+        :param heartbeat: Seconds of silence after which an empty batch is yielded
+        """
+        if cursor is None or cursor > self._last_id:
+            # NOTE: Cursor ahead of the broker was not given by it, it would hide new items.
+            cursor = self._last_id
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            while True:
+                items = self.get_since(cursor)
+                if items:
+                    cursor = items[-1]["id"]
+                    yield items
+                    continue
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), heartbeat)
+                except TimeoutError:
+                    yield []
+                waiter[1].clear()
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+notification_broker = NotificationBroker()
 
 
 class NotificationHandler(logging.Handler):
     def emit(self, record):
-        notification_queue.append(self.format(record))
+        notification_broker.publish(self.format(record))
 
 
 class NotificationFormatter(logging.Formatter):
     def format(self, record):
-        return {"level": record.levelname, "message": record.message}
+        notification = {"level": record.levelname, "message": record.message}
+        link = getattr(record, "link", None)
+        if link:
+            notification["link"] = link
+        return notification
 
 
 class CustomFormatter(logging.Formatter):
@@ -35,9 +148,15 @@ class CustomFormatter(logging.Formatter):
         logging.CRITICAL: bold_red + format + reset,
     }
 
+    def __init__(self) -> None:
+        super().__init__()
+        self._formatters: Dict[int, logging.Formatter] = {
+            level: logging.Formatter(log_fmt) for level, log_fmt in self.FORMATS.items()
+        }
+        self._default_formatter = logging.Formatter()
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
+        formatter = self._formatters.get(record.levelno, self._default_formatter)
         return formatter.format(record)
 
 
@@ -61,6 +180,173 @@ class CustomFilter(logging.Filter):
         return are_different
 
 
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler for a log file written by several processes, e.g. web workers.
+
+    Records are written under a shared lock and the file is rotated under an exclusive one,
+    so no process writes into a file that was just rotated. The other processes notice the
+    file was replaced and reopen it instead of rotating the fresh file once more.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # NOTE: Kept open for the life of the handler, closed in close().
+        self._lock_file = Path(f"{self.baseFilename}.lock").open("a") if fcntl else None  # noqa: SIM115
+
+    def _rotated_elsewhere(self) -> bool:
+        try:
+            return Path(self.baseFilename).stat().st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _reopen(self):
+        self.stream.close()
+        self.stream = self._open()
+
+    def emit(self, record: logging.LogRecord):
+        if self._lock_file is None:
+            super().emit(record)
+            return
+        fcntl.flock(self._lock_file, fcntl.LOCK_SH)
+        try:
+            super().emit(record)
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:  # noqa: N802
+        if self.stream is not None and self._rotated_elsewhere():
+            self._reopen()
+        return super().shouldRollover(record)
+
+    def doRollover(self):  # noqa: N802
+        if self._lock_file is not None:
+            # NOTE: Converting the shared lock is not atomic, another process may rotate first.
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            if self.stream is not None and self._rotated_elsewhere():
+                self._reopen()
+                return
+        super().doRollover()
+
+    def close(self):
+        super().close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+class LogDispatcher(logging.Handler):
+    """
+    Routes records coming from the log queue to the handlers registered for their logger,
+    and to the handlers of all records.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.routes: Dict[str, List[logging.Handler]] = {}
+        self.global_handlers: Tuple[logging.Handler, ...] = ()
+
+    def add_route(self, name: str, handler: logging.Handler):
+        self.routes.setdefault(name, []).append(handler)
+
+    def add_global(self, handler: logging.Handler):
+        # NOTE: Replaced, not appended, as the listener thread may be iterating.
+        self.global_handlers = (*self.global_handlers, handler)
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in (*self.routes.get(record.name, ()), *self.global_handlers):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord):
+        self.handle(record)
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Queue handler keeping the exception text apart from the message, so notifications
+    stay short while console and file output still get the traceback.
+    """
+
+    exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # NOTE: Record is updated in place, the queue handler is the only one on the logger.
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LogPipeline:
+    """
+    Non-blocking logging pipeline.
+
+    Loggers only put records into a queue. Formatting and console, file and notification
+    output happen on a single background listener thread.
+    """
+
+    def __init__(self) -> None:
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.dispatcher = LogDispatcher()
+        self.listener = QueueListener(self.queue, self.dispatcher)
+        self.console_handler = logging.StreamHandler()
+        self.console_handler.setFormatter(CustomFormatter())
+        self.notification_handler = NotificationHandler()
+        self.notification_handler.setFormatter(NotificationFormatter())
+        self.file_handlers: Dict[str, logging.Handler] = {}
+        self.configured: Set[str] = set()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def get_file_handler(
+        self, log_file: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5
+    ) -> logging.Handler:
+        if log_file not in self.file_handlers:
+            file_handler = SharedRotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count
+            )
+            file_handler.setFormatter(logging.Formatter(FILE_LOG_FORMAT))
+            self.file_handlers[log_file] = file_handler
+        return self.file_handlers[log_file]
+
+    def add_log_file(self, log_file: Path, max_bytes: int, backup_count: int):
+        """
+        Write the records of all loggers to a rotating log file.
+
+        :param log_file: Path to the log file, its directory is created
+        :param max_bytes: Size the file is rotated at
+        :param backup_count: Number of rotated files kept
+        """
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if str(log_file) not in self.file_handlers:
+                self.dispatcher.add_global(
+                    self.get_file_handler(str(log_file), max_bytes, backup_count)
+                )
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            self.listener.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Flush queued records and stop the listener thread.
+        """
+        if self._started:
+            self._started = False
+            self.listener.stop()
+
+
+log_pipeline = LogPipeline()
+
+
 def new_logger(
     name: str,
     level: str = "DEBUG",
@@ -69,7 +355,8 @@ def new_logger(
     enable_notifications: bool = True,
 ) -> logging.Logger:
     """
-    Create a logger with a custom formatter.
+    Create a logger with a custom formatter. Repeated calls for the same name return
+    the already configured logger.
 
     :param name: Name of the logger
     :param log_file: Path to the log file (optional)
@@ -77,28 +364,29 @@ def new_logger(
     :return: Configured logger
     """
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level))
-
-    # Create console handler with custom formatter
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(CustomFormatter())
-    logger.addHandler(console_handler)
-
-    # No repeat filter
-    logger.addFilter(CustomFilter(not no_repeat))
-
-    # If log file is provided, create file handler
-    if log_file:
-        file_handler = RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5)
-        file_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-
-    # Add notification handler if enabled
-    if enable_notifications:
-        notification_handler = NotificationHandler()
-        notification_handler.setFormatter(NotificationFormatter())
-        logger.addHandler(notification_handler)
+    with log_pipeline._lock:
+        if name in log_pipeline.configured:
+            return logger
+        log_pipeline.configured.add(name)
+
+        logger.setLevel(getattr(logging, level))
+
+        # No repeat filter
+        logger.addFilter(CustomFilter(not no_repeat))
+
+        # Console output with custom formatter
+        log_pipeline.dispatcher.add_route(name, log_pipeline.console_handler)
+
+        # If log file is provided, add file output
+        if log_file:
+            log_pipeline.dispatcher.add_route(name, log_pipeline.get_file_handler(log_file))
+
+        # Add notifications if enabled
+        if enable_notifications:
+            log_pipeline.dispatcher.add_route(name, log_pipeline.notification_handler)
+
+        logger.addHandler(LogQueueHandler(log_pipeline.queue))
+        log_pipeline.start()
 
     return logger
 
@@ -0,0 +1,261 @@
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Collection, Iterator, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel
+
+from attctrl.config import Config
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+# Start of a record written with FILE_LOG_FORMAT, following lines up to the next record
+# belong to it (tracebacks).
+RECORD_START = re.compile(
+    rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (\S+) - ([A-Z]+) - ", re.MULTILINE
+)
+
+
+class LogEntry(BaseModel):
+    time: str
+    name: str
+    level: str
+    message: str
+
+
+class LogPage(BaseModel):
+    """
+    Log records, newest first, with the cursors to read on in both directions.
+    """
+
+    entries: List[LogEntry]
+    before: Optional[str] = None
+    after: Optional[str] = None
+
+
+class LogSegment(NamedTuple):
+    path: Path
+    inode: int
+    size: int
+
+
+class LogReader:
+    """
+    Reads the records of a rotating log file and of its rotated files by byte offset.
+
+    A cursor is '<inode>:<offset>' in one of the files, so it stays valid when the file is
+    rotated: reading goes on in the renamed file and continues with the newer ones. Files are
+    memory-mapped, only the scanned ranges are read from disk, and a request scans at most
+    max_scan_bytes, so searching far back never loads whole files.
+
+    :param log_file: Current log file, rotated ones are '<log_file>.1' (newest) and up
+    :param backup_count: Number of rotated files
+    :param window: Bytes scanned at once when reading backwards
+    :param max_scan_bytes: Max bytes scanned per request
+    """
+
+    def __init__(
+        self,
+        log_file: Path,
+        backup_count: int = Config.LOG_FILE_BACKUPS,
+        window: int = 64 * 1024,
+        max_scan_bytes: int = 8 * 1024 * 1024,
+    ) -> None:
+        self.log_file = log_file
+        self.backup_count = backup_count
+        self.window = window
+        self.max_scan_bytes = max_scan_bytes
+
+    def segments(self) -> List[LogSegment]:
+        """
+        Existing log files, oldest first.
+        """
+        paths = [Path(f"{self.log_file}.{n}") for n in range(self.backup_count, 0, -1)]
+        segments = []
+        for path in (*paths, self.log_file):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            segments.append(LogSegment(path, stat.st_ino, stat.st_size))
+        return segments
+
+    @staticmethod
+    @contextmanager
+    def _mapped(segment: LogSegment) -> Iterator[Optional[mmap.mmap]]:
+        """
+        Map a log file, None if it's empty or was replaced since it was listed.
+        """
+        try:
+            with segment.path.open("rb") as file:
+                if segment.size == 0 or os.fstat(file.fileno()).st_ino != segment.inode:
+                    yield None
+                    return
+                with mmap.mmap(file.fileno(), segment.size, access=mmap.ACCESS_READ) as data:
+                    yield data
+        except (FileNotFoundError, ValueError):
+            # NOTE: File was rotated out or truncated in the meantime.
+            yield None
+
+    @staticmethod
+    def _locate(segments: List[LogSegment], cursor: Optional[str]) -> Tuple[int, int]:
+        """
+        Find the file and the offset of a cursor. Unknown cursors point to the oldest record,
+        no cursor points to the end of the current file.
+        """
+        if cursor is None:
+            return len(segments) - 1, segments[-1].size
+        try:
+            inode, offset = (int(part) for part in cursor.split(":", 1))
+        except ValueError as e:
+            raise ValueError(f"Invalid log cursor '{cursor}'") from e
+        for index, segment in enumerate(segments):
+            if segment.inode == inode:
+                return index, min(max(offset, 0), segment.size)
+        return 0, 0
+
+    @staticmethod
+    def _records(data: mmap.mmap, start: int, end: int) -> List[Tuple[int, int, "re.Match[bytes]"]]:
+        matches = list(RECORD_START.finditer(data, start, end))
+        ends = [match.start() for match in matches[1:]] + [end]
+        return [(match.start(), stop, match) for match, stop in zip(matches, ends, strict=True)]
+
+    @staticmethod
+    def _entry(
+        data: mmap.mmap,
+        record: Tuple[int, int, "re.Match[bytes]"],
+        levels: Optional[Collection[str]],
+        query: str,
+    ) -> Optional[LogEntry]:
+        _, stop, match = record
+        level = match[3].decode()
+        if levels is not None and level not in levels:
+            return None
+        message = data[match.end() : stop].decode("utf-8", "replace").rstrip("\n")
+        name = match[2].decode()
+        if query and query not in message.lower() and query not in name.lower():
+            return None
+        return LogEntry(time=match[1].decode(), name=name, level=level, message=message)
+
+    def read_after(
+        self,
+        cursor: Optional[str],
+        limit: int = 500,
+        levels: Optional[Collection[str]] = None,
+        query: str = "",
+    ) -> LogPage:
+        """
+        Read the records written after a cursor, e.g. to follow the log.
+
+        :param cursor: Cursor returned by an earlier read (def: end of the log)
+        :param limit: Max number of records to return
+        :param levels: Only return records of these levels (def: all)
+        :param query: Only return records containing this text, case-insensitive
+        :return: Page with the cursor to read newer records from
+        :raises ValueError: If the cursor is invalid
+        """
+        segments = self.segments()
+        if not segments:
+            # NOTE: No log file yet, an unknown inode reads it from its start once it exists.
+            return LogPage(entries=[], after="0:0")
+        index, offset = self._locate(segments, cursor)
+        query = query.lower()
+        entries: List[LogEntry] = []
+        after = f"{segments[index].inode}:{offset}"
+        budget = self.max_scan_bytes
+        for segment in segments[index:]:
+            if offset >= segment.size:
+                after = f"{segment.inode}:{segment.size}"
+                offset = 0
+                continue
+            with self._mapped(segment) as data:
+                if data is None:
+                    break
+                # NOTE: Only complete lines, the last one may be still being written.
+                end = data.rfind(b"\n", offset, min(segment.size, offset + budget)) + 1
+                records = self._records(data, offset, end) if end > offset else []
+                if offset + budget < segment.size and len(records) > 1:
+                    # NOTE: Scan stopped within the file, the last record may go on.
+                    end = records.pop()[0]
+                for record in records:
+                    entry = self._entry(data, record, levels, query)
+                    if entry is None:
+                        continue
+                    if len(entries) == limit:
+                        end = record[0]
+                        break
+                    entries.append(entry)
+                budget -= max(end - offset, 0)
+                after = f"{segment.inode}:{max(end, offset)}"
+                if end < segment.size or budget <= 0:
+                    break
+                offset = 0
+        return LogPage(entries=entries[::-1], after=after)
+
+    def read_before(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        levels: Optional[Collection[str]] = None,
+        query: str = "",
+    ) -> LogPage:
+        """
+        Read the records written before a cursor, newest first, e.g. to tail or search the log.
+
+        :param cursor: Cursor returned by an earlier read (def: end of the log)
+        :param limit: Max number of records to return
+        :param levels: Only return records of these levels (def: all)
+        :param query: Only return records containing this text, case-insensitive
+        :return: Page with the cursor to read older records from, None once the oldest file
+            was read, and, when reading from the end, the cursor to follow the log from
+        :raises ValueError: If the cursor is invalid
+        """
+        segments = self.segments()
+        if not segments:
+            return LogPage(entries=[], after="0:0")
+        index, end = self._locate(segments, cursor)
+        query = query.lower()
+        entries: List[LogEntry] = []
+        after = None
+        budget = self.max_scan_bytes
+        while True:
+            segment = segments[index]
+            with self._mapped(segment) as data:
+                if data is not None and cursor is None and after is None:
+                    end = data.rfind(b"\n", 0, end) + 1
+                    after = f"{segment.inode}:{end}"
+                window = self.window
+                while data is not None and end > 0 and len(entries) < limit and budget > 0:
+                    start = max(end - window, 0)
+                    records = self._records(data, start, end)
+                    if not records and start > 0:
+                        # NOTE: Record longer than the window.
+                        window *= 2
+                        continue
+                    budget -= end - start
+                    end = records[0][0] if records and start > 0 else 0
+                    for record in reversed(records):
+                        entry = self._entry(data, record, levels, query)
+                        if entry is None:
+                            continue
+                        if len(entries) == limit:
+                            end = max(end, record[1])
+                            break
+                        entries.append(entry)
+                    window = self.window
+            if after is None and cursor is None:
+                after = f"{segment.inode}:{segment.size}"
+            if end > 0 and data is not None:
+                return LogPage(entries=entries, before=f"{segment.inode}:{end}", after=after)
+            if index == 0:
+                return LogPage(entries=entries, before=None, after=after)
+            index -= 1
+            end = segments[index].size
+            if len(entries) >= limit or budget <= 0:
+                return LogPage(
+                    entries=entries, before=f"{segments[index].inode}:{end}", after=after
+                )
+
+
+log_reader = LogReader(Config.LOG_FILE) if Config.LOG_FILE else None
@@ -0,0 +1,202 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+class Metric(ABC):
+    """
+    Base of the minimal Prometheus-style metrics used by the app.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, values: LabelValues, extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, values, strict=True)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        escaped = (
+            (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for name, value in pairs
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """
+        Sample lines of the metric in the Prometheus text format.
+        """
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{self._format_labels(key)} {value}" for key, value in values.items()]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._label_values(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{self._format_labels(key)} {value}" for key, value in values.items()]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = (*sorted(buckets), math.inf)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._label_values(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            counts = {key: list(value) for key, value in self._counts.items()}
+            sums = dict(self._sums)
+        lines = []
+        for key, bucket_counts in counts.items():
+            for bound, count in zip(self.buckets, bucket_counts, strict=True):
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': le})} {count}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {sums[key]}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {bucket_counts[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric):
+        self.metrics.append(metric)
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        process_rss.set(get_process_rss())
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+def get_process_rss() -> float:
+    """
+    Resident memory of the app process in bytes (Linux only, 0 elsewhere).
+    """
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return float(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+registry = Registry()
+
+process_rss = Gauge("attctrl_process_resident_memory_bytes", "Resident memory of the app process.")
+browser_launches = Counter("attctrl_browser_launches_total", "Chromium launches by the pool.")
+browser_launch_seconds = Histogram(
+    "attctrl_browser_launch_seconds", "Time to launch Chromium.", buckets=(0.5, 1, 2, 5, 10, 30)
+)
+browser_contexts = Gauge("attctrl_browser_contexts_active", "Browser contexts currently leased.")
+browser_lease_wait_seconds = Histogram(
+    "attctrl_browser_lease_wait_seconds", "Time a task waited for a free browser slot."
+)
+browser_requests_blocked = Counter(
+    "attctrl_browser_requests_blocked_total", "Browser requests blocked by the filter.", ["reason"]
+)
+browser_step_seconds = Histogram(
+    "attctrl_browser_step_seconds", "Duration of browser run steps.", ["step"]
+)
+task_runs = Counter("attctrl_task_runs_total", "Finished task runs.", ["task", "outcome"])
+task_retries = Counter(
+    "attctrl_task_retries_total", "Task attempts retried after a failure.", ["kind"]
+)
+task_duration_seconds = Histogram("attctrl_task_duration_seconds", "Task run duration.", ["task"])
+task_start_lag_seconds = Histogram(
+    "attctrl_task_start_lag_seconds",
+    "Delay between the scheduled fire time and the actual task start.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 30, 60, 300),
+)
+task_missed = Counter("attctrl_task_missed_total", "Task runs missed by the scheduler.", ["task"])
+tasks_running = Gauge("attctrl_tasks_running", "Browser tasks admitted and running.")
+tasks_queued = Gauge("attctrl_tasks_queued", "Browser tasks waiting for admission.")
+task_admission_wait_seconds = Histogram(
+    "attctrl_task_admission_wait_seconds",
+    "Time a task waited in the admission queue.",
+    buckets=(0.01, 0.1, 1, 5, 30, 60, 300),
+)
+isolated_jobs = Counter(
+    "attctrl_isolated_jobs_total", "Browser jobs run in a subprocess, by outcome.", ["outcome"]
+)
+isolated_job_peak_rss_bytes = Histogram(
+    "attctrl_isolated_job_peak_rss_bytes",
+    "Peak resident memory of the process tree of an isolated browser job.",
+    buckets=tuple(mb * 1024 * 1024 for mb in (128, 256, 512, 1024, 2048, 4096)),
+)
+isolated_workers = Gauge("attctrl_isolated_workers", "Isolated browser job processes running.")
@@ -0,0 +1,176 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from attctrl.config import Config
+from attctrl.logger import new_logger
+from attctrl.metrics import (
+    browser_contexts,
+    browser_launch_seconds,
+    browser_launches,
+    browser_lease_wait_seconds,
+)
+from attctrl.resources import get_launch_args, resource_filter
+
+logger = new_logger(__name__)
+
+T = TypeVar("T")
+
+
+class BrowserPool:
+    """
+    Keeps one warm Chromium process and leases a fresh context to each browser task.
+
+    Contexts are cheap and isolated, so several tasks can share the browser at the same time.
+    The number of simultaneously leased contexts is capped by max_contexts, extra tasks wait.
+    A browser that reached its use limit is retired: new leases go to a fresh browser while
+    the old one is closed as soon as its last context is released.
+    """
+
+    def __init__(
+        self,
+        max_uses: int = Config.BROWSER_MAX_USES,
+        max_contexts: int = Config.BROWSER_MAX_CONTEXTS,
+    ) -> None:
+        self.max_uses = max_uses
+        self._slots = asyncio.Semaphore(max_contexts)
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._uses = 0
+        self._active: Dict[Browser, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def _launch(self) -> Browser:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        start = time.perf_counter()
+        browser = await self._playwright.chromium.launch(
+            headless=not Config.DEBUG, args=get_launch_args()
+        )
+        browser_launch_seconds.observe(time.perf_counter() - start)
+        browser_launches.inc()
+        self._uses = 0
+        self._active[browser] = 0
+        logger.debug("Browser pool: Chromium launched")
+        return browser
+
+    async def _close(self, browser: Browser):
+        self._active.pop(browser, None)
+        try:
+            if browser.is_connected():
+                await browser.close()
+        except Exception as e:
+            logger.warning(f"Browser pool: failed to close Chromium cleanly: {e}")
+        logger.debug("Browser pool: Chromium recycled")
+
+    async def _retire(self):
+        browser, self._browser = self._browser, None
+        if browser is not None and not self._active.get(browser):
+            await self._close(browser)
+
+    async def _acquire(self) -> Browser:
+        async with self._lock:
+            if self._browser is not None:
+                if not self._browser.is_connected():
+                    logger.warning("Browser pool: Chromium is not responding, relaunching")
+                    await self._retire()
+                elif self._uses >= self.max_uses:
+                    await self._retire()
+            if self._browser is None:
+                self._browser = await self._launch()
+            self._uses += 1
+            self._active[self._browser] += 1
+            return self._browser
+
+    async def _release(self, browser: Browser):
+        async with self._lock:
+            if browser in self._active:
+                self._active[browser] -= 1
+            if browser is self._browser and not browser.is_connected():
+                await self._retire()
+            elif browser is not self._browser and not self._active.get(browser):
+                await self._close(browser)
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        storage_state: Optional[Dict[str, Any]] = None,
+        geolocation: Optional[Dict[str, float]] = None,
+    ) -> AsyncIterator[BrowserContext]:
+        """
+        Lease a new browser context from the warm browser. Waits for a free slot if needed.
+
+        :param storage_state: Optional Playwright storage state to restore in the context
+        :param geolocation: Optional context geolocation (def: GEOLOC_LAT/GEOLOC_LONG)
+        """
+        start = time.perf_counter()
+        async with self._slots:
+            browser_lease_wait_seconds.observe(time.perf_counter() - start)
+            browser = await self._acquire()
+            browser_contexts.inc()
+            try:
+                context = await browser.new_context(
+                    permissions=["geolocation"],
+                    geolocation=geolocation
+                    or {"latitude": Config.GEOLOC_LAT, "longitude": Config.GEOLOC_LONG},
+                    viewport={"width": 1280, "height": 720},
+                    storage_state=storage_state,
+                )
+                try:
+                    if Config.BROWSER_BLOCK_RESOURCES:
+                        await resource_filter.apply(context)
+                    yield context
+                finally:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"Browser pool: failed to close context: {e}")
+            finally:
+                browser_contexts.dec()
+                await self._release(browser)
+
+    async def run(
+        self,
+        func: Callable[[BrowserContext], Awaitable[T]],
+        storage_state: Optional[Dict[str, Any]] = None,
+        geolocation: Optional[Dict[str, float]] = None,
+    ) -> T:
+        """
+        Run a coroutine function with a leased browser context.
+
+        :param func: Coroutine function receiving the leased context
+        :param storage_state: Optional Playwright storage state to restore in the context
+        :param geolocation: Optional context geolocation
+        :return: Result of the coroutine
+        """
+        async with self.lease(storage_state, geolocation) as context:
+            return await func(context)
+
+    async def warmup(self):
+        """
+        Launch Chromium ahead of time so the first task does not pay the startup cost.
+        """
+        try:
+            async with self._lock:
+                if self._browser is None:
+                    self._browser = await self._launch()
+        except Exception as e:
+            logger.error(f"Browser pool: failed to warm up Chromium: {e}")
+
+    async def shutdown(self):
+        """
+        Close all browsers and stop Playwright. The pool relaunches Chromium on next use.
+        """
+        async with self._lock:
+            self._browser = None
+            for browser in list(self._active):
+                await self._close(browser)
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,88 @@
+from typing import Iterable, List
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Route
+
+from attctrl.config import Config
+from attctrl.logger import new_logger
+from attctrl.metrics import browser_requests_blocked
+
+logger = new_logger(__name__)
+
+LEAN_CHROMIUM_ARGS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-translate",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-default-browser-check",
+    "--no-first-run",
+]
+
+
+class ResourceFilter:
+    """
+    Request interception that keeps only what the attendance flow needs.
+
+    Requests of the blocked resource types (images, media, fonts by default) are aborted,
+    as well as any request to a host outside the allowlist: analytics, trackers and widgets
+    are third-party, while the sign-in page and the people iframe are served by Zoho hosts.
+    """
+
+    def __init__(
+        self,
+        blocked_types: Iterable[str] = Config.BROWSER_BLOCKED_TYPES,
+        allowed_hosts: Iterable[str] = Config.BROWSER_ALLOWED_HOSTS,
+    ) -> None:
+        self.blocked_types = frozenset(blocked_types)
+        self.allowed_hosts = tuple(host.lower().lstrip(".") for host in allowed_hosts)
+
+    def is_host_allowed(self, host: str) -> bool:
+        host = host.lower()
+        return any(
+            host == allowed or host.endswith(f".{allowed}") for allowed in self.allowed_hosts
+        )
+
+    def block_reason(self, url: str, resource_type: str) -> str:
+        """
+        Get the reason to block a request.
+
+        :param url: Request URL
+        :param resource_type: Playwright resource type, e.g. 'image'
+        :return: Block reason or an empty string if the request is allowed
+        """
+        if resource_type in self.blocked_types:
+            return resource_type
+        parts = urlsplit(url)
+        if parts.scheme in ("http", "https") and not self.is_host_allowed(parts.hostname or ""):
+            return "third_party"
+        return ""
+
+    async def handle(self, route: Route):
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type)
+        if reason:
+            browser_requests_blocked.inc(reason=reason)
+            await route.abort("blockedbyclient")
+        else:
+            # NOTE: Fallback lets other routes (e.g. HAR replay) handle the request.
+            await route.fallback()
+
+    async def apply(self, context: BrowserContext):
+        """
+        Install the filter on all pages of the context.
+        """
+        await context.route("**/*", self.handle)
+
+
+resource_filter = ResourceFilter()
+
+
+def get_launch_args() -> List[str]:
+    """
+    Chromium command line flags for the pool browser.
+    """
+    return list(LEAN_CHROMIUM_ARGS) if Config.BROWSER_LEAN else []
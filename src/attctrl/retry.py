@@ -0,0 +1,161 @@
+import asyncio
+import random
+import time
+from enum import Enum
+from typing import Awaitable, Callable, TypeVar
+
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from attctrl.config import Config
+from attctrl.logger import new_logger
+from attctrl.metrics import task_retries
+
+logger = new_logger(__name__)
+
+T = TypeVar("T")
+
+
+class FailureKind(str, Enum):
+    TRANSIENT = "transient"
+    AUTH = "auth"
+    LIMIT = "limit"
+    ALREADY_IN_STATE = "already_in_state"
+    UNKNOWN = "unknown"
+
+
+class TaskError(Exception):
+    """
+    Browser task failure with a known cause.
+    """
+
+    kind = FailureKind.UNKNOWN
+
+
+class AuthError(TaskError):
+    kind = FailureKind.AUTH
+
+
+class SignInLimitError(TaskError, EnvironmentError):
+    kind = FailureKind.LIMIT
+
+
+class AlreadyInStateError(TaskError):
+    kind = FailureKind.ALREADY_IN_STATE
+
+
+# NOTE: Zoho also rejects requests in the body of a successful response, the message tells why.
+REJECTION_MARKERS = {
+    "try again": FailureKind.TRANSIENT,
+    "too many": FailureKind.TRANSIENT,
+    "temporarily": FailureKind.TRANSIENT,
+    "csrf": FailureKind.AUTH,
+    "session": FailureKind.AUTH,
+}
+
+
+class AttendanceRejectedError(TaskError):
+    """
+    Zoho answered the attendance request with an error status or an error in the body.
+
+    :param status: HTTP status of the response
+    :param message: Error message given by Zoho, if any
+    """
+
+    def __init__(self, status: int, message: str = "") -> None:
+        detail = f"HTTP {status}: {message}" if message else f"HTTP {status}"
+        super().__init__(f"Zoho rejected attendance request: {detail}")
+        self.status = status
+        self.message = message
+        text = message.lower()
+        kind = next((kind for marker, kind in REJECTION_MARKERS.items() if marker in text), None)
+        if kind is not None:
+            self.kind = kind
+        elif status >= 500 or status == 429:  # noqa: PLR2004
+            self.kind = FailureKind.TRANSIENT
+
+
+TRANSIENT_MARKERS = ("net::", "Timeout", "Target page, context or browser has been closed")
+
+
+def classify_failure(error: BaseException) -> FailureKind:
+    """
+    Tell whether a browser task failure is worth another attempt.
+
+    :param error: Exception raised by the task
+    :return: Failure kind, only 'transient' failures are retried
+    """
+    if isinstance(error, TaskError):
+        return error.kind
+    if isinstance(error, (PlaywrightTimeoutError, TimeoutError, ConnectionError)):
+        return FailureKind.TRANSIENT
+    if isinstance(error, PlaywrightError) and any(
+        marker in str(error) for marker in TRANSIENT_MARKERS
+    ):
+        return FailureKind.TRANSIENT
+    return FailureKind.UNKNOWN
+
+
+class RetryPolicy:
+    """
+    Retries transient failures with exponential backoff and full jitter within a deadline.
+
+    :param max_attempts: Max number of attempts, the first one included
+    :param deadline: Time in seconds since the first attempt after which no retry is started
+    :param base_delay: Pause before the second attempt, doubled for every next one
+    :param max_delay: Upper bound of a single pause
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = Config.TASK_RETRY_ATTEMPTS,
+        deadline: float = Config.TASK_RETRY_DEADLINE,
+        base_delay: float = Config.TASK_RETRY_BACKOFF,
+        max_delay: float = 60.0,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """
+        Pause before the next attempt, after the given failed attempt number.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def run(self, func: Callable[[int], Awaitable[T]], name: str) -> T:
+        """
+        Call the coroutine function until it succeeds, fails for good or the deadline passes.
+
+        :param func: Coroutine function receiving the attempt number
+        :param name: Task name for the logs and metrics
+        :return: Result of the successful attempt
+        :raises: Exception of the last failed attempt
+        """
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                return await func(attempt)
+            except Exception as e:
+                kind = classify_failure(e)
+                delay = self.delay(attempt)
+                elapsed = time.monotonic() - start
+                if (
+                    kind != FailureKind.TRANSIENT
+                    or attempt >= self.max_attempts
+                    or elapsed + delay >= self.deadline
+                ):
+                    if attempt > 1:
+                        logger.warning(f"{name}: giving up after {attempt} attempts")
+                    raise
+                logger.warning(
+                    f"{name}: attempt {attempt}/{self.max_attempts} failed ({kind.value}): {e}."
+                    f" Retrying in {delay:.0f}s"
+                )
+                task_retries.inc(kind=kind.value)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+retry_policy = RetryPolicy()
@@ -0,0 +1,300 @@
+import asyncio
+import copy
+import json
+import sqlite3
+import threading
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from attctrl.config import Config
+from attctrl.logger import new_logger
+from attctrl.metrics import task_duration_seconds, task_runs
+
+logger = new_logger(__name__)
+
+
+@dataclass
+class ScheduledRun:
+    """
+    Job that is being executed, as seen by the task coroutine.
+    """
+
+    task_id: str
+    fire_time: Optional[datetime] = None
+    trigger: Any = None
+
+    @property
+    def nominal_time(self) -> Optional[datetime]:
+        """
+        Fire time of the trigger before jitter was applied.
+        """
+        jitter = getattr(self.trigger, "jitter", None)
+        if self.fire_time is None or not jitter:
+            return self.fire_time
+        trigger = copy.copy(self.trigger)
+        trigger.jitter = None
+        return trigger.get_next_fire_time(None, self.fire_time - timedelta(seconds=jitter))
+
+
+class RunRecord(BaseModel):
+    id: Optional[int] = None
+    task_id: Optional[str] = None
+    task_type: str
+    account: str
+    scheduled_at: Optional[datetime] = None
+    fired_at: Optional[datetime] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    jitter: Optional[float] = None
+    steps: Dict[str, float] = {}
+    outcome: str = "running"
+    error: Optional[str] = None
+    artifacts: List[str] = []
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+
+
+current_job: ContextVar[Optional[ScheduledRun]] = ContextVar("current_job", default=None)
+current_run: ContextVar[Optional[RunRecord]] = ContextVar("current_run", default=None)
+
+
+class RunHistory:
+    """
+    SQLite store of every task run, kept next to the job store.
+    """
+
+    COLUMNS = (
+        "id",
+        "task_id",
+        "task_type",
+        "account",
+        "scheduled_at",
+        "fired_at",
+        "started_at",
+        "finished_at",
+        "jitter",
+        "steps",
+        "outcome",
+        "error",
+        "artifacts",
+    )
+
+    def __init__(self, data_dir: Path = Config.DATA_DIR) -> None:
+        self.db_file = Path(data_dir, "history.sqlite")
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.db_file, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id TEXT,
+                    task_type TEXT NOT NULL,
+                    account TEXT NOT NULL,
+                    scheduled_at TEXT,
+                    fired_at TEXT,
+                    started_at TEXT NOT NULL,
+                    finished_at TEXT,
+                    run_date TEXT NOT NULL,
+                    jitter REAL,
+                    steps TEXT NOT NULL DEFAULT '{}',
+                    outcome TEXT NOT NULL,
+                    error TEXT,
+                    artifacts TEXT NOT NULL DEFAULT '[]'
+                );
+                CREATE INDEX IF NOT EXISTS runs_date ON runs (run_date);
+                CREATE INDEX IF NOT EXISTS runs_account_date ON runs (account, run_date);
+                CREATE INDEX IF NOT EXISTS runs_outcome_date ON runs (outcome, run_date);
+                """
+            )
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(runs)")}
+            if "artifacts" not in columns:
+                # NOTE: History created before artifacts were recorded.
+                with connection:
+                    connection.execute(
+                        "ALTER TABLE runs ADD COLUMN artifacts TEXT NOT NULL DEFAULT '[]'"
+                    )
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def _to_row(run: RunRecord) -> Tuple:
+        def iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+
+        return (
+            run.task_id,
+            run.task_type,
+            run.account,
+            iso(run.scheduled_at),
+            iso(run.fired_at),
+            iso(run.started_at),
+            iso(run.finished_at),
+            run.started_at.astimezone().date().isoformat(),
+            run.jitter,
+            json.dumps(run.steps),
+            run.outcome,
+            run.error,
+            json.dumps(run.artifacts),
+        )
+
+    def add_run(self, run: RunRecord) -> RunRecord:
+        """
+        Store a finished run.
+
+        :param run: Run to store
+        :return: Stored run with its id set
+        """
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                cursor = connection.execute(
+                    "INSERT INTO runs (task_id, task_type, account, scheduled_at, fired_at,"
+                    " started_at, finished_at, run_date, jitter, steps, outcome, error,"
+                    " artifacts)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._to_row(run),
+                )
+            run.id = cursor.lastrowid
+            return run
+
+    def get_runs(
+        self,
+        limit: int = 20,
+        before_id: Optional[int] = None,
+        account: Optional[str] = None,
+        outcome: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> List[RunRecord]:
+        """
+        Get runs, newest first, with keyset pagination.
+
+        :param limit: Max number of runs to return
+        :param before_id: Only return runs older than this run id
+        :param account: Filter by account id
+        :param outcome: Filter by outcome ('success', 'failed', 'skipped', 'error')
+        :param date_from: Filter by local run date, inclusive
+        :param date_to: Filter by local run date, inclusive
+        :return: List of runs
+        """
+        conditions, params = [], []
+        if before_id is not None:
+            conditions.append("id < ?")
+            params.append(before_id)
+        if account:
+            conditions.append("account = ?")
+            params.append(account)
+        if outcome:
+            conditions.append("outcome = ?")
+            params.append(outcome)
+        if date_from:
+            conditions.append("run_date >= ?")
+            params.append(date_from.isoformat())
+        if date_to:
+            conditions.append("run_date <= ?")
+            params.append(date_to.isoformat())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM runs {where} ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            rows = self._connect().execute(query, (*params, limit)).fetchall()
+        return [
+            RunRecord(
+                **{
+                    **dict(row),
+                    "steps": json.loads(row["steps"]),
+                    "artifacts": json.loads(row["artifacts"]),
+                }
+            )
+            for row in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+run_history = RunHistory()
+
+
+@asynccontextmanager
+async def track_run(task_type: str, account_id: str) -> AsyncIterator[RunRecord]:
+    """
+    Record a task run in the history. The body sets the outcome on the yielded record.
+
+    :param task_type: Task type, e.g. 'checkin'
+    :param account_id: Account the task runs for
+    """
+    job = current_job.get()
+    run = RunRecord(
+        task_id=job.task_id if job else None,
+        task_type=task_type,
+        account=account_id,
+        started_at=datetime.now(timezone.utc),
+    )
+    if job is not None and job.fire_time is not None:
+        run.fired_at = job.fire_time
+        run.scheduled_at = job.nominal_time
+        if run.scheduled_at is not None:
+            run.jitter = (run.fired_at - run.scheduled_at).total_seconds()
+    token = current_run.set(run)
+    try:
+        yield run
+    except Exception as e:
+        run.outcome = "error"
+        run.error = run.error or str(e)
+        raise
+    finally:
+        current_run.reset(token)
+        run.finished_at = datetime.now(timezone.utc)
+        task_runs.inc(task=task_type, outcome=run.outcome)
+        task_duration_seconds.observe(run.duration, task=task_type)
+        try:
+            await asyncio.to_thread(run_history.add_run, run)
+        except Exception as e:
+            logger.error(f"Failed to store run history: {e}")
+
+
+def note_run_error(error: str):
+    """
+    Attach an error message to the run being executed, if any.
+    """
+    run = current_run.get()
+    if run is not None and run.error is None:
+        run.error = error
+
+
+def note_run_steps(steps: Dict[str, float]):
+    """
+    Attach browser step durations to the run being executed, if any.
+    """
+    run = current_run.get()
+    if run is not None:
+        run.steps.update(steps)
+
+
+def note_run_artifact(path: str):
+    """
+    Attach a failure artifact to the run being executed, if any.
+
+    :param path: Artifact path relative to the artifact store, '<run dir>/<file name>'
+    """
+    run = current_run.get()
+    if run is not None:
+        run.artifacts.append(path)
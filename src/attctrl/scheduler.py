@@ -1,12 +1,46 @@
-from typing import List, Optional
+import asyncio
+import random
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
 
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.events import (
+    EVENT_ALL_JOBS_REMOVED,
+    EVENT_JOB_ADDED,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_MODIFIED,
+    EVENT_JOB_REMOVED,
+    JobEvent,
+    JobExecutionEvent,
+)
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.base import run_coroutine_job
+from apscheduler.job import Job
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_RUNNING
 from apscheduler.triggers.cron import CronTrigger
-from pydantic import BaseModel
+from apscheduler.util import iscoroutinefunction_partial
+from pydantic import BaseModel, PrivateAttr
 
+from attctrl.accounts import DEFAULT_ACCOUNT_ID
+from attctrl.admission import (
+    SpreadCronTrigger,
+    admission_controller,
+    get_priority,
+    group_phase,
+    nominal_fire_time,
+    spread_offsets,
+)
 from attctrl.config import Config
 from attctrl.logger import new_logger
+from attctrl.metrics import task_missed, task_start_lag_seconds
+from attctrl.runs import ScheduledRun, current_job
+from attctrl.schedules import TaskSpec
+
+if TYPE_CHECKING:
+    from attctrl.jobstore import TransactionalJobStore
 
 logger = new_logger(__name__)
 
@@ -21,17 +55,262 @@ class CronIndexMap:
 class Task(BaseModel):
     id: str
     func: str
+    account: str
     dow: str
     time: str
     jitter: Optional[int]
     timezone: Optional[str]
+    backend: Optional[str] = None
+
+    _trigger: Optional[CronTrigger] = PrivateAttr(default=None)
+
+    @property
+    def trigger(self) -> Optional[CronTrigger]:
+        return self._trigger
+
+
+class AdmittedJob:
+    """
+    Job already checked for a missed run time when it fired. Its run may start long after
+    the misfire grace time, once spread and admitted, so the check is not repeated.
+    """
+
+    misfire_grace_time = None
+
+    def __init__(self, job: Job) -> None:
+        self._job = job
+
+    def __getattr__(self, name: str):
+        return getattr(self._job, name)
+
+    def __str__(self) -> str:
+        return str(self._job)
+
+
+class TaskExecutor(AsyncIOExecutor):
+    """
+    AsyncIO executor exposing the job being run to its coroutine through a context variable.
+    It also measures the lag between the scheduled fire time and the actual job start.
+
+    A job is delayed by the offset given by the planner, then waits for admission,
+    so only a limited number of browser tasks run at the same time. Missed run times are
+    detected when the job fires, the delay and the wait never make a job miss its run.
+
+    :param planner: Function giving the start offset in seconds of a job fired at a time
+    """
+
+    def __init__(self, planner: Optional[Callable[[Job, datetime], float]] = None) -> None:
+        super().__init__()
+        self.planner = planner
+
+    def _check_misfires(
+        self, job: Job, run_times: List[datetime]
+    ) -> Tuple[List[JobExecutionEvent], List[datetime]]:
+        """
+        Split the run times of a fired job into missed ones, as events, and due ones.
+        """
+        if job.misfire_grace_time is None:
+            return [], run_times
+        now = datetime.now(timezone.utc)
+        grace_time = timedelta(seconds=job.misfire_grace_time)
+        missed, due = [], []
+        for run_time in run_times:
+            if now - run_time <= grace_time:
+                due.append(run_time)
+                continue
+            missed.append(
+                JobExecutionEvent(EVENT_JOB_MISSED, job.id, job._jobstore_alias, run_time)
+            )
+            self._logger.warning(f"Run time of job '{job}' was missed by {now - run_time}")
+        return missed, due
+
+    def _do_submit_job(self, job, run_times):
+        if not iscoroutinefunction_partial(job.func):
+            return super()._do_submit_job(job, run_times)
+        missed, run_times = self._check_misfires(job, run_times)
+
+        async def run_job():
+            if not run_times:
+                return missed
+            offset = self.planner(job, run_times[-1]) if self.planner is not None else 0.0
+            fire_time = run_times[-1] + timedelta(seconds=offset)
+            if offset:
+                delay = (fire_time - datetime.now(timezone.utc)).total_seconds()
+                self._logger.info(f"Job '{job.id}' spread by {offset:.0f}s")
+                await asyncio.sleep(max(delay, 0.0))
+            lag = (datetime.now(timezone.utc) - fire_time).total_seconds()
+            task_start_lag_seconds.observe(max(lag, 0.0), task=job.func.__name__)
+            current_job.set(ScheduledRun(job.id, fire_time, job.trigger))
+            async with admission_controller.admit(get_priority(job.func.__name__), job.id):
+                return missed + await run_coroutine_job(
+                    AdmittedJob(job), job._jobstore_alias, run_times, self._logger.name
+                )
+
+        def callback(f):
+            self._pending_futures.discard(f)
+            try:
+                events = f.result()
+            except BaseException:
+                self._run_job_error(job.id, *sys.exc_info()[1:])
+            else:
+                self._run_job_success(job.id, events)
+
+        f = self._eventloop.create_task(run_job())
+        f.add_done_callback(callback)
+        self._pending_futures.add(f)
+        return None
 
 
 class TaskScheduler:
+    """
+    Scheduler of the attendance tasks.
+
+    Reading jobs from the job store unpickles every job, so the task list is served from an
+    in-memory index, built once and kept in sync with APScheduler job events. The index
+    version changes on every update and can be used to validate cached task views.
+
+    Jobs firing in the same minute are spread over their jitter windows in a stable order
+    (check-ins first) and started through the admission controller.
+
+    The job store (WAL SQLite or in-memory with snapshots, see JOBSTORE) is only loaded
+    on start, so creating the scheduler at import time is cheap. A scheduler started paused
+    shares the SQLite job store with the one running the jobs, see SchedulerCoordinator.
+    """
+
     def __init__(self, jobs_dir: str = Config.DATA_DIR.as_posix()):
-        self.jobstore = SQLAlchemyJobStore(url=f"sqlite:///{jobs_dir}/jobs.sqlite")
-        self.scheduler = BackgroundScheduler(jobstores={"default": self.jobstore})
-        self.scheduler.start()
+        self.jobs_dir = jobs_dir
+        self.jobstore: Optional[TransactionalJobStore] = None
+        self.scheduler = AsyncIOScheduler(
+            executors={"default": TaskExecutor(self.get_spread_offset)}
+        )
+        self._index: Optional[Dict[str, Task]] = None
+        self._index_lock = threading.Lock()
+        self.version = 0
+        self.scheduler.add_listener(self._on_job_missed, EVENT_JOB_MISSED)
+        self.scheduler.add_listener(
+            self._on_job_changed,
+            EVENT_JOB_ADDED | EVENT_JOB_MODIFIED | EVENT_JOB_REMOVED | EVENT_ALL_JOBS_REMOVED,
+        )
+
+    @staticmethod
+    def _to_task(job: Job) -> Task:
+        fields = job.trigger.fields
+        task = Task(
+            id=job.id,
+            func=job.func.__name__,
+            account=job.kwargs.get("account_id", DEFAULT_ACCOUNT_ID),
+            dow=str(fields[CronIndexMap.dow]),
+            time=":".join(
+                str(fields[index]).zfill(2)
+                for index in (CronIndexMap.hour, CronIndexMap.minute, CronIndexMap.second)
+            ),
+            jitter=job.trigger.jitter,
+            timezone=str(job.trigger.timezone),
+            backend=job.kwargs.get("backend"),
+        )
+        task._trigger = job.trigger
+        return task
+
+    @staticmethod
+    def _task_kwargs(account_id: str, backend: Optional[str]) -> Dict[str, str]:
+        kwargs = {"account_id": account_id}
+        if backend:
+            kwargs["backend"] = backend
+        return kwargs
+
+    def _load_index(self) -> Dict[str, Task]:
+        if self._index is None:
+            self._index = {job.id: self._to_task(job) for job in self.scheduler.get_jobs()}
+        return self._index
+
+    def _on_job_changed(self, event: JobEvent):
+        with self._index_lock:
+            self.version += 1
+            if self._index is None:
+                return
+            if event.code == EVENT_ALL_JOBS_REMOVED:
+                self._index.clear()
+            elif event.code == EVENT_JOB_REMOVED:
+                self._index.pop(event.job_id, None)
+            else:
+                job = self.scheduler.get_job(event.job_id)
+                if job is not None:
+                    self._index[job.id] = self._to_task(job)
+
+    def _on_job_missed(self, event: JobExecutionEvent):
+        task = self.get_task(event.job_id)
+        task_missed.inc(task=task.func if task is not None else "unknown")
+        logger.warning(f"Task '{event.job_id}' missed its run time {event.scheduled_run_time}")
+
+    def _upgrade_triggers(self):
+        # NOTE: Stored schedules keep their plain random jitter unless spreading was enabled.
+        if not Config.TASK_SPREAD:
+            return
+        jobs = [job for job in self.scheduler.get_jobs() if type(job.trigger) is CronTrigger]
+        for job in jobs:
+            self.scheduler.modify_job(job.id, trigger=SpreadCronTrigger.from_trigger(job.trigger))
+        if jobs:
+            logger.info(f"{len(jobs)} tasks switched to spread jitter")
+
+    def get_spread_offset(self, job: Job, fire_time: datetime) -> float:
+        """
+        Get the start offset of a job within its jitter window.
+
+        All tasks with a nominal fire time in the same minute as the job share the window,
+        see spread_offsets. A job colliding with no other one gets a random offset.
+
+        :param job: Fired job
+        :param fire_time: Nominal fire time of the job
+        :return: Offset in seconds, 0 if spreading is disabled or the job has no jitter
+        """
+        if not (Config.TASK_SPREAD and isinstance(job.trigger, SpreadCronTrigger)):
+            return 0.0
+        if not job.trigger.jitter:
+            return 0.0
+        minute = fire_time.astimezone(timezone.utc).replace(second=0, microsecond=0)
+        colliding = []
+        for task in self.get_tasks():
+            if task.trigger is None:
+                continue
+            time = nominal_fire_time(task.trigger, minute)
+            if time is not None and time - minute < timedelta(minutes=1):
+                colliding.append((task.id, get_priority(task.func), task.jitter or 0))
+        if len(colliding) < 2:  # noqa: PLR2004
+            return random.uniform(0, job.trigger.jitter)
+        return spread_offsets(colliding, group_phase(minute)).get(job.id, 0.0)
+
+    def start(self, paused: bool = False):
+        """
+        Start the scheduler on the running event loop. Coroutine tasks run as loop tasks.
+
+        :param paused: Only manage the jobs, don't run them until resumed
+        """
+        from attctrl.jobstore import create_jobstore  # noqa: PLC0415
+
+        self.jobstore = create_jobstore(Config.JOBSTORE, Path(self.jobs_dir))
+        self.scheduler.add_jobstore(self.jobstore, "default")
+        self.scheduler.start(paused=paused)
+        if not paused:
+            self._upgrade_triggers()
+
+    def resume(self):
+        """
+        Start running the jobs of a scheduler started paused.
+        """
+        self.invalidate()
+        self.scheduler.resume()
+        self._upgrade_triggers()
+
+    def invalidate(self):
+        """
+        Drop the task index after the job store was changed by another process,
+        and let the scheduler pick up jobs that are due earlier now.
+        """
+        with self._index_lock:
+            self._index = None
+            self.version += 1
+        if self.scheduler.state == STATE_RUNNING:
+            self.scheduler.wakeup()
 
     def add_task(
         self,
@@ -40,7 +319,9 @@ class TaskScheduler:
         time: str,
         timezone: Optional[str] = None,
         jitter: Optional[int] = None,
-    ):
+        account_id: str = DEFAULT_ACCOUNT_ID,
+        backend: Optional[str] = None,
+    ) -> Optional[Task]:
         """
         Add a new task to the scheduler.
 
@@ -49,12 +330,15 @@ class TaskScheduler:
         :param time: Time to run the task in HH:MM:SS format
         :param timezone: The timezone for the task (e.g., 'UTC', 'America/New_York')
         :param jitter: Maximum time (in seconds) to randomly delay the task execution
+        :param account_id: Account the task is executed for
+        :param backend: Attendance backend of the task (def: ATTENDANCE_BACKEND)
+        :return: Added task or None if the task can't be added
         """
         hour, minute, second = map(int, time.split(":"))
         try:
-            self.scheduler.add_job(
+            job = self.scheduler.add_job(
                 task_func,
-                trigger=CronTrigger(
+                trigger=SpreadCronTrigger(
                     day_of_week=day_of_week,
                     hour=hour,
                     minute=minute,
@@ -62,45 +346,138 @@ class TaskScheduler:
                     timezone=timezone,
                     jitter=jitter,
                 ),
+                kwargs=self._task_kwargs(account_id, backend),
                 replace_existing=True,
             )
             logger.info("Task added successfully")
+            return self._to_task(job)
         except Exception as e:
             logger.error(f"Failed to add task : {e}")
+            return None
+
+    def add_tasks(self, specs: Sequence[TaskSpec], task_funcs: Dict[str, Callable]) -> List[Task]:
+        """
+        Add several tasks at once. All tasks are validated first and written to the job store
+        in one transaction, so either every task is added or none of them.
 
-    def remove_task(self, task_id: str):
+        :param specs: Tasks to add
+        :param task_funcs: Task functions by task type
+        :return: Added tasks
+        :raises ValueError: If any of the tasks is invalid
+        """
+        errors = [
+            f"#{i + 1}: unknown task type '{spec.type}'"
+            for i, spec in enumerate(specs)
+            if spec.type not in task_funcs
+        ]
+        if errors:
+            raise ValueError("; ".join(errors))
+        triggers = [spec.trigger() for spec in specs]
+        try:
+            with self.jobstore.transaction():
+                jobs = [
+                    self.scheduler.add_job(
+                        task_funcs[spec.type],
+                        trigger=trigger,
+                        kwargs=self._task_kwargs(spec.account, spec.backend),
+                    )
+                    for spec, trigger in zip(specs, triggers, strict=True)
+                ]
+        except Exception:
+            # NOTE: Job events of a rolled back batch may have reached the index already.
+            with self._index_lock:
+                self._index = None
+            raise
+        tasks = [self._to_task(job) for job in jobs]
+        with self._index_lock:
+            if self._index is not None:
+                self._index.update((task.id, task) for task in tasks)
+        logger.info(f"{len(tasks)} tasks added successfully")
+        return tasks
+
+    def remove_task(self, task_id: str) -> bool:
         """
         Remove a task from the scheduler.
 
         :param task_id: The unique identifier of the task to remove
+        :return: True if the task was removed
         """
         try:
             self.scheduler.remove_job(task_id)
             logger.info(f"Task '{task_id}' removed successfully")
+            return True
         except Exception as e:
             logger.error(f"Failed to remove task '{task_id}': {e}")
+            return False
+
+    def remove_tasks(self, task_ids: Sequence[str]) -> List[str]:
+        """
+        Remove several tasks in one job store transaction.
+
+        :param task_ids: Identifiers of the tasks to remove
+        :return: Identifiers of the removed tasks, unknown ones are skipped
+        """
+        with self._index_lock:
+            index = self._load_index()
+            task_ids = [task_id for task_id in dict.fromkeys(task_ids) if task_id in index]
+        try:
+            with self.jobstore.transaction():
+                for task_id in task_ids:
+                    self.scheduler.remove_job(task_id)
+        except Exception as e:
+            logger.error(f"Failed to remove tasks: {e}")
+            with self._index_lock:
+                self._index = None
+            return []
+        logger.info(f"{len(task_ids)} tasks removed successfully")
+        return task_ids
+
+    async def run_task(self, task_id: str) -> Optional[bool]:
+        """
+        Run a task right away on the current event loop and wait for its result.
+
+        :param task_id: The unique identifier of the task to run
+        :return: Result of the task function or None if the task is not found
+        """
+        job = self.scheduler.get_job(task_id)
+        if job is None:
+            logger.error(f"Task '{task_id}' not found")
+            return None
+        logger.info(f"Task '{task_id}' started manually")
+        current_job.set(ScheduledRun(job.id))
+        try:
+            async with admission_controller.admit(get_priority(job.func.__name__), job.id):
+                return bool(await job.func(*job.args, **job.kwargs))
+        except Exception as e:
+            logger.error(f"Task '{task_id}' failed: {e}")
+            return False
 
     def get_tasks(self) -> List[Task]:
         """
         Get a list of all scheduled tasks.
 
-        :return: A list of dictionaries containing task information
-        """
-        jobs = self.scheduler.get_jobs()
-        return [
-            Task(
-                id=job.id,
-                func=job.func.__name__,
-                dow=str(job.trigger.fields[CronIndexMap.dow]),
-                time=f"{str(job.trigger.fields[CronIndexMap.hour]).zfill(2)}:{str(job.trigger.fields[CronIndexMap.minute]).zfill(2)}:{str(job.trigger.fields[CronIndexMap.second]).zfill(2)}",
-                jitter=job.trigger.jitter,
-                timezone=str(job.trigger.timezone),
-            )
-            for job in jobs
-        ]
+        :return: A list of tasks, from the in-memory index
+        """
+        with self._index_lock:
+            return list(self._load_index().values())
+
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """
+        Get a scheduled task.
+
+        :param task_id: The unique identifier of the task
+        :return: Task or None if it is not found
+        """
+        with self._index_lock:
+            return self._load_index().get(task_id)
+
+    @property
+    def running(self) -> bool:
+        return self.scheduler.running
 
     def shutdown(self):
         """
-        Shut down the scheduler.
+        Shut down the scheduler if it was started.
         """
-        self.scheduler.shutdown(wait=True)
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=True)
@@ -0,0 +1,225 @@
+import csv
+import io
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, TypeAdapter, field_validator, model_validator
+
+from attctrl.accounts import DEFAULT_ACCOUNT_ID
+from attctrl.admission import SpreadCronTrigger
+from attctrl.config import Config
+from attctrl.logger import new_logger
+
+logger = new_logger(__name__)
+
+TaskType = Literal["checkin", "checkout", "test"]
+BackendName = Literal["browser", "http"]
+
+CSV_FIELDS = ("type", "account", "dow", "time", "jitter", "timezone", "backend")
+
+
+class TaskSpec(BaseModel):
+    """
+    Task definition used by bulk creation, import/export and schedule templates.
+    """
+
+    type: TaskType
+    account: str = DEFAULT_ACCOUNT_ID
+    dow: str
+    time: str
+    jitter: Optional[int] = None
+    timezone: Optional[str] = None
+    backend: Optional[BackendName] = None
+
+    @field_validator("time")
+    @classmethod
+    def normalize_time(cls, value: str) -> str:
+        parts = value.strip().split(":")
+        if len(parts) == 2:  # noqa: PLR2004
+            parts.append("00")
+        try:
+            hour, minute, second = map(int, parts)
+        except ValueError:
+            raise ValueError(f"Time '{value}' is not in HH:MM:SS format") from None
+        if not (0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 60):  # noqa: PLR2004
+            raise ValueError(f"Time '{value}' is out of range")
+        return f"{hour:02}:{minute:02}:{second:02}"
+
+    @model_validator(mode="after")
+    def check_trigger(self) -> "TaskSpec":
+        self.trigger()
+        return self
+
+    def trigger(self) -> SpreadCronTrigger:
+        """
+        Build the cron trigger of the task. Raises ValueError on invalid days or timezone.
+        """
+        hour, minute, second = map(int, self.time.split(":"))
+        return SpreadCronTrigger(
+            day_of_week=self.dow,
+            hour=hour,
+            minute=minute,
+            second=second,
+            timezone=self.timezone or None,
+            jitter=self.jitter or None,
+        )
+
+
+task_specs_adapter = TypeAdapter(List[TaskSpec])
+
+
+def specs_to_json(specs: List[TaskSpec]) -> str:
+    return task_specs_adapter.dump_json(specs, indent=2).decode()
+
+
+def specs_from_json(data: str) -> List[TaskSpec]:
+    """
+    Parse task specs from a JSON list. Raises pydantic ValidationError on invalid data.
+    """
+    return task_specs_adapter.validate_json(data)
+
+
+def specs_to_csv(specs: List[TaskSpec]) -> str:
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for spec in specs:
+        writer.writerow(spec.model_dump())
+    return output.getvalue()
+
+
+def specs_from_csv(data: str) -> List[TaskSpec]:
+    """
+    Parse task specs from CSV with a header row. Empty cells fall back to the defaults.
+    Raises pydantic ValidationError on invalid data.
+    """
+    rows = [
+        {key: value for key, value in row.items() if key and value not in (None, "")}
+        for row in csv.DictReader(io.StringIO(data))
+    ]
+    return task_specs_adapter.validate_python(rows)
+
+
+class ScheduleTemplate(BaseModel):
+    """
+    Named weekly schedule. Entry accounts are ignored, a template is applied to one account.
+    """
+
+    name: str
+    description: str = ""
+    tasks: List[TaskSpec]
+
+    def for_account(self, account_id: str) -> List[TaskSpec]:
+        return [spec.model_copy(update={"account": account_id}) for spec in self.tasks]
+
+
+BUILTIN_TEMPLATES = [
+    ScheduleTemplate(
+        name="standard 9-18",
+        description="Mon-Fri check-in at 09:00 and check-out at 18:00 with 10 min jitter",
+        tasks=[
+            TaskSpec(type="checkin", dow="mon-fri", time="09:00:00", jitter=600),
+            TaskSpec(type="checkout", dow="mon-fri", time="18:00:00", jitter=600),
+        ],
+    ),
+    ScheduleTemplate(
+        name="early 8-17",
+        description="Mon-Fri check-in at 08:00 and check-out at 17:00 with 10 min jitter",
+        tasks=[
+            TaskSpec(type="checkin", dow="mon-fri", time="08:00:00", jitter=600),
+            TaskSpec(type="checkout", dow="mon-fri", time="17:00:00", jitter=600),
+        ],
+    ),
+    ScheduleTemplate(
+        name="short friday",
+        description="Mon-Thu 09:00-18:00, Fri 09:00-16:00, 10 min jitter",
+        tasks=[
+            TaskSpec(type="checkin", dow="mon-fri", time="09:00:00", jitter=600),
+            TaskSpec(type="checkout", dow="mon-thu", time="18:00:00", jitter=600),
+            TaskSpec(type="checkout", dow="fri", time="16:00:00", jitter=600),
+        ],
+    ),
+]
+
+
+class ScheduleTemplateStore:
+    """
+    Built-in and user-defined weekly schedule templates. User templates are kept as JSON
+    in the data dir and can override a built-in template with the same name. The file is
+    read again when another worker changed it.
+    """
+
+    def __init__(self, data_dir: Path = Config.DATA_DIR) -> None:
+        self.templates_file = Path(data_dir, "schedule_templates.json")
+        self._templates: Optional[Dict[str, ScheduleTemplate]] = None
+        self._mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, ScheduleTemplate]:
+        try:
+            mtime = self.templates_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self._templates is None or mtime != self._mtime:
+            self._templates = {}
+            if mtime is not None:
+                try:
+                    data = json.loads(self.templates_file.read_text())
+                    self._templates = {item["name"]: ScheduleTemplate(**item) for item in data}
+                except ValueError as e:
+                    logger.error(f"Failed to read schedule templates: {e}")
+            self._mtime = mtime
+        return self._templates
+
+    def _save(self):
+        data = json.dumps([template.model_dump() for template in self._load().values()], indent=2)
+        tmp_file = self.templates_file.with_suffix(".tmp")
+        tmp_file.write_text(data)
+        tmp_file.replace(self.templates_file)
+        self._mtime = self.templates_file.stat().st_mtime_ns
+
+    def get_templates(self) -> List[ScheduleTemplate]:
+        with self._lock:
+            templates = {template.name: template for template in BUILTIN_TEMPLATES}
+            templates.update(self._load())
+            return list(templates.values())
+
+    def get_template(self, name: str) -> Optional[ScheduleTemplate]:
+        """
+        Get a template by its name.
+
+        :param name: Template name
+        :return: Template or None if it is not found
+        """
+        return next((template for template in self.get_templates() if template.name == name), None)
+
+    def save_template(self, template: ScheduleTemplate):
+        """
+        Store a user template, replacing the one with the same name.
+
+        :param template: Template to store
+        """
+        with self._lock:
+            self._load()[template.name] = template
+            self._save()
+        logger.info(f"Schedule template '{template.name}' saved successfully")
+
+    def remove_template(self, name: str) -> bool:
+        """
+        Remove a user template. Built-in templates can't be removed.
+
+        :param name: Template name
+        :return: True if the template was removed
+        """
+        with self._lock:
+            if self._load().pop(name, None) is None:
+                logger.error(f"Schedule template '{name}' not found or built-in")
+                return False
+            self._save()
+        logger.info(f"Schedule template '{name}' removed successfully")
+        return True
+
+
+schedule_template_store = ScheduleTemplateStore()
@@ -0,0 +1,123 @@
+import json
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from attctrl.config import Config
+from attctrl.crypto import Cipher, InvalidToken, cipher
+from attctrl.logger import new_logger
+
+logger = new_logger(__name__)
+
+
+class SessionStore:
+    """
+    Encrypted on-disk cache of the authenticated Zoho browser session of one account.
+
+    Playwright storage state (cookies and localStorage) is kept encrypted with a key derived
+    from SESSION_SECRET, so a valid session can be reused instead of spending a new sign-in.
+    The store also counts full sign-ins done today against the Zoho daily limit.
+    """
+
+    def __init__(
+        self,
+        account_id: str,
+        data_dir: Path = Config.DATA_DIR,
+        store_cipher: Cipher = cipher,
+    ) -> None:
+        sessions_dir = Path(data_dir, "sessions")
+        sessions_dir.mkdir(exist_ok=True)
+        self.state_file = Path(sessions_dir, f"{account_id}.bin")
+        self.counter_file = Path(sessions_dir, f"{account_id}.logins.json")
+        self._cipher = store_cipher
+        self._lock = threading.Lock()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the cached storage state.
+
+        :return: Playwright storage state or None if there is no usable session
+        """
+        with self._lock:
+            if not self.state_file.exists():
+                return None
+            try:
+                data = self._cipher.decrypt(self.state_file.read_bytes())
+                return json.loads(data)
+            except (InvalidToken, ValueError) as e:
+                logger.warning(f"Cached Zoho session is unreadable, discarding it: {e}")
+                self.state_file.unlink(missing_ok=True)
+                return None
+
+    def save(self, state: Dict[str, Any]):
+        """
+        Encrypt and persist the storage state.
+
+        :param state: Playwright storage state from BrowserContext.storage_state()
+        """
+        with self._lock:
+            data = self._cipher.encrypt(json.dumps(state).encode())
+            tmp_file = self.state_file.with_suffix(".tmp")
+            tmp_file.write_bytes(data)
+            tmp_file.replace(self.state_file)
+
+    def clear(self):
+        """
+        Drop the cached session.
+        """
+        with self._lock:
+            self.state_file.unlink(missing_ok=True)
+
+    def _read_counter(self) -> Dict[str, Any]:
+        try:
+            counter = json.loads(self.counter_file.read_text())
+        except (OSError, ValueError):
+            counter = {}
+        if counter.get("date") != date.today().isoformat():
+            counter = {"date": date.today().isoformat(), "count": 0}
+        return counter
+
+    def register_login(self) -> int:
+        """
+        Count a full sign-in against today's limit.
+
+        :return: Number of sign-ins done today
+        """
+        with self._lock:
+            counter = self._read_counter()
+            counter["count"] += 1
+            self.counter_file.write_text(json.dumps(counter))
+            return counter["count"]
+
+    def logins_today(self) -> int:
+        """
+        Get the number of full sign-ins done today.
+        """
+        with self._lock:
+            return self._read_counter()["count"]
+
+    def remove(self):
+        """
+        Remove all session files of the account.
+        """
+        with self._lock:
+            self.state_file.unlink(missing_ok=True)
+            self.counter_file.unlink(missing_ok=True)
+
+
+_session_stores: Dict[str, SessionStore] = {}
+_session_stores_lock = threading.Lock()
+
+
+def get_session_store(account_id: str) -> SessionStore:
+    """
+    Get the session store of an account.
+
+    :param account_id: Account identifier
+    :return: Shared SessionStore instance of the account
+    """
+    with _session_stores_lock:
+        if account_id not in _session_stores:
+            _session_stores[account_id] = SessionStore(account_id)
+        return _session_stores[account_id]
@@ -0,0 +1,145 @@
+import copy
+import heapq
+import itertools
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+from apscheduler.events import (
+    EVENT_ALL_JOBS_REMOVED,
+    EVENT_JOB_ADDED,
+    EVENT_JOB_MODIFIED,
+    EVENT_JOB_REMOVED,
+    JobEvent,
+)
+from pydantic import BaseModel
+
+from attctrl.holidays import DAY_OFF_TASKS, holiday_calendar
+from attctrl.scheduler import Task, TaskScheduler
+
+
+class TimelineEntry(BaseModel):
+    task_id: str
+    func: str
+    account: str
+    fire_time: datetime
+    window_end: datetime
+    collisions: int = 0
+    day_off: Optional[str] = None
+
+    @property
+    def minute(self) -> datetime:
+        return self.fire_time.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+
+class ScheduleTimeline:
+    """
+    Upcoming runs of all scheduled tasks.
+
+    The next fire times of every task are computed once from its cron trigger (in the task's
+    own timezone, so DST shifts are respected) and cached until the job changes. Past fire
+    times are dropped on read and the cache of a task is refilled once one of them passed.
+
+    :param tasker: Scheduler whose tasks are previewed
+    :param runs_per_task: Number of upcoming fire times cached per task
+    """
+
+    def __init__(self, tasker: TaskScheduler, runs_per_task: int = 10) -> None:
+        self.tasker = tasker
+        self.runs_per_task = runs_per_task
+        self._fire_times: Dict[str, List[datetime]] = {}
+        self._lock = threading.Lock()
+        tasker.scheduler.add_listener(
+            self._on_job_changed,
+            EVENT_JOB_ADDED | EVENT_JOB_MODIFIED | EVENT_JOB_REMOVED | EVENT_ALL_JOBS_REMOVED,
+        )
+
+    def _on_job_changed(self, event: JobEvent):
+        with self._lock:
+            if event.code == EVENT_ALL_JOBS_REMOVED:
+                self._fire_times.clear()
+            else:
+                self._fire_times.pop(event.job_id, None)
+
+    def invalidate(self):
+        """
+        Drop all cached fire times, e.g. after the jobs were changed by another process.
+        """
+        with self._lock:
+            self._fire_times.clear()
+
+    def _compute(self, task: Task, now: datetime) -> List[datetime]:
+        trigger = copy.copy(task.trigger)
+        trigger.jitter = None
+        fire_times: List[datetime] = []
+        fire_time = trigger.get_next_fire_time(None, now)
+        while fire_time is not None and len(fire_times) < self.runs_per_task:
+            fire_times.append(fire_time)
+            fire_time = trigger.get_next_fire_time(fire_time, fire_time + timedelta(seconds=1))
+        return fire_times
+
+    def get_fire_times(self, task: Task, now: Optional[datetime] = None) -> List[datetime]:
+        """
+        Get the upcoming nominal fire times of a task, jitter not applied.
+
+        :param task: Scheduled task
+        :param now: Reference time (def: current time)
+        :return: Fire times in the task's timezone
+        """
+        if task.trigger is None:
+            return []
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            fire_times = [time for time in self._fire_times.get(task.id, []) if time > now]
+            if len(fire_times) < self.runs_per_task:
+                fire_times = self._compute(task, now)
+            self._fire_times[task.id] = fire_times
+            return fire_times
+
+    def _entries(self, task: Task, now: datetime) -> Iterator[TimelineEntry]:
+        jitter = timedelta(seconds=task.jitter or 0)
+        for fire_time in self.get_fire_times(task, now):
+            yield TimelineEntry(
+                task_id=task.id,
+                func=task.func,
+                account=task.account,
+                fire_time=fire_time,
+                window_end=fire_time + jitter,
+            )
+
+    def get_timeline(
+        self,
+        limit: int = 20,
+        account: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> List[TimelineEntry]:
+        """
+        Get upcoming runs of all tasks in order of their fire time.
+
+        Each entry has the number of other runs of the timeline starting in the same minute,
+        so several accounts hitting Zoho at once can be spotted. Runs falling on a day off of
+        their account are marked with its label and don't count as collisions.
+
+        :param limit: Max number of runs to return
+        :param account: Only show the runs of this account
+        :param now: Reference time (def: current time)
+        :return: List of timeline entries
+        """
+        now = now or datetime.now(timezone.utc)
+        tasks = [
+            task for task in self.tasker.get_tasks() if account is None or task.account == account
+        ]
+        merged = heapq.merge(
+            *(self._entries(task, now) for task in tasks),
+            key=lambda entry: entry.fire_time.astimezone(timezone.utc),
+        )
+        entries = list(itertools.islice(merged, limit))
+        for entry in entries:
+            if entry.func in DAY_OFF_TASKS:
+                entry.day_off = holiday_calendar.get_day_off(entry.account, entry.fire_time.date())
+        minutes = Counter(entry.minute for entry in entries if entry.day_off is None)
+        for entry in entries:
+            if entry.day_off is None:
+                entry.collisions = minutes[entry.minute] - 1
+        return entries
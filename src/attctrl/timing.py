@@ -0,0 +1,57 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict, Iterator, Optional
+
+from attctrl.metrics import browser_step_seconds
+
+
+class StepTimer:
+    """
+    Collects wall-clock durations of the named steps of a single browser run.
+    Every finished step is also observed in the browser step histogram of /metrics.
+    """
+
+    def __init__(self) -> None:
+        self.steps: Dict[str, float] = {}
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.steps[name] = self.steps.get(name, 0.0) + duration
+            browser_step_seconds.observe(duration, step=name)
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} {duration:.2f}s" for name, duration in self.steps.items())
+
+
+async def wait_for_first(signals: Dict[str, Awaitable], timeout: Optional[float] = None) -> str:
+    """
+    Wait for the first signal that completes successfully and cancel the rest.
+
+    :param signals: Awaitables keyed by signal name
+    :param timeout: Overall time limit in seconds
+    :return: Name of the first completed signal
+    """
+    tasks = {asyncio.ensure_future(awaitable): name for name, awaitable in signals.items()}
+    pending = set(tasks)
+    errors = []
+    try:
+        async with asyncio.timeout(timeout):
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return tasks[task]
+                    errors.append(f"{tasks[task]}: {task.exception()}")
+    except TimeoutError:
+        pass
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    raise TimeoutError(f"None of the signals {list(signals)} completed. {'; '.join(errors)}")
@@ -0,0 +1,33 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# NOTE: Config is read on import, so the required settings are given before any test module
+#  imports the app. Tests keep their files in tmp_path, the app state in a temporary data dir,
+#  apart from the one of a dev server. The log file is disabled.
+DATA_DIR = tempfile.mkdtemp(prefix="attctrl-test-")
+os.environ.setdefault("DATA_DIR", DATA_DIR)
+os.environ.setdefault("ZOHO_USERNAME", "user@example.com")
+os.environ.setdefault("ZOHO_PASSWORD", "password")
+os.environ.setdefault("ZOHO_COMPANY_ID", "12345")
+os.environ.setdefault("BROWSER_WARMUP", "false")
+os.environ.setdefault("LOG_FILE", "")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Client of the app. Its services are started once per process, so the tests share it.
+    """
+    from fastapi.testclient import TestClient  # noqa: PLC0415
+
+    from attctrl.api import app  # noqa: PLC0415
+
+    with TestClient(app) as client:
+        yield client
+
+
+def pytest_unconfigure():
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
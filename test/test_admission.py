@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from apscheduler.triggers.cron import CronTrigger
+
+from attctrl.admission import (
+    AdmissionController,
+    SpreadCronTrigger,
+    get_priority,
+    group_phase,
+    nominal_fire_time,
+    spread_offsets,
+)
+from attctrl.config import Config
+
+NOW = datetime(2026, 10, 19, 8, 0, tzinfo=timezone.utc)
+NOMINAL = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+
+def test_spread_offsets_order_by_priority_then_id():
+    offsets = spread_offsets(
+        [
+            ("b", get_priority("zoho_check_in"), 60),
+            ("c", get_priority("zoho_check_out"), 60),
+            ("a", get_priority("zoho_check_in"), 60),
+            ("d", get_priority("zoho_test"), 0),
+        ]
+    )
+
+    assert offsets == {"a": 0.0, "b": 15.0, "d": 0.0, "c": 45.0}
+
+
+def test_phase_shifts_the_group_within_the_first_slot():
+    offsets = spread_offsets([("a", 0, 60), ("b", 0, 60), ("c", 0, 60)], phase=0.5)
+
+    assert offsets == {"a": 10.0, "b": 30.0, "c": 50.0}
+
+
+def test_group_phase_is_shared_and_changes_every_day():
+    phases = [group_phase(NOMINAL + timedelta(days=day)) for day in range(10)]
+
+    assert group_phase(NOMINAL) == group_phase(NOMINAL.replace())
+    assert all(0 <= phase < 1 for phase in phases)
+    assert len(set(phases)) == 10
+
+
+def test_admission_by_priority_then_arrival():
+    async def run() -> list:
+        controller = AdmissionController(max_running=1)
+        admitted = []
+
+        async def task(name: str, priority: int):
+            async with controller.admit(priority, name):
+                admitted.append(name)
+                await asyncio.sleep(0.01)
+
+        async with controller.admit(0, "first"):
+            tasks = [
+                asyncio.ensure_future(task(name, priority))
+                for name, priority in (("out", 2), ("in-1", 0), ("test", 1), ("in-2", 0))
+            ]
+            await asyncio.sleep(0.01)
+            assert controller.queued == 4
+        await asyncio.gather(*tasks)
+        assert controller.running == 0
+        return admitted
+
+    assert asyncio.run(run()) == ["in-1", "in-2", "test", "out"]
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    async def run():
+        controller = AdmissionController(max_running=1)
+
+        async def second():
+            async with controller.admit(0, "second"):
+                pass
+
+        async with controller.admit(0, "first"):
+            waiter = asyncio.ensure_future(second())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.sleep(0.01)
+        assert controller.running == 0
+        assert controller.queued == 0
+
+    asyncio.run(run())
+
+
+def cron(jitter: int = 600) -> SpreadCronTrigger:
+    return SpreadCronTrigger(hour=9, minute=0, timezone="UTC", jitter=jitter)
+
+
+def test_spread_trigger_fires_at_the_nominal_time(monkeypatch):
+    monkeypatch.setattr(Config, "TASK_SPREAD", True)
+
+    assert cron().get_next_fire_time(None, NOW) == NOMINAL
+
+
+def test_spread_trigger_falls_back_to_random_jitter(monkeypatch):
+    monkeypatch.setattr(Config, "TASK_SPREAD", False)
+
+    fire_times = {cron().get_next_fire_time(None, NOW) for _ in range(20)}
+
+    assert all(NOMINAL <= time <= NOMINAL + timedelta(seconds=600) for time in fire_times)
+    assert len(fire_times) > 1
+
+
+def test_stored_trigger_is_converted_with_its_fields():
+    trigger = CronTrigger(day_of_week="mon-fri", hour=9, timezone="Europe/Berlin", jitter=300)
+
+    spread = SpreadCronTrigger.from_trigger(trigger)
+
+    assert isinstance(spread, SpreadCronTrigger)
+    assert str(spread) == str(trigger)
+    assert spread.jitter == 300
+    assert spread.timezone == trigger.timezone
+
+
+@pytest.mark.parametrize("jitter", [None, 600])
+def test_nominal_fire_time_ignores_jitter(jitter):
+    trigger = CronTrigger(hour=9, minute=0, timezone="UTC", jitter=jitter)
+
+    assert nominal_fire_time(trigger, NOW) == NOMINAL
+    assert trigger.jitter == jitter
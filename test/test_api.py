@@ -0,0 +1,33 @@
+from attctrl.api import get_task_functions, tasker
+
+
+def test_adding_and_removing_a_task_refreshes_the_task_views(client):
+    response = client.post(
+        "/tasks", data={"time": "09:00:00", "task_type": "test", "monday": "mon"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["HX-Trigger"] == "tasks-changed"
+    (task,) = tasker.get_tasks()
+
+    response = client.delete(f"/tasks/{task.id}")
+
+    assert response.status_code == 200
+    assert response.headers["HX-Trigger"] == "tasks-changed"
+    assert tasker.get_tasks() == []
+
+
+async def cleanup_task(account_id: str) -> bool:
+    return bool(account_id)
+
+
+def test_tasks_of_unknown_type_are_left_out_of_the_export(client):
+    known = tasker.add_task(get_task_functions()["test"], "mon", "09:00:00")
+    unknown = tasker.add_task(cleanup_task, "mon", "10:00:00")
+    try:
+        response = client.get("/tasks/export")
+    finally:
+        tasker.remove_tasks([known.id, unknown.id])
+
+    assert response.status_code == 200
+    assert [spec["type"] for spec in response.json()] == ["test"]
@@ -0,0 +1,89 @@
+import gzip
+from pathlib import Path
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from attctrl.assets import (
+    IMMUTABLE_CACHE,
+    AssetFiles,
+    AssetManifest,
+    accepted_encodings,
+    fingerprint,
+)
+
+SCRIPT = b"console.log('attendance');\n" * 100
+
+
+@pytest.fixture
+def manifest(tmp_path) -> AssetManifest:
+    static_dir = Path(tmp_path, "static")
+    static_dir.mkdir()
+    Path(static_dir, "app.min.js").write_bytes(SCRIPT)
+    Path(static_dir, "tiny.txt").write_bytes(b"x")
+    return AssetManifest(static_dir, Path(tmp_path, "build"))
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [("app.min.js", "app.min.0123abcd.js"), ("LICENSE", "LICENSE.0123abcd")],
+)
+def test_fingerprint_goes_before_the_last_suffix(name, expected):
+    assert fingerprint(name, "0123abcd") == expected
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip, deflate, br", ["gzip", "deflate", "br"]),
+        ("br;q=0, gzip;q=0.5", ["gzip"]),
+        ("GZIP;q=bad, identity", ["identity"]),
+    ],
+)
+def test_accepted_encodings_skip_refused_ones(header, expected):
+    assert accepted_encodings(header) == expected
+
+
+def test_names_change_with_the_content(manifest):
+    name = manifest.assets["app.min.js"].url_name
+    assert manifest.url("app.min.js") == f"/static/{name}"
+    assert manifest.url("unknown.js") == "/static/unknown.js"
+
+    Path(manifest.static_dir, "app.min.js").write_bytes(SCRIPT + b"//")
+    assert AssetManifest(manifest.static_dir, manifest.build_dir).url("app.min.js") != (
+        f"/static/{name}"
+    )
+
+
+def test_build_writes_only_smaller_variants_once(manifest):
+    written = manifest.build()
+
+    asset = manifest.assets["app.min.js"]
+    encoding, path = manifest.variant(asset, "gzip, deflate")
+    assert encoding == "gzip"
+    assert gzip.decompress(path.read_bytes()) == SCRIPT
+    assert manifest.variant(manifest.assets["tiny.txt"], "gzip") == (
+        None,
+        manifest.assets["tiny.txt"].source,
+    )
+    assert manifest.variant(asset, "identity") == (None, asset.source)
+    assert written >= 1
+    assert manifest.build() == 0
+
+
+def test_hashed_names_are_served_compressed_and_immutable(manifest):
+    manifest.build()
+    client = TestClient(Starlette(routes=[Mount("/static", AssetFiles(manifest))]))
+    url = manifest.url("app.min.js")
+
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/static/app.min.js", headers={"Accept-Encoding": "gzip"})
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["Cache-Control"] == IMMUTABLE_CACHE
+    assert compressed.headers["Vary"] == "Accept-Encoding"
+    assert compressed.content == SCRIPT
+    assert plain.headers["Cache-Control"] == "no-cache"
+    assert plain.content == SCRIPT
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from attctrl.attendance import AttendanceBackend, HttpBackend, cookie_header, http_client
+from attctrl.retry import AttendanceRejectedError
+
+COOKIES = [
+    {"name": "session", "value": "abc", "domain": ".zoho.com", "path": "/", "secure": True},
+    {"name": "CSRF_TOKEN", "value": "t", "domain": "people.zoho.com", "path": "/", "expires": -1},
+    {"name": "scoped", "value": "s", "domain": "people.zoho.com", "path": "/hr"},
+    {"name": "expired", "value": "x", "domain": "zoho.com", "expires": time.time() - 60},
+    {"name": "other", "value": "o", "domain": "example.com"},
+]
+
+
+def test_backend_without_switch_fails_on_creation():
+    class Broken(AttendanceBackend):
+        name = "broken"
+
+    with pytest.raises(TypeError):
+        Broken()
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("https://people.zoho.com/123/AttendanceAction.zp", "session=abc; CSRF_TOKEN=t"),
+        ("https://people.zoho.com/hr/list", "session=abc; CSRF_TOKEN=t; scoped=s"),
+        ("http://people.zoho.com/", "CSRF_TOKEN=t"),
+        ("https://zoho.com/", "session=abc"),
+        ("https://notzoho.com/", ""),
+    ],
+)
+def test_cookie_header_matches_host_path_scheme_and_expiry(url, expected):
+    assert cookie_header(COOKIES, url) == expected
+
+
+@pytest.mark.parametrize(
+    ("status", "body", "message"),
+    [
+        (200, {"error": "Location is not allowed"}, "HTTP 200: Location is not allowed"),
+        (200, {"error": {"message": "Invalid CSRF token"}}, "HTTP 200: Invalid CSRF token"),
+        (500, {"error": "Service down"}, "HTTP 500: Service down"),
+        (502, None, "HTTP 502"),
+    ],
+)
+def test_rejection_keeps_the_status_and_message_of_zoho(monkeypatch, status, body, message):
+    def answer(_request: httpx.Request) -> httpx.Response:
+        if body is None:
+            return httpx.Response(status, text="<html>Bad gateway</html>")
+        return httpx.Response(status, json=body)
+
+    async def post():
+        monkeypatch.setattr(
+            http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(answer))
+        )
+        try:
+            await HttpBackend()._post("https://people.zoho.com/1/AttendanceAction.zp", [], {})
+        finally:
+            await http_client.aclose()
+
+    with pytest.raises(AttendanceRejectedError) as error:
+        asyncio.run(post())
+
+    assert error.value.status == status
+    assert str(error.value) == f"Zoho rejected attendance request: {message}"
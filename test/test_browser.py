@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from attctrl.accounts import Account
+from attctrl.browser import BrowserControl
+from attctrl.config import Config
+
+ACCOUNT = Account(id="jane", name="Jane", username="jane", password="secret", company_id="1")
+
+
+class Artifacts:
+    def __init__(self, events: list) -> None:
+        self.events = events
+
+    async def screenshot(self, _page, name: str):
+        self.events.append(f"screenshot {name}")
+
+    async def save_trace(self, _context, name: str):
+        self.events.append(f"trace {name}")
+
+
+class FailingControl(BrowserControl):
+    def __init__(self, events: list) -> None:
+        super().__init__(None, ACCOUNT, Artifacts(events), attempt=2)
+        self.events = events
+
+    async def open(self):
+        self.events.append("open")
+
+    async def teardown(self):
+        self.events.append("teardown")
+
+    async def ensure_login(self):
+        self._is_logged_in = True
+
+    async def get_att_state(self) -> str:
+        raise TimeoutError("Attendance button not found")
+
+    async def logout(self):
+        self.events.append("logout")
+
+
+def test_failure_is_captured_once_before_the_logout(monkeypatch):
+    monkeypatch.setattr(Config, "SESSION_REUSE", False)
+    events = []
+
+    async def run():
+        async with FailingControl(events) as browser:
+            await browser.do_check_in()
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(run())
+
+    assert events == [
+        "open",
+        "screenshot attempt-2",
+        "trace attempt-2-trace",
+        "logout",
+        "teardown",
+    ]
@@ -0,0 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from attctrl.config import load_secret
+
+
+def test_secret_is_created_once_and_kept(tmp_path):
+    path = Path(tmp_path, "auth.secret")
+
+    with ThreadPoolExecutor(8) as executor:
+        secrets = set(executor.map(lambda _: load_secret(path), range(32)))
+
+    assert len(secrets) == 1
+    assert load_secret(path) in secrets
+    assert path.stat().st_mode & 0o077 == 0
+    assert [file.name for file in tmp_path.iterdir()] == ["auth.secret"]
@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+
+from attctrl.config import Config
+from attctrl.coordinator import LeaderLock, SchedulerCoordinator
+from attctrl.scheduler import TaskScheduler
+
+
+def test_second_worker_fails_without_a_shared_job_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "JOBSTORE", "memory")
+    leader = LeaderLock(tmp_path / "scheduler.lock")
+    assert leader.acquire()
+    tasker = TaskScheduler(jobs_dir=str(tmp_path))
+
+    try:
+        with pytest.raises(RuntimeError, match="JOBSTORE=sqlite"):
+            asyncio.run(SchedulerCoordinator(tasker, data_dir=tmp_path).start())
+    finally:
+        leader.release()
+
+    assert not tasker.running
@@ -0,0 +1,111 @@
+from datetime import date
+
+import pytest
+
+from attctrl.holidays import (
+    ALL_ACCOUNTS,
+    HolidayCalendar,
+    parse_date_list,
+    parse_days_off,
+    parse_ics,
+)
+
+CALENDAR = "\r\n".join(
+    [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "BEGIN:VEVENT",
+        "DTSTART;VALUE=DATE:20261224",
+        "DTEND;VALUE=DATE:20261227",
+        "SUMMARY:Christmas\\, Boxing Day",
+        "END:VEVENT",
+        "BEGIN:VEVENT",
+        "DTSTART;VALUE=DATE:20250101",
+        "RRULE:FREQ=YEARLY;COUNT=3",
+        "SUMMARY:New Year's",
+        "  Day",
+        "END:VEVENT",
+        "BEGIN:VEVENT",
+        "DTSTART:20261105T090000Z",
+        "DTEND:20261105T100000Z",
+        "SUMMARY:Team meeting",
+        "END:VEVENT",
+        "END:VCALENDAR",
+    ]
+)
+
+
+def test_date_list_with_ranges_labels_and_comments():
+    days = parse_date_list(
+        """
+        # Company days off
+        2026-12-24..2026-12-26 Christmas
+        2026-05-01, Labour Day
+        2026-08-14
+        """
+    )
+
+    assert days == {
+        date(2026, 12, 24): "Christmas",
+        date(2026, 12, 25): "Christmas",
+        date(2026, 12, 26): "Christmas",
+        date(2026, 5, 1): "Labour Day",
+        date(2026, 8, 14): "Day off",
+    }
+
+
+@pytest.mark.parametrize(
+    ("text", "error"),
+    [
+        ("2026-01-01\n2026-13-01", "Line 2"),
+        ("2026-01-01..2028-01-01", "longer than 366 days"),
+    ],
+)
+def test_date_list_errors_name_the_line(text, error):
+    with pytest.raises(ValueError, match=error):
+        parse_date_list(text)
+
+
+def test_ics_all_day_events_with_yearly_recurrence():
+    days = parse_ics(CALENDAR, horizon_years=50)
+
+    assert days == {
+        date(2026, 12, 24): "Christmas, Boxing Day",
+        date(2026, 12, 25): "Christmas, Boxing Day",
+        date(2026, 12, 26): "Christmas, Boxing Day",
+        date(2025, 1, 1): "New Year's Day",
+        date(2026, 1, 1): "New Year's Day",
+        date(2027, 1, 1): "New Year's Day",
+    }
+
+
+def test_format_is_detected():
+    assert parse_days_off(CALENDAR) == parse_ics(CALENDAR)
+    assert parse_days_off("2026-08-14") == {date(2026, 8, 14): "Day off"}
+    with pytest.raises(ValueError, match="Not an iCalendar file"):
+        parse_ics("2026-08-14")
+
+
+def test_account_days_off_win_over_days_off_of_everybody(tmp_path):
+    calendar = HolidayCalendar(tmp_path)
+    calendar.add_days(ALL_ACCOUNTS, {date(2026, 12, 24): "Christmas"})
+    calendar.add_days("jane", {date(2026, 12, 24): "Vacation", date(2026, 12, 28): "Vacation"})
+
+    assert calendar.get_day_off("jane", date(2026, 12, 24)) == "Vacation"
+    assert calendar.get_day_off("john", date(2026, 12, 24)) == "Christmas"
+    assert calendar.get_day_off("john", date(2026, 12, 28)) is None
+    assert [day.day for day in calendar.get_days_off(since=date(2026, 12, 25))] == [
+        date(2026, 12, 28)
+    ]
+
+
+def test_days_off_changed_by_another_worker_are_read_again(tmp_path):
+    calendar, other = HolidayCalendar(tmp_path), HolidayCalendar(tmp_path)
+    assert calendar.get_day_off("jane", date(2026, 12, 24)) is None
+
+    other.add_days("jane", {date(2026, 12, 24): "Vacation"})
+    assert calendar.get_day_off("jane", date(2026, 12, 24)) == "Vacation"
+
+    assert other.remove_day("jane", date(2026, 12, 24))
+    assert not other.remove_day("jane", date(2026, 12, 24))
+    assert calendar.get_day_off("jane", date(2026, 12, 24)) is None
@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import pytest
+
+from attctrl.logview import LogReader
+
+
+def record(n: int, level: str = "INFO", message: str = "") -> str:
+    return f"2026-10-18 10:{n // 60:02d}:{n % 60:02d},000 - attctrl.test - {level} - {message or f'record {n}'}\n"
+
+
+def write(path: Path, *records: str):
+    with path.open("a") as file:
+        file.write("".join(records))
+
+
+def messages(page) -> list:
+    return [entry.message for entry in page.entries]
+
+
+@pytest.fixture
+def log_file(tmp_path) -> Path:
+    log_file = Path(tmp_path, "attctrl.log")
+    write(Path(f"{log_file}.2"), *(record(n) for n in range(3)))
+    write(Path(f"{log_file}.1"), *(record(n) for n in range(3, 6)))
+    write(log_file, *(record(n) for n in range(6, 9)))
+    return log_file
+
+
+def test_read_before_pages_back_through_rotated_files(log_file):
+    reader = LogReader(log_file, backup_count=3, window=64)
+
+    first = reader.read_before(limit=4)
+    second = reader.read_before(first.before, limit=4)
+    last = reader.read_before(second.before, limit=4)
+
+    assert messages(first) == ["record 8", "record 7", "record 6", "record 5"]
+    assert messages(second) == ["record 4", "record 3", "record 2", "record 1"]
+    assert messages(last) == ["record 0"]
+    assert last.before is None
+
+
+def test_read_after_follows_the_log_across_a_rotation(log_file):
+    reader = LogReader(log_file, backup_count=3)
+    cursor = reader.read_before(limit=1).after
+
+    write(log_file, record(9))
+    page = reader.read_after(cursor)
+    assert messages(page) == ["record 9"]
+
+    write(log_file, record(10))
+    for n in (2, 1):
+        Path(f"{log_file}.{n}").replace(f"{log_file}.{n + 1}")
+    log_file.replace(f"{log_file}.1")
+    write(log_file, record(11))
+    page = reader.read_after(page.after)
+
+    assert messages(page) == ["record 11", "record 10"]
+    assert messages(reader.read_after(page.after)) == []
+
+
+def test_partly_written_record_is_read_once_complete(log_file):
+    reader = LogReader(log_file, backup_count=3)
+    cursor = reader.read_before(limit=1).after
+
+    with log_file.open("a") as file:
+        file.write(record(9).rstrip("\n"))
+    page = reader.read_after(cursor)
+    assert messages(page) == []
+
+    write(log_file, "\n")
+    assert messages(reader.read_after(page.after)) == ["record 9"]
+
+
+def test_search_by_level_and_text_keeps_multiline_records(log_file):
+    write(
+        log_file,
+        record(9, "ERROR", "Task failed\nTraceback (most recent call last):\n  boom"),
+        record(10, "WARNING", "Slow step"),
+    )
+    reader = LogReader(log_file, backup_count=3)
+
+    errors = reader.read_before(levels={"ERROR"})
+    found = reader.read_before(query="RECORD 4")
+
+    assert messages(errors) == ["Task failed\nTraceback (most recent call last):\n  boom"]
+    assert messages(found) == ["record 4"]
+
+
+def test_invalid_cursor_is_rejected(log_file):
+    with pytest.raises(ValueError, match="Invalid log cursor"):
+        LogReader(log_file).read_after("not-a-cursor")
+
+
+def test_missing_log_file_is_followed_from_its_start(tmp_path):
+    log_file = Path(tmp_path, "attctrl.log")
+    reader = LogReader(log_file)
+    page = reader.read_before()
+    assert page.entries == []
+
+    write(log_file, record(0))
+    assert messages(reader.read_after(page.after)) == ["record 0"]
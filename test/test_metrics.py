@@ -0,0 +1,37 @@
+import pytest
+
+from attctrl.metrics import Counter, Histogram, Metric
+
+
+def test_metric_without_samples_fails_on_creation():
+    class Broken(Metric):
+        pass
+
+    with pytest.raises(TypeError):
+        Broken("test_broken", "Broken metric.")
+
+
+def test_counter_renders_escaped_labels():
+    counter = Counter("test_runs_total", "Runs.", ["outcome"])
+    counter.inc(outcome='say "hi"')
+    counter.inc(2, outcome='say "hi"')
+
+    assert counter.render().splitlines() == [
+        "# HELP test_runs_total Runs.",
+        "# TYPE test_runs_total counter",
+        'test_runs_total{outcome="say \\"hi\\""} 3.0',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Durations.", buckets=(1, 5))
+    for value in (0.5, 3, 10):
+        histogram.observe(value)
+
+    assert histogram.samples() == [
+        'test_seconds_bucket{le="1"} 1',
+        'test_seconds_bucket{le="5"} 2',
+        'test_seconds_bucket{le="+Inf"} 3',
+        "test_seconds_sum 13.5",
+        "test_seconds_count 3",
+    ]
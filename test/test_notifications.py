@@ -0,0 +1,57 @@
+import asyncio
+
+from attctrl.logger import NotificationBroker
+
+
+async def next_batch(broker: NotificationBroker, cursor, *publish: str) -> list:
+    stream = broker.subscribe(cursor, heartbeat=0.5)
+    batch = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    for message in publish:
+        broker.publish({"message": message})
+    try:
+        return [item["message"] for item in await batch]
+    finally:
+        await stream.aclose()
+
+
+def test_replays_notifications_after_the_cursor():
+    broker = NotificationBroker()
+    for message in ("one", "two", "three"):
+        broker.publish({"message": message})
+
+    assert [item["message"] for item in broker.get_since(1)] == ["two", "three"]
+    assert asyncio.run(next_batch(broker, 1)) == ["two", "three"]
+
+
+def test_subscriber_without_cursor_gets_only_new_notifications():
+    broker = NotificationBroker()
+    broker.publish({"message": "old"})
+
+    assert asyncio.run(next_batch(broker, None, "new")) == ["new"]
+
+
+def test_cursor_ahead_of_the_broker_gets_new_notifications():
+    broker = NotificationBroker()
+    broker.publish({"message": "old"})
+
+    assert asyncio.run(next_batch(broker, 57, "new")) == ["new"]
+
+
+def test_client_behind_the_buffer_skips_to_the_oldest_kept():
+    broker = NotificationBroker(maxlen=2)
+    for message in ("one", "two", "three"):
+        broker.publish({"message": message})
+
+    assert [item["message"] for item in broker.get_since(0)] == ["two", "three"]
+
+
+def test_event_ids_of_another_broker_are_not_cursors():
+    broker, other = NotificationBroker(), NotificationBroker()
+    broker.publish({"message": "one"})
+    notification = broker.get_since(0)[0]
+
+    assert broker.parse_event_id(broker.event_id(notification)) == 1
+    assert other.parse_event_id(broker.event_id(notification)) is None
+    assert broker.parse_event_id("1") is None
+    assert broker.parse_event_id(f"{broker.epoch}-x") is None
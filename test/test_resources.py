@@ -0,0 +1,36 @@
+import pytest
+
+from attctrl.config import Config
+from attctrl.resources import LEAN_CHROMIUM_ARGS, ResourceFilter, get_launch_args
+
+
+@pytest.fixture
+def resource_filter() -> ResourceFilter:
+    return ResourceFilter(
+        blocked_types=("image", "font"), allowed_hosts=(".zoho.com", "ZOHOCDN.com")
+    )
+
+
+@pytest.mark.parametrize(
+    ("url", "resource_type", "reason"),
+    [
+        ("https://people.zoho.com/123/home", "document", ""),
+        ("https://zoho.com/", "script", ""),
+        ("https://static.zohocdn.com/app.js", "script", ""),
+        ("https://people.zoho.com/logo.png", "image", "image"),
+        ("https://www.google-analytics.com/collect", "xhr", "third_party"),
+        ("https://zoho.com.evil.net/", "script", "third_party"),
+        ("https://notzoho.com/", "document", "third_party"),
+        ("data:font/woff2;base64,AAAA", "font", "font"),
+        ("data:text/css,body{}", "stylesheet", ""),
+    ],
+)
+def test_block_reason(resource_filter, url, resource_type, reason):
+    assert resource_filter.block_reason(url, resource_type) == reason
+
+
+@pytest.mark.parametrize(("lean", "args"), [(True, LEAN_CHROMIUM_ARGS), (False, [])])
+def test_launch_args(monkeypatch, lean, args):
+    monkeypatch.setattr(Config, "BROWSER_LEAN", lean)
+
+    assert get_launch_args() == args
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from attctrl.retry import (
+    AlreadyInStateError,
+    AttendanceRejectedError,
+    AuthError,
+    FailureKind,
+    RetryPolicy,
+    SignInLimitError,
+    classify_failure,
+)
+
+
+@pytest.mark.parametrize(
+    ("error", "kind"),
+    [
+        (AuthError("wrong password"), FailureKind.AUTH),
+        (SignInLimitError("20 sign-ins today"), FailureKind.LIMIT),
+        (AlreadyInStateError("checked in"), FailureKind.ALREADY_IN_STATE),
+        (AttendanceRejectedError(503), FailureKind.TRANSIENT),
+        (AttendanceRejectedError(429), FailureKind.TRANSIENT),
+        (AttendanceRejectedError(400), FailureKind.UNKNOWN),
+        (AttendanceRejectedError(200, "Please try again later"), FailureKind.TRANSIENT),
+        (AttendanceRejectedError(200, "Invalid CSRF token"), FailureKind.AUTH),
+        (AttendanceRejectedError(200, "Location is not allowed"), FailureKind.UNKNOWN),
+        (AttendanceRejectedError(503, "Service down"), FailureKind.TRANSIENT),
+        (PlaywrightTimeoutError("Timeout 30000ms exceeded"), FailureKind.TRANSIENT),
+        (PlaywrightError("net::ERR_CONNECTION_RESET"), FailureKind.TRANSIENT),
+        (PlaywrightError("Element is not attached"), FailureKind.UNKNOWN),
+        (ConnectionResetError(), FailureKind.TRANSIENT),
+        (ValueError("bug"), FailureKind.UNKNOWN),
+    ],
+)
+def test_classify_failure(error, kind):
+    assert classify_failure(error) == kind
+
+
+def run_failing(policy: RetryPolicy, errors: list) -> list:
+    attempts = []
+
+    async def task(attempt: int) -> str:
+        attempts.append(attempt)
+        if errors:
+            raise errors.pop(0)
+        return "done"
+
+    try:
+        asyncio.run(policy.run(task, "test"))
+    except Exception as e:
+        attempts.append(type(e).__name__)
+    return attempts
+
+
+def test_transient_failures_are_retried_until_success():
+    policy = RetryPolicy(max_attempts=3, deadline=10, base_delay=0)
+
+    assert run_failing(policy, [TimeoutError(), ConnectionError()]) == [1, 2, 3]
+
+
+def test_attempts_are_limited():
+    policy = RetryPolicy(max_attempts=2, deadline=10, base_delay=0)
+
+    assert run_failing(policy, [TimeoutError()] * 3) == [1, 2, "TimeoutError"]
+
+
+def test_other_failures_are_not_retried():
+    policy = RetryPolicy(max_attempts=3, deadline=10, base_delay=0)
+
+    assert run_failing(policy, [AuthError("wrong password")]) == [1, "AuthError"]
+
+
+def test_no_retry_would_start_after_the_deadline(monkeypatch):
+    policy = RetryPolicy(max_attempts=5, deadline=1, base_delay=0)
+    monkeypatch.setattr(policy, "delay", lambda attempt: 0.6 * attempt)
+
+    assert run_failing(policy, [TimeoutError()] * 5) == [1, 2, "TimeoutError"]
+
+
+def test_delay_is_capped_exponential_backoff():
+    policy = RetryPolicy(base_delay=5, max_delay=30)
+
+    for attempt, bound in ((1, 5), (2, 10), (3, 20), (4, 30), (10, 30)):
+        assert all(0 <= policy.delay(attempt) <= bound for _ in range(50))
@@ -0,0 +1,152 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from apscheduler.events import EVENT_JOB_MISSED
+from apscheduler.triggers.cron import CronTrigger
+
+from attctrl import scheduler as scheduler_module
+from attctrl.admission import AdmissionController, SpreadCronTrigger
+from attctrl.config import Config
+from attctrl.scheduler import TaskExecutor, TaskScheduler
+
+started = []
+
+
+async def zoho_check_in(account_id: str, duration: float = 0.0) -> bool:
+    started.append((account_id, datetime.now(timezone.utc)))
+    await asyncio.sleep(duration)
+    return True
+
+
+async def run_colliding(tmp_path, count: int, jitter: int, duration: float) -> list:
+    started.clear()
+    tasker = TaskScheduler(jobs_dir=str(tmp_path))
+    missed = []
+    tasker.scheduler.add_listener(missed.append, EVENT_JOB_MISSED)
+    tasker.start()
+    fire_time = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(seconds=2)
+    try:
+        for n in range(count):
+            job = tasker.scheduler.add_job(
+                zoho_check_in,
+                trigger=scheduler_module.SpreadCronTrigger(
+                    hour=fire_time.hour,
+                    minute=fire_time.minute,
+                    second=fire_time.second,
+                    timezone="UTC",
+                    jitter=jitter,
+                ),
+                kwargs={"account_id": f"account-{n}", "duration": duration},
+            )
+            assert job.misfire_grace_time == 1
+        deadline = asyncio.get_running_loop().time() + 2 + jitter + count * duration + 5
+        while len(started) < count and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.1)
+    finally:
+        tasker.shutdown()
+    assert not missed
+    return [(account, time - fire_time) for account, time in started]
+
+
+def test_spread_jobs_run_after_the_misfire_grace_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TASK_SPREAD", True)
+    runs = asyncio.run(run_colliding(tmp_path, count=3, jitter=6, duration=0.0))
+
+    assert sorted(account for account, _ in runs) == ["account-0", "account-1", "account-2"]
+    assert max(delay for _, delay in runs) >= timedelta(seconds=4)
+
+
+def test_jobs_waiting_for_admission_are_not_missed(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler_module, "admission_controller", AdmissionController(1))
+
+    runs = asyncio.run(run_colliding(tmp_path, count=3, jitter=0, duration=1.2))
+
+    assert len(runs) == 3
+    assert max(delay for _, delay in runs) >= timedelta(seconds=2)
+
+
+@pytest.mark.parametrize(
+    ("grace_time", "missed_count"),
+    [(1, 1), (None, 0)],
+)
+def test_missed_run_times_are_detected_when_fired(grace_time, missed_count):
+    now = datetime.now(timezone.utc)
+    job = SimpleNamespace(id="job", misfire_grace_time=grace_time, _jobstore_alias="default")
+
+    missed, due = TaskExecutor()._check_misfires(job, [now - timedelta(minutes=5), now])
+
+    assert len(missed) == missed_count
+    assert all(event.scheduled_run_time < now for event in missed)
+    assert len(due) == 2 - missed_count
+
+
+async def spread_offsets_of(tmp_path, jitters: list, repeat: int = 1) -> list:
+    tasker = TaskScheduler(jobs_dir=str(tmp_path))
+    tasker.start(paused=True)
+    try:
+        jobs = [
+            tasker.scheduler.add_job(
+                zoho_check_in,
+                trigger=SpreadCronTrigger(hour=9, minute=0, timezone="UTC", jitter=jitter),
+                kwargs={"account_id": f"account-{n}"},
+            )
+            for n, jitter in enumerate(jitters)
+        ]
+        fire_time = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+        return [
+            [tasker.get_spread_offset(tasker.scheduler.get_job(job.id), fire_time) for job in jobs]
+            for _ in range(repeat)
+        ]
+    finally:
+        tasker.shutdown()
+
+
+def test_single_job_keeps_a_random_start(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TASK_SPREAD", True)
+
+    offsets = [offset for (offset,) in asyncio.run(spread_offsets_of(tmp_path, [600], 20))]
+
+    assert all(0 <= offset <= 600 for offset in offsets)
+    assert len(set(offsets)) > 1
+
+
+def test_colliding_jobs_are_spread_with_a_phase(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TASK_SPREAD", True)
+
+    runs = asyncio.run(spread_offsets_of(tmp_path, [600, 600], 3))
+
+    first, second = sorted(runs[0])
+    assert runs == [runs[0]] * 3
+    assert 0 <= first < 300 <= second < 600
+    assert second - first == 300
+
+
+def test_spreading_disabled_starts_on_the_fired_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TASK_SPREAD", False)
+
+    assert asyncio.run(spread_offsets_of(tmp_path, [600, 600])) == [[0.0, 0.0]]
+
+
+@pytest.mark.parametrize(
+    ("spread", "trigger_type"), [(False, CronTrigger), (True, SpreadCronTrigger)]
+)
+def test_stored_triggers_are_converted_only_with_spreading(
+    tmp_path, monkeypatch, spread, trigger_type
+):
+    monkeypatch.setattr(Config, "TASK_SPREAD", spread)
+
+    async def run() -> type:
+        tasker = TaskScheduler(jobs_dir=str(tmp_path))
+        tasker.start(paused=True)
+        job = tasker.scheduler.add_job(
+            zoho_check_in, trigger=CronTrigger(hour=9, jitter=600), kwargs={"account_id": "a"}
+        )
+        tasker.resume()
+        try:
+            return type(tasker.scheduler.get_job(job.id).trigger)
+        finally:
+            tasker.shutdown()
+
+    assert asyncio.run(run()) is trigger_type
@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from attctrl.crypto import Cipher
+from attctrl.session import SessionStore
+
+STATE = {
+    "cookies": [{"name": "session", "value": "abc", "domain": ".zoho.com", "path": "/"}],
+    "origins": [],
+}
+
+
+def test_storage_state_round_trip_is_encrypted(tmp_path):
+    store = SessionStore("jane", tmp_path, Cipher(tmp_path, secret="secret"))
+    assert store.load() is None
+
+    store.save(STATE)
+
+    assert b"abc" not in store.state_file.read_bytes()
+    assert SessionStore("jane", tmp_path, Cipher(tmp_path, secret="secret")).load() == STATE
+
+
+def test_session_of_another_secret_is_discarded(tmp_path):
+    SessionStore("jane", tmp_path, Cipher(tmp_path, secret="secret")).save(STATE)
+    store = SessionStore("jane", tmp_path, Cipher(tmp_path, secret="changed"))
+
+    assert store.load() is None
+    assert not store.state_file.exists()
+
+
+def test_sign_ins_are_counted_per_account(tmp_path):
+    store_cipher = Cipher(tmp_path, secret="secret")
+    jane, john = (
+        SessionStore("jane", tmp_path, store_cipher),
+        SessionStore("john", tmp_path, store_cipher),
+    )
+
+    assert [jane.register_login() for _ in range(3)] == [1, 2, 3]
+    assert jane.logins_today() == 3
+    assert john.logins_today() == 0
+
+    jane.remove()
+    assert jane.logins_today() == 0
+
+
+def test_workers_starting_together_share_the_salt(tmp_path):
+    ciphers = [Cipher(tmp_path, secret="secret") for _ in range(8)]
+    with ThreadPoolExecutor(len(ciphers)) as pool:
+        tokens = list(pool.map(lambda worker: worker.encrypt(b"data"), ciphers))
+
+    assert all(worker.decrypt(token) == b"data" for worker in ciphers for token in tokens)
+    assert len((tmp_path / "session.salt").read_bytes()) == 16
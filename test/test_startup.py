@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import time
+
+LAZY_MODULES = ("playwright", "sqlalchemy", "sentry_sdk")
+IMPORT_BUDGET_MS = 800
+
+
+def import_profile() -> dict:
+    """
+    Import the app in a new interpreter.
+
+    :return: Cumulative import time in ms by module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import attctrl.api"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative) / 1000
+    return modules
+
+
+def test_app_import_defers_heavy_modules_and_fits_the_budget():
+    # NOTE: Best of a few runs, the first one may pay for a cold disk cache.
+    profiles = [import_profile() for _ in range(3)]
+    modules = min(profiles, key=lambda profile: profile["attctrl.api"])
+
+    assert [name for name in modules if name.split(".")[0] in LAZY_MODULES] == []
+    assert modules["attctrl.api"] < IMPORT_BUDGET_MS
+
+
+def test_probes_answer_before_and_after_startup(client):
+    assert client.get("/health").json() == {"status": "ok"}
+    deadline = time.monotonic() + 30
+    response = client.get("/ready")
+    while response.status_code != 200 and time.monotonic() < deadline:
+        assert response.json() == {"status": "starting"}
+        time.sleep(0.1)
+        response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["role"] == "leader"
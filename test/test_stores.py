@@ -0,0 +1,56 @@
+import pickle
+import threading
+
+from attctrl.accounts import AccountStore
+from attctrl.crypto import Cipher
+from attctrl.jobstore import SnapshotJobStore
+from attctrl.schedules import ScheduleTemplate, ScheduleTemplateStore, TaskSpec
+
+
+def test_accounts_added_by_another_worker_are_found(tmp_path):
+    store_cipher = Cipher(tmp_path, secret="secret")
+    leader = AccountStore(tmp_path, store_cipher)
+    follower = AccountStore(tmp_path, store_cipher)
+    assert len(leader.get_accounts()) == 1
+
+    account = follower.add_account("Jane", "jane@example.com", "password", "12345")
+
+    assert leader.get_account(account.id) == account
+    follower.remove_account(account.id)
+    assert leader.get_account(account.id) is None
+
+
+def test_templates_saved_by_another_worker_are_found(tmp_path):
+    leader = ScheduleTemplateStore(tmp_path)
+    follower = ScheduleTemplateStore(tmp_path)
+    builtin = len(leader.get_templates())
+    template = ScheduleTemplate(
+        name="Night shift",
+        tasks=[TaskSpec(type="checkin", dow="mon-fri", time="22:00")],
+    )
+
+    follower.save_template(template)
+
+    assert leader.get_template("Night shift") == template
+    assert len(leader.get_templates()) == builtin + 1
+    assert follower.remove_template("Night shift")
+    assert leader.get_template("Night shift") is None
+
+
+def test_concurrent_snapshot_writes_leave_no_temp_files(tmp_path):
+    store = SnapshotJobStore(tmp_path / "jobs.pickle", flush_interval=0)
+
+    def write():
+        for _ in range(50):
+            with store._lock:
+                store._dirty = True
+            store.flush()
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [path.name for path in tmp_path.iterdir()] == ["jobs.pickle"]
+    assert pickle.loads((tmp_path / "jobs.pickle").read_bytes()) == []